@@ -34,6 +34,9 @@ BUCKET_KEY_PREFIX = 'bucket:'
 BUCKET_LIST_PREFIX = 'buckets:'
 CONTAINER_LIST_PREFIX = 'containers:'
 BUCKET_LOCK_KEY_PREFIX = 'bucketlock:'
+ACCOUNT_LIST_KEY = 'accounts:'
+# Bucket name -> owner account (only used in cluster mode)
+BUCKET_OWNER_KEY = 'bucketowners:'
 
 EXPIRE_TIME = 60  # seconds
 
@@ -64,18 +67,22 @@ class AccountBackend(RedisConnection):
         local update_bucket_stats = function(
             container_key, bucket_key, buckets_list_key,
             account, container_name, bucket_name, bucket_lock, mtime, deleted,
-            inc_objects, inc_bytes)
+            inc_objects, inc_bytes, global_keys)
           if deleted then
             redis.call('HDEL', container_key, 'bucket');
 
             -- Update the buckets list if it's the root container
             if bucket_name == container_name then
-              redis.call('ZREM', buckets_list_key, bucket_name);
-              redis.call('ZREM', '%(bucket_list_prefix)s', bucket_name);
+              local removed = redis.call('ZREM', buckets_list_key,
+                                         bucket_name);
+              if global_keys then
+                redis.call('ZREM', '%(bucket_list_prefix)s', bucket_name);
+              end;
               -- Also delete the bucket
               redis.call('DEL', bucket_key);
+              return -removed;
             end;
-            return;
+            return 0;
           end;
 
           -- Set the bucket owner.
@@ -86,9 +93,12 @@ class AccountBackend(RedisConnection):
           redis.call('HSET', container_key, 'bucket', bucket_name);
 
           -- Update the buckets list if it's the root container
+          local added = 0;
           if bucket_name == container_name then
-            redis.call('ZADD', buckets_list_key, 0, bucket_name);
-            redis.call('ZADD', '%(bucket_list_prefix)s', 0, bucket_name);
+            added = redis.call('ZADD', buckets_list_key, 0, bucket_name);
+            if global_keys then
+              redis.call('ZADD', '%(bucket_list_prefix)s', 0, bucket_name);
+            end;
           end;
 
           -- For container holding MPU segments, we do not want to count
@@ -111,6 +121,7 @@ class AccountBackend(RedisConnection):
           if mtime ~= '' then
             redis.call('HSET', bucket_key, 'mtime', mtime);
           end;
+          return added;
         end;
     """
 
@@ -208,16 +219,28 @@ class AccountBackend(RedisConnection):
         local now = ARGV[10]; -- current timestamp
         local ckey_expiration_time = ARGV[11];
         local autocreate_container = ARGV[12];
+        -- In cluster mode, the keys shared by all accounts are
+        -- in other slots: they are updated by the caller.
+        local global_keys = ARGV[13] ~= 'False';
+
+        -- Tell the caller what changed in the keys shared by all accounts:
+        -- account created, bucket added (1) or removed (-1),
+        -- and the name of the bucket (maybe not given by the caller).
+        local account_created = 0;
+        local bucket_change = 0;
 
         local account_exists = redis.call('EXISTS', akey);
         if account_exists ~= 1 then
           if autocreate_account == 'True' then
-            redis.call('HSET', 'accounts:', account_id, 1);
+            if global_keys then
+              redis.call('HSET', 'accounts:', account_id, 1);
+            end;
             redis.call('HMSET', akey,
                        'id', account_id,
                        'bytes', 0,
                        'objects', 0,
                        'ctime', now);
+            account_created = 1;
           else
             return redis.error_reply('no_account');
           end;
@@ -323,10 +346,12 @@ class AccountBackend(RedisConnection):
             inc_bytes = new_total_bytes;
           end;
 
-          update_bucket_stats(
+          bucket_change = update_bucket_stats(
               ckey, bkey, blistkey, account_id, container_name, bucket_name,
-              bucket_lock, mtime, deleted, inc_objects, inc_bytes);
+              bucket_lock, mtime, deleted, inc_objects, inc_bytes,
+              global_keys);
         end;
+        return {account_created, bucket_change, bucket_name};
         """)
 
     lua_refresh_account = """
@@ -403,6 +428,58 @@ class AccountBackend(RedisConnection):
                                  'marker', '');
     """
 
+    lua_list_with_delimiter = """
+        -- Same as ZRANGEBYLEX, but the names sharing the same prefix
+        -- up to the delimiter are returned only once (as this prefix).
+        -- Returns a flat list of names, each one followed by 1 if it is
+        -- a prefix, 0 otherwise.
+        local key = KEYS[1]
+        local min_k = ARGV[1]
+        local max_k = ARGV[2]
+        local limit = tonumber(ARGV[3])
+        local prefix = ARGV[4]
+        local delimiter = ARGV[5]
+        local end_marker = ARGV[6]
+        local page_size = tonumber(ARGV[7])
+
+        local res = {}
+        local count = 0
+        local dir_name = nil
+        while count < limit do
+            local fetch = math.min(limit - count, page_size)
+            local names = redis.call('ZRANGEBYLEX', key, min_k, max_k,
+                                     'LIMIT', 0, fetch)
+            for _, name in ipairs(names) do
+                if not dir_name
+                        or string.sub(name, 1, #dir_name) ~= dir_name then
+                    dir_name = nil
+                    local pos = string.find(name, delimiter, #prefix + 1,
+                                            true)
+                    if pos and pos > 1 then
+                        dir_name = string.sub(name, 1, pos + #delimiter - 1)
+                        table.insert(res, dir_name)
+                        table.insert(res, 1)
+                    else
+                        table.insert(res, name)
+                        table.insert(res, 0)
+                    end
+                    count = count + 1
+                end
+            end
+            if #names < fetch then
+                -- No more items
+                break
+            end
+            if dir_name then
+                -- Skip the rest of the names sharing this prefix
+                min_k = '(' .. dir_name .. end_marker
+            else
+                min_k = '(' .. names[#names]
+            end
+        end
+        return res
+    """
+
     # This regex comes from https://stackoverflow.com/a/50484916
     #
     # The first group looks ahead to ensure that the match
@@ -440,6 +517,9 @@ class AccountBackend(RedisConnection):
             host=redis_host, sentinel_hosts=redis_sentinel_hosts,
             sentinel_name=redis_sentinel_name, **redis_conf)
         self.autocreate = boolean_value(conf.get('autocreate'), True)
+        # Number of names fetched at once when listing with a delimiter
+        self.listing_page_size = int_value(
+            conf.get('listing_page_size'), 100)
         self._account_prefix = conf.get('account_prefix', ACCOUNT_KEY_PREFIX)
         self._bucket_prefix = conf.get('bucket_prefix', BUCKET_KEY_PREFIX)
         self._bucket_list_prefix = conf.get('bucket_list_prefix',
@@ -463,13 +543,24 @@ class AccountBackend(RedisConnection):
             self.lua_get_extended_container_info)
         self.script_get_lock_bucket = self.register_script(
             self.lua_lock_bucket)
+        self.script_list_with_delimiter = self.register_script(
+            self.lua_list_with_delimiter)
+
+    # In cluster mode, all the keys related to an account (including the
+    # keys of its buckets) are tagged with the name of the account,
+    # so that they are stored in the same slot.
 
     def akey(self, account):
         """Build the key of an account description"""
-        return self._account_prefix + account
+        return self._account_prefix + self.hash_tag(account)
 
-    def bkey(self, bucket):
-        """Build the key of a bucket description"""
+    def bkey(self, bucket, account=None):
+        """
+        Build the key of a bucket description
+        (the owner account is required in cluster mode).
+        """
+        if self.cluster:
+            return self._bucket_prefix + self.hash_tag(account) + bucket
         return self._bucket_prefix + bucket
 
     def lbucketkey(self, bucket):
@@ -478,35 +569,58 @@ class AccountBackend(RedisConnection):
 
     def blistkey(self, account):
         """Build the key of an account's bucket list"""
-        return self._bucket_list_prefix + account
+        return self._bucket_list_prefix + self.hash_tag(account)
 
-    def blockkey(self, bucket):
-        """Build the lock key for a bucket refresh operation"""
+    def blockkey(self, bucket, account=None):
+        """
+        Build the lock key for a bucket refresh operation
+        (the owner account is required in cluster mode).
+        """
+        if self.cluster:
+            return self._bucket_lock_prefix + self.hash_tag(account) + bucket
         return self._bucket_lock_prefix + bucket
 
-    @staticmethod
-    def ckey(account, name):
+    def ckey(self, account, name):
         """Build the key of a container description"""
-        return 'container:%s:%s' % (account, text_type(name))
+        return 'container:%s:%s' % (self.hash_tag(account), text_type(name))
 
     def clistkey(self, account):
         """Build the key of an account's container list"""
-        return self._container_list_prefix + account
+        return self._container_list_prefix + self.hash_tag(account)
+
+    def mkey(self, account):
+        """Build the key of an account's metadata"""
+        return 'metadata:%s' % self.hash_tag(account)
+
+    def _bucket_owner(self, bname, conn=None):
+        """
+        Get the name of the account owning the specified bucket,
+        or None if the bucket does not exist.
+        """
+        conn = conn or self.conn
+        if self.cluster:
+            owner = conn.hget(BUCKET_OWNER_KEY, bname)
+        else:
+            owner = conn.hget(self.bkey(bname), 'account')
+        if owner is None:
+            return None
+        return owner.decode('utf-8')
 
     @catch_service_errors
     def create_account(self, account_id, **kwargs):
         conn = self.conn
         if not account_id:
             return None
-        if conn.hget('accounts:', account_id):
+        if conn.hget(ACCOUNT_LIST_KEY, account_id):
             return None
 
         lock = self.acquire_lock_with_timeout(self.akey(account_id), 1)
         if not lock:
             return None
 
-        pipeline = conn.pipeline(True)
-        pipeline.hset('accounts:', account_id, 1)
+        # In cluster mode, the list of accounts is in another slot
+        pipeline = conn.pipeline(not self.cluster)
+        pipeline.hset(ACCOUNT_LIST_KEY, account_id, 1)
         pipeline.hmset(self.akey(account_id), {
             'id': account_id,
             'objects': 0,
@@ -535,14 +649,15 @@ class AccountBackend(RedisConnection):
         num_containers = conn.zcard(self.clistkey(account_id))
 
         if int(num_containers) > 0:
-            self.release_lock('account:%s' % account_id, lock)
+            self.release_lock(self.akey(account_id), lock)
             return False
 
-        pipeline = conn.pipeline(True)
-        pipeline.delete('metadata:%s' % account_id)
+        # In cluster mode, the list of accounts is in another slot
+        pipeline = conn.pipeline(not self.cluster)
+        pipeline.delete(self.mkey(account_id))
         pipeline.delete(self.clistkey(account_id))
         pipeline.delete(self.akey(account_id))
-        pipeline.hdel('accounts:', account_id)
+        pipeline.hdel(ACCOUNT_LIST_KEY, account_id)
         pipeline.execute()
         self.release_lock(self.akey(account_id), lock)
         return True
@@ -558,7 +673,7 @@ class AccountBackend(RedisConnection):
         if not account_id:
             return None
 
-        meta = conn.hgetall('metadata:%s' % account_id.decode('utf-8'))
+        meta = conn.hgetall(self.mkey(account_id.decode('utf-8')))
         return debinarize(meta)
 
     def cast_fields(self, info):
@@ -587,7 +702,13 @@ class AccountBackend(RedisConnection):
             return None
 
         conn = self.get_slave_conn(**kwargs)
-        binfo = conn.hgetall(self.bkey(bname))
+        if self.cluster:
+            owner = self._bucket_owner(bname, conn)
+            if owner is None:
+                return None
+            binfo = conn.hgetall(self.bkey(bname, owner))
+        else:
+            binfo = conn.hgetall(self.bkey(bname))
         if not binfo:
             return None
         self.cast_fields(binfo)
@@ -604,7 +725,7 @@ class AccountBackend(RedisConnection):
 
         conn = self.get_slave_conn(**kwargs)
         keys = [self.ckey(account_id, cname)]
-        args = [self._bucket_prefix]
+        args = [self.bkey('', account_id)]
         cinfolist = self.script_get_container_info(
             keys=keys, args=args, client=conn)
         key = None
@@ -634,11 +755,11 @@ class AccountBackend(RedisConnection):
 
         if not metadata and not to_delete:
             return account_id
-        pipeline = conn.pipeline(True)
+        pipeline = conn.pipeline(not self.cluster)
         if to_delete:
-            pipeline.hdel('metadata:%s' % account_id, *to_delete)
+            pipeline.hdel(self.mkey(account_id), *to_delete)
         if metadata:
-            pipeline.hmset('metadata:%s' % account_id, metadata)
+            pipeline.hmset(self.mkey(account_id), metadata)
         pipeline.execute()
         return account_id
 
@@ -651,8 +772,14 @@ class AccountBackend(RedisConnection):
         :param metadata: dict of entries to set (or update)
         :param to_delete: iterable of keys to delete
         """
-        bkey = self.bkey(bname)
-        pipeline = self.conn.pipeline(True)
+        if self.cluster:
+            owner = self._bucket_owner(bname)
+            if owner is None:
+                return None
+            bkey = self.bkey(bname, owner)
+        else:
+            bkey = self.bkey(bname)
+        pipeline = self.conn.pipeline(not self.cluster)
         if to_delete:
             pipeline.hdel(bkey, *to_delete)
         # FIXME(FVE): cast known metadata into the appropriate type/value
@@ -681,7 +808,7 @@ class AccountBackend(RedisConnection):
         pipeline.hgetall(self.akey(account_id))
         pipeline.zcard(self.blistkey(account_id))
         pipeline.zcard(self.clistkey(account_id))
-        pipeline.hgetall('metadata:%s' % account_id)
+        pipeline.hgetall(self.mkey(account_id))
         data = pipeline.execute()
         info = data[0]
         self.cast_fields(info)
@@ -696,14 +823,16 @@ class AccountBackend(RedisConnection):
         Get the list of all accounts.
         """
         conn = self.get_slave_conn(**kwargs)
-        accounts = conn.hkeys('accounts:')
+        accounts = conn.hkeys(ACCOUNT_LIST_KEY)
         return debinarize(accounts)
 
-    @catch_service_errors
-    def update_container(self, account_id, name, mtime, dtime,
-                         object_count, bytes_used,
-                         bucket_name=None, autocreate_account=None,
-                         autocreate_container=True, **kwargs):
+    def _update_container_keys_args(self, account_id, name, mtime, dtime,
+                                    object_count, bytes_used,
+                                    bucket_name=None, autocreate_account=None,
+                                    autocreate_container=True):
+        """
+        Build the keys and arguments of the update_container Lua script.
+        """
         if not account_id or not name:
             raise BadRequest("Missing account or container")
 
@@ -726,31 +855,125 @@ class AccountBackend(RedisConnection):
         # If no bucket name is provided, set it to ''
         # (we cannot pass None to the Lua script).
         bucket_name = bucket_name or ''
-        bucket_lock = self.blockkey(bucket_name)
+        bucket_lock = self.blockkey(bucket_name, account_id)
         now = Timestamp().normal
 
-        ckey = AccountBackend.ckey(account_id, name)
+        ckey = self.ckey(account_id, name)
         keys = [self.akey(account_id), ckey, self.clistkey(account_id),
-                self._bucket_prefix, self.blistkey(account_id)]
+                self.bkey('', account_id), self.blistkey(account_id)]
         args = [account_id, name, bucket_name, bucket_lock, mtime, dtime,
                 object_count, bytes_used, str(autocreate_account), now,
-                EXPIRE_TIME, str(autocreate_container)]
+                EXPIRE_TIME, str(autocreate_container), str(not self.cluster)]
+        return keys, args
+
+    def _update_global_keys(self, account_id, changes):
+        """
+        In cluster mode, update the keys shared by all accounts
+        (which cannot be touched by the update_container script)
+        with the changes returned by the script.
+        """
+        if not self.cluster or not changes:
+            return
+        account_created, bucket_change, bucket_name = changes
+        if not account_created and not bucket_change:
+            return
+        # The script may have used the bucket registered for the container
+        if isinstance(bucket_name, bytes):
+            bucket_name = bucket_name.decode('utf-8')
+        pipeline = self.conn.pipeline(False)
+        if account_created:
+            pipeline.hset(ACCOUNT_LIST_KEY, account_id, 1)
+        if bucket_change > 0:
+            pipeline.zadd(self._bucket_list_prefix, {bucket_name: 0})
+            pipeline.hset(BUCKET_OWNER_KEY, bucket_name, account_id)
+        elif bucket_change < 0:
+            pipeline.zrem(self._bucket_list_prefix, bucket_name)
+            pipeline.hdel(BUCKET_OWNER_KEY, bucket_name)
+        pipeline.execute()
+
+    @staticmethod
+    def _update_container_error(exc, account_id, name):
+        """
+        Convert an error returned by the update_container Lua script.
+        """
+        if text_type(exc).endswith("no_account"):
+            return NotFound("Account %s not found" % account_id)
+        if text_type(exc).endswith("no_container"):
+            return NotFound("Container %s not found" % name)
+        elif text_type(exc).endswith("no_update_needed"):
+            return Conflict("No update needed, "
+                            "event older than last container update")
+        return exc
+
+    @catch_service_errors
+    def update_container(self, account_id, name, mtime, dtime,
+                         object_count, bytes_used,
+                         bucket_name=None, autocreate_account=None,
+                         autocreate_container=True, **kwargs):
+        keys, args = self._update_container_keys_args(
+            account_id, name, mtime, dtime, object_count, bytes_used,
+            bucket_name=bucket_name, autocreate_account=autocreate_account,
+            autocreate_container=autocreate_container)
         try:
-            self.script_update_container(
+            changes = self.script_update_container(
                 keys=keys, args=args)
         except redis.exceptions.ResponseError as exc:
-            if text_type(exc).endswith("no_account"):
-                raise NotFound("Account %s not found" % account_id)
-            if text_type(exc).endswith("no_container"):
-                raise NotFound("Container %s not found" % name)
-            elif text_type(exc).endswith("no_update_needed"):
-                raise Conflict("No update needed, "
-                               "event older than last container update")
-            else:
-                raise
+            raise self._update_container_error(exc, account_id, name)
+        self._update_global_keys(account_id, changes)
 
         return name
 
+    @catch_service_errors
+    def update_containers(self, updates, autocreate_account=None,
+                          autocreate_container=True, **kwargs):
+        """
+        Update several containers, possibly from several accounts,
+        with a single pipelined request.
+
+        :param updates: dictionaries with 'account' and 'name' keys,
+            and optionally 'mtime', 'dtime', 'objects', 'bytes'
+            and 'bucket' keys
+        :returns: a list with, for each update, the name of the container,
+            or the exception telling why it has not been updated
+        """
+        results = [None] * len(updates)
+        pipeline = self.conn.pipeline(transaction=False)
+        pipelined = list()
+        for i, update in enumerate(updates):
+            try:
+                keys, args = self._update_container_keys_args(
+                    update.get('account'), update.get('name'),
+                    update.get('mtime'), update.get('dtime'),
+                    update.get('objects'), update.get('bytes'),
+                    bucket_name=update.get('bucket'),
+                    autocreate_account=autocreate_account,
+                    autocreate_container=autocreate_container)
+            except Exception as exc:
+                results[i] = exc
+                continue
+            self.script_update_container(keys=keys, args=args,
+                                         client=pipeline)
+            pipelined.append((i, keys, args))
+        if pipelined:
+            responses = pipeline.execute(raise_on_error=False)
+            for (i, keys, args), resp in zip(pipelined, responses):
+                update = updates[i]
+                if isinstance(resp, redis.exceptions.NoScriptError):
+                    # Cluster pipelines do not load the script on the
+                    # nodes which do not know it yet: retry alone.
+                    try:
+                        resp = self.script_update_container(
+                            keys=keys, args=args)
+                    except redis.exceptions.ResponseError as exc:
+                        resp = exc
+                if isinstance(resp, redis.exceptions.ResponseError):
+                    results[i] = self._update_container_error(
+                        resp, update.get('account'), update.get('name'))
+                else:
+                    self._update_global_keys(update.get('account'), resp)
+                    results[i] = update.get('name')
+        return results
+
     def _should_be_listed(self, c_id, s3_buckets_only):
         return not s3_buckets_only or self.buckets_pattern.match(c_id)
 
@@ -790,16 +1013,27 @@ class AccountBackend(RedisConnection):
 
             # Ask for one extra element, to be able to tell if the
             # list of results is truncated.
-            cnames = conn.zrangebylex(
-                key, min_k, max_k,
-                0, limit - len(results) + 1)
-            if not cnames:
+            count = limit - len(results) + 1
+            if delimiter:
+                # The names sharing a prefix up to the delimiter are
+                # skipped by the script, without coming back here.
+                raw = self.script_list_with_delimiter(
+                    keys=[key],
+                    args=[min_k, max_k, count, prefix, delimiter,
+                          END_MARKER, self.listing_page_size],
+                    client=conn)
+                items = [(raw[i].decode('utf8', errors='ignore'), raw[i + 1])
+                         for i in range(0, len(raw), 2)]
+            else:
+                items = [(c.decode('utf8', errors='ignore'), 0)
+                         for c in conn.zrangebylex(key, min_k, max_k,
+                                                   0, count)]
+            if not items:
                 # No more items
                 marker = None
                 break
-            cnames = [c.decode('utf8', errors='ignore') for c in cnames]
 
-            for cname in cnames:
+            for cname, is_prefix in items:
                 if len(results) >= limit:
                     # Do not reset marker, there are more items
                     break
@@ -808,21 +1042,20 @@ class AccountBackend(RedisConnection):
                     # No more items
                     marker = None
                     break
+                if is_prefix:
+                    # Continue listing after all the names of this prefix
+                    marker = cname + END_MARKER
+                    if cname != orig_marker:
+                        results.append([cname, 0, 0, 1, 0])
+                    continue
                 marker = cname
-                if delimiter:
-                    end = cname.find(delimiter, len(prefix))
-                    if end > 0:
-                        # Delimiter found after the prefix.
-                        # Build a new marker, and continue listing from there.
-                        # TODO(FVE): we can avoid another request to Redis by
-                        # analyzing the rest of the list ourselves.
-                        dir_name = cname[:end + 1]
-                        marker = dir_name + END_MARKER
-                        if dir_name != orig_marker:
-                            results.append([dir_name, 0, 0, 1, 0])
-                        break
                 if self._should_be_listed(cname, s3_buckets_only):
                     results.append([cname, 0, 0, 0, 0])
+            else:
+                if len(items) < count:
+                    # No more items
+                    marker = None
+                    break
         return results, marker
 
     @catch_service_errors
@@ -839,11 +1072,11 @@ class AccountBackend(RedisConnection):
             limit=limit, marker=marker,
             end_marker=end_marker, prefix=prefix, **kwargs)
         conn = self.get_slave_conn(**kwargs)
-        pipeline = conn.pipeline(True)
+        pipeline = conn.pipeline(not self.cluster)
         for entry in raw_list:
             # For real buckets (not prefixes), fetch metadata.
             if not entry[3]:
-                pipeline.hmget(self.bkey(entry[0]),
+                pipeline.hmget(self.bkey(entry[0], account_id),
                                'objects', 'bytes', 'mtime')
         res = pipeline.execute()
 
@@ -867,7 +1100,14 @@ class AccountBackend(RedisConnection):
     @catch_service_errors
     def list_containers(self, account_id, limit=1000, marker=None,
                         end_marker=None, prefix=None, delimiter=None,
-                        s3_buckets_only=False, **kwargs):
+                        s3_buckets_only=False, details=False, **kwargs):
+        """
+        Get the list of containers of the specified account,
+        with their statistics (fetched in a single pipeline).
+
+        :param details: also fetch the whole description of each
+            container, appended (as a `dict`) to its entry.
+        """
         raw_list, _next_marker = self._raw_listing(
             self.clistkey(account_id),
             limit=limit, marker=marker,
@@ -875,20 +1115,33 @@ class AccountBackend(RedisConnection):
             delimiter=delimiter,
             s3_buckets_only=s3_buckets_only, **kwargs)
         conn = self.get_slave_conn(**kwargs)
-        pipeline = conn.pipeline(True)
+        pipeline = conn.pipeline(not self.cluster)
         # skip prefix
         for container in [entry for entry in raw_list if not entry[3]]:
-            pipeline.hmget(AccountBackend.ckey(account_id, container[0]),
-                           'objects', 'bytes', 'mtime')
+            ckey = self.ckey(account_id, container[0])
+            if details:
+                pipeline.hgetall(ckey)
+            else:
+                pipeline.hmget(ckey, 'objects', 'bytes', 'mtime')
         res = pipeline.execute()
 
         i = 0
         for container in raw_list:
             if not container[3]:
+                if details:
+                    info = debinarize(res[i])
+                    stats = (info.get('objects'), info.get('bytes'),
+                             info.get('mtime'))
+                else:
+                    stats = res[i]
                 # FIXME(adu) Convert to dict
-                container[1] = int_value(res[i][0], 0)
-                container[2] = int_value(res[i][1], 0)
-                container[4] = float_value(res[i][2], 0.0)
+                container[1] = int_value(stats[0], 0)
+                container[2] = int_value(stats[1], 0)
+                container[4] = float_value(stats[2], 0.0)
+                if details:
+                    info['objects'] = container[1]
+                    info['bytes'] = container[2]
+                    container.append(info)
                 i += 1
 
         return raw_list
@@ -896,7 +1149,7 @@ class AccountBackend(RedisConnection):
     @catch_service_errors
     def status(self, **kwargs):
         conn = self.get_slave_conn(**kwargs)
-        account_count = conn.hlen('accounts:')
+        account_count = conn.hlen(ACCOUNT_LIST_KEY)
         status = {'account_count': account_count}
         return status
 
@@ -906,7 +1159,15 @@ class AccountBackend(RedisConnection):
         Refresh the counters of a bucket. Recompute them from the counters
         of all shards (containers).
         """
-        lkey = self.blockkey(bucket_name)
+        if self.cluster:
+            # The keys of the bucket are in the slot of its owner
+            account_id = self._bucket_owner(bucket_name)
+            if account_id is None:
+                raise NotFound("Bucket %s not found" % bucket_name)
+        else:
+            # Replaced by the owner of the bucket in the script
+            account_id = '__account__'
+        lkey = self.blockkey(bucket_name, account_id)
         batch_size = kwargs.get("batch_size", 10000)
         try:
             ctime = Timestamp().normal
@@ -916,9 +1177,8 @@ class AccountBackend(RedisConnection):
                 raise Conflict("Refresh on bucket already in progress")
             raise
 
-        account_id = '__account__'
-        keys = [AccountBackend.ckey(account_id, ''),
-                self.clistkey(account_id), self.bkey(bucket_name),
+        keys = [self.ckey(account_id, ''),
+                self.clistkey(account_id), self.bkey(bucket_name, account_id),
                 lkey]
 
         try:
@@ -942,7 +1202,7 @@ class AccountBackend(RedisConnection):
 
         keys = [self.akey(account_id),
                 self.clistkey(account_id),
-                "container:%s:" % account_id]
+                self.ckey(account_id, '')]
 
         try:
             self.script_refresh_account(keys=keys, client=self.conn)
@@ -959,7 +1219,7 @@ class AccountBackend(RedisConnection):
 
         keys = [self.akey(account_id),
                 self.clistkey(account_id),
-                "container:%s:" % account_id]
+                self.ckey(account_id, '')]
 
         try:
             self.script_flush_account(keys=keys, client=self.conn)
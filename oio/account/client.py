@@ -219,7 +219,7 @@ class AccountClient(HttpApi):
 
     def container_list(self, account, limit=None, marker=None,
                        end_marker=None, prefix=None, delimiter=None,
-                       s3_buckets_only=False, **kwargs):
+                       s3_buckets_only=False, details=False, **kwargs):
         """
         Get the list of containers of an account.
 
@@ -234,6 +234,9 @@ class AccountClient(HttpApi):
         :keyword delimiter:
         :keyword s3_buckets_only: list only S3 buckets.
         :type s3_buckets_only: `bool`
+        :keyword details: append the whole description of each
+            container (as a `dict`) to its entry.
+        :type details: `bool`
         :rtype: `dict` with 'ctime' (`float`), 'bytes' (`int`),
             'objects' (`int`), 'containers' (`int`), 'id' (`str`),
             'metadata' (`dict`) and 'listing' (`list`).
@@ -248,6 +251,8 @@ class AccountClient(HttpApi):
                   "prefix": prefix,
                   "delimiter": delimiter,
                   "s3_buckets_only": s3_buckets_only}
+        if details:
+            params["details"] = True
         _resp, body = self.account_request(account, 'GET', 'containers',
                                            params=params, **kwargs)
         return body
@@ -278,6 +283,23 @@ class AccountClient(HttpApi):
                                            data=json.dumps(metadata), **kwargs)
         return body
 
+    def container_update_many(self, updates, **kwargs):
+        """
+        Update several containers, possibly from several accounts,
+        with a single request.
+
+        :param updates: container metadata ("bytes", "objects",
+            "mtime", "dtime", "bucket"), with the name of the account
+            ("account") and the name of the container ("name")
+        :type updates: `list` of `dict`
+        :returns: a list with, for each update, a dictionary with the
+            HTTP "status" of the update, and a "message" in case of error
+        """
+        _resp, body = self.account_request(
+            None, 'POST', 'container/update-many',
+            data=json.dumps({'containers': updates}), **kwargs)
+        return body['containers']
+
     def container_reset(self, account, container, mtime, **kwargs):
         """
         Reset container of an account
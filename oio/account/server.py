@@ -118,6 +118,9 @@ class Account(WerkzeugApp):
             Rule('/v1.0/account/container/update',
                  endpoint='account_container_update',
                  methods=['PUT', 'POST']),  # FIXME(adu) only PUT
+            Rule('/v1.0/account/container/update-many',
+                 endpoint='account_container_update_many',
+                 methods=['POST']),
             # Buckets
             Rule('/v1.0/bucket/show', endpoint='bucket_show',
                  methods=['GET']),
@@ -482,6 +485,9 @@ class Account(WerkzeugApp):
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     #
     # Get information about the containers belonging to the specified account.
+    # With "details=true", the whole description of each container (as
+    # returned by "show-container", except bucket properties) is appended
+    # to its entry of the listing.
     #
     # Sample request:
     #
@@ -535,11 +541,12 @@ class Account(WerkzeugApp):
             limit = ACCOUNT_LISTING_DEFAULT_LIMIT
         delimiter = req.args.get('delimiter', '')
         s3_buckets_only = true_value(req.args.get('s3_buckets_only', False))
+        details = true_value(req.args.get('details', False))
 
         user_list = self.backend.list_containers(
             account_id, limit=limit, marker=marker, end_marker=end_marker,
             prefix=prefix, delimiter=delimiter,
-            s3_buckets_only=s3_buckets_only, **kwargs)
+            s3_buckets_only=s3_buckets_only, details=details, **kwargs)
 
         info['listing'] = user_list
         # TODO(FVE): add "truncated" entry telling if the listing is truncated
@@ -603,6 +610,84 @@ class Account(WerkzeugApp):
         result = json.dumps(info)
         return Response(result, mimetype=HTTP_CONTENT_TYPE_JSON)
 
+    # ACCT{{
+    # POST /v1.0/account/container/update-many
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    #
+    # Update several containers, possibly from several accounts,
+    # with container-related metadata.
+    #
+    # Request example:
+    #
+    # .. code-block:: http
+    #
+    #    POST /v1.0/account/container/update-many HTTP/1.1
+    #    Host: 127.0.0.1:6013
+    #    User-Agent: curl/7.47.0
+    #    Accept: */*
+    #    Content-Length: 223
+    #    Content-Type: application/x-www-form-urlencoded
+    #
+    # .. code-block:: json
+    #
+    #    {
+    #      "containers": [
+    #        {
+    #          "account": "myaccount",
+    #          "name": "user1bucket",
+    #          "mtime": "123456789",
+    #          "objects": 12,
+    #          "bytes": 42,
+    #          "bucket": "user1bucket"
+    #        },
+    #        {
+    #          "account": "myaccount",
+    #          "name": "container2",
+    #          "dtime": "123456789"
+    #        }
+    #      ]
+    #    }
+    #
+    # Response example:
+    #
+    # .. code-block:: http
+    #
+    #    HTTP/1.1 200 OK
+    #    Server: gunicorn/19.9.0
+    #    Date: Wed, 01 Aug 2018 12:17:25 GMT
+    #    Connection: keep-alive
+    #    Content-Type: application/json
+    #    Content-Length: 112
+    #
+    # .. code-block:: json
+    #
+    #    {
+    #      "containers": [
+    #        {"status": 200},
+    #        {"status": 409,
+    #         "message": "No update needed, event older than last ..."}
+    #      ]
+    #    }
+    #
+    # }}ACCT
+    @force_master
+    def on_account_container_update_many(self, req, **kwargs):
+        data = json.loads(req.get_data())
+        updates = data.get('containers')
+        if not isinstance(updates, list):
+            raise BadRequest('Missing list of containers')
+        results = list()
+        for res in self.backend.update_containers(updates, **kwargs):
+            if isinstance(res, HTTPException):
+                results.append({'status': res.code,
+                                'message': res.description})
+            elif isinstance(res, Exception):
+                results.append({'status': 500, 'message': str(res)})
+            else:
+                results.append({'status': 200})
+        result = json.dumps({'containers': results})
+        return Response(result, mimetype=HTTP_CONTENT_TYPE_JSON)
+
     # ACCT{{
     # PUT /v1.0/account/container/reset?id=<account_name>
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -15,9 +15,8 @@
 
 from oio.common.green import ChunkReadTimeout, ChunkWriteTimeout, \
     ContextPool, ConnectionTimeout, Empty, GreenPile, LightQueue, \
-    SourceReadTimeout, Timeout, Queue, eventlet_yield
+    SourceReadTimeout, Timeout, Queue, eventlet_yield, tpool
 
-import collections
 import math
 import hashlib
 from socket import error as SocketError
@@ -99,10 +98,14 @@ class ECChunkDownloadHandler(object):
 
     def __init__(self, storage_method, chunks, meta_start, meta_end, headers,
                  connection_timeout=None, read_timeout=None, reqid=None,
-                 perfdata=None, **_kwargs):
+                 perfdata=None, ec_readahead_segments=1,
+                 ec_decode_in_thread=False, **_kwargs):
         """
         :param connection_timeout: timeout to establish the connections
         :param read_timeout: timeout to read a buffer of data
+        :param ec_readahead_segments: number of segments to read in advance
+            from each chunk, and to decode at once when available
+        :param ec_decode_in_thread: decode segments in a native thread
         """
         self.storage_method = storage_method
         self.chunks = chunks
@@ -116,6 +119,8 @@ class ECChunkDownloadHandler(object):
         self.read_timeout = read_timeout
         self.reqid = reqid
         self.perfdata = perfdata
+        self.readahead_segments = int_value(ec_readahead_segments, 1)
+        self.decode_in_thread = ec_decode_in_thread
         self.logger = _kwargs.get('logger', LOGGER)
         self._resp_by_chunk = dict()
 
@@ -195,7 +200,9 @@ class ECChunkDownloadHandler(object):
             stream = ECStream(self.storage_method, read_iterators, range_infos,
                               self.meta_length, fragment_length,
                               reqid=self.reqid, perfdata=self.perfdata,
-                              logger=self.logger)
+                              logger=self.logger,
+                              readahead_segments=self.readahead_segments,
+                              decode_in_thread=self.decode_in_thread)
             # start the stream
             stream.start()
             return stream
@@ -212,7 +219,15 @@ class ECStream(object):
     Handles the different readers.
     """
     def __init__(self, storage_method, readers, range_infos, meta_length,
-                 fragment_length, reqid=None, perfdata=None, logger=None):
+                 fragment_length, reqid=None, perfdata=None, logger=None,
+                 readahead_segments=1, decode_in_thread=False):
+        """
+        :param readahead_segments: number of fragments buffered
+            for each reader, and maximum number of segments
+            decoded at once
+        :param decode_in_thread: decode segments in a native thread
+            (from eventlet's thread pool)
+        """
         self.storage_method = storage_method
         self.readers = readers
         self.range_infos = range_infos
@@ -222,6 +237,8 @@ class ECStream(object):
         self.reqid = reqid
         self.perfdata = perfdata
         self.logger = logger or LOGGER
+        self.readahead_segments = max(1, readahead_segments)
+        self.decode_in_thread = decode_in_thread
 
     def start(self):
         self._iter = io.chain(self._stream())
@@ -281,6 +298,13 @@ class ECStream(object):
 
             yield segment
 
+    def _decode_batch(self, batch):
+        """
+        Decode a list of segments, each one being a list of fragments.
+        """
+        decode = self.storage_method.driver.decode
+        return [decode(data) for data in batch]
+
     def _decode_segments(self, fragment_iterators):
         """
         Reads from fragments and yield full segments
@@ -289,7 +313,7 @@ class ECStream(object):
         queues = []
         # each iterators has its queue
         for _j in range(len(fragment_iterators)):
-            queues.append(LightQueue(1))
+            queues.append(LightQueue(self.readahead_segments))
 
         def put_in_queue(fragment_iterator, queue):
             """
@@ -299,8 +323,8 @@ class ECStream(object):
                 for fragment in fragment_iterator:
                     # put the read fragment in the queue
                     queue.put(fragment)
-                    # the queues are of size 1 so this coroutine blocks
-                    # until we decode a full segment
+                    # the queues are bounded so this coroutine blocks
+                    # until we decode enough segments
             except GreenletExit:
                 # ignore
                 pass
@@ -310,7 +334,7 @@ class ECStream(object):
                 self.logger.exception("Exception on reading (reqid=%s)",
                                       self.reqid)
             finally:
-                queue.resize(2)
+                queue.resize(self.readahead_segments + 1)
                 # put None to indicate the decoding loop
                 # this is over
                 queue.put(None)
@@ -324,22 +348,34 @@ class ECStream(object):
                 pool.spawn(put_in_queue, fragment_iterator, queue)
 
             # main decoding loop
-            while True:
-                data = []
-                # get the fragments from the queues
-                for queue in queues:
-                    fragment = queue.get()
-                    data.append(fragment)
-
-                if not all(data):
-                    # one of the readers returned None
-                    # impossible to read segment
+            finished = False
+            while not finished:
+                # wait for the fragments of the next segment,
+                # then take the fragments of the following segments
+                # if they have already been read
+                batch = []
+                while len(batch) < self.readahead_segments:
+                    if batch and not all(queue.qsize() for queue in queues):
+                        break
+                    # get the fragments from the queues
+                    data = [queue.get() for queue in queues]
+                    if not all(data):
+                        # one of the readers returned None
+                        # impossible to read segment
+                        finished = True
+                        break
+                    batch.append(data)
+                if not batch:
                     break
-                # actually decode the fragments into a segment
+
+                # actually decode the fragments into segments
                 if self.perfdata is not None:
                     ec_start = monotonic_time()
                 try:
-                    segment = self.storage_method.driver.decode(data)
+                    if self.decode_in_thread:
+                        segments = tpool.execute(self._decode_batch, batch)
+                    else:
+                        segments = self._decode_batch(batch)
                 except exceptions.ECError:
                     # something terrible happened
                     self.logger.exception(
@@ -352,7 +388,8 @@ class ECStream(object):
                         rawx_pdata['ec'] = rawx_pdata.get('ec', 0.0) \
                             + ec_end - ec_start
 
-                yield segment
+                for segment in segments:
+                    yield segment
 
     def _convert_range(self, req_start, req_end, length):
         try:
@@ -485,42 +522,56 @@ class ECStream(object):
         return self
 
 
-def ec_encode(storage_method, n):
+def ec_encode(storage_method, n, encode=None):
     """
-    Encode EC segments
+    Encode EC segments.
+
+    Segments are assembled in a preallocated buffer, and input data
+    which is aligned on segment boundaries is given to the driver as is.
+    Fragments are not joined: for each chunk, the generator yields the
+    list of fragments to write, or None if there is not enough data to
+    encode a full segment.
+
+    :param encode: function used to encode a segment,
+        defaults to the `encode` method of the storage method's driver
     """
     segment_size = storage_method.ec_segment_size
+    encode = encode or storage_method.driver.encode
 
-    buf = collections.deque()
-    total_len = 0
+    # the segment being assembled, reused for each segment
+    segment = bytearray(segment_size)
+    segment_view = memoryview(segment)
+    segment_len = 0
 
     data = yield
     while data:
-        buf.append(data)
-        total_len += len(data)
-
-        if total_len >= segment_size:
-            encode_result = []
-
-            while total_len >= segment_size:
-                # take data from buf
-                amount = segment_size
-                # the goal here is to encode a full segment
-                parts = []
-                while amount > 0:
-                    part = buf.popleft()
-                    if len(part) > amount:
-                        # too much data taken
-                        # put the extra data back into the buf
-                        buf.appendleft(part[amount:])
-                        part = part[:amount]
-                    parts.append(part)
-                    amount -= len(part)
-                    total_len -= len(part)
-                # let's encode!
-                encode_result.append(
-                    storage_method.driver.encode(b''.join(parts)))
-
+        data_len = len(data)
+        data_view = memoryview(data)
+        offset = 0
+        encode_result = []
+
+        while offset < data_len:
+            if segment_len == 0 and data_len - offset >= segment_size:
+                # a full segment is available in the input data,
+                # no need to copy it into the buffer
+                if data_len == segment_size and isinstance(data, bytes):
+                    encode_result.append(encode(data))
+                else:
+                    # the driver only accepts bytes
+                    encode_result.append(encode(
+                        data_view[offset:offset + segment_size].tobytes()))
+                offset += segment_size
+                continue
+            amount = min(segment_size - segment_len, data_len - offset)
+            segment_view[segment_len:segment_len + amount] = \
+                data_view[offset:offset + amount]
+            segment_len += amount
+            offset += amount
+            if segment_len == segment_size:
+                encode_result.append(encode(bytes(segment)))
+                segment_len = 0
+
+        if encode_result:
             # transform the result
             #
             # from:
@@ -529,26 +580,23 @@ def ec_encode(storage_method, n):
             #
             # to:
             #
-            # [(fragment_0_0 + fragment_0_1 + ...), # write to chunk 0
-            # [(fragment_1_0 + fragment_1_1 + ...), # write to chunk 1
-            # [(fragment_2_0 + fragment_2_1 + ...), # write to chunk 2
+            # [[fragment_0_0, fragment_0_1, ...], # write to chunk 0
+            #  [fragment_1_0, fragment_1_1, ...], # write to chunk 1
+            #  [fragment_2_0, fragment_2_1, ...], # write to chunk 2
             #  ...]
-
-            result = [b''.join(p) for p in zip(*encode_result)]
-            data = yield result
+            data = yield [list(p) for p in zip(*encode_result)]
         else:
             # not enough data to encode
             data = yield None
 
     # empty input data
     # which means end of stream
-    # encode what is left in the buf
-    whats_left = b''.join(buf)
-    if whats_left:
-        last_fragments = storage_method.driver.encode(whats_left)
+    # encode what is left in the buffer
+    if segment_len:
+        last_fragments = encode(segment_view[:segment_len].tobytes())
+        yield [[fragment] for fragment in last_fragments]
     else:
-        last_fragments = [b''] * n
-    yield last_fragments
+        yield [[] for _ in range(n)]
 
 
 class EcChunkWriter(object):
@@ -625,8 +673,8 @@ class EcChunkWriter(object):
         """Send coroutine loop"""
         self.conn.upload_start = None
         while not self.failed:
-            # fetch input data from the queue
-            data = self.queue.get()
+            # fetch input fragments from the queue
+            fragments = self.queue.get()
             # use HTTP transfer encoding chunked
             # to write data to RAWX
             try:
@@ -634,10 +682,14 @@ class EcChunkWriter(object):
                     if self.perfdata is not None \
                             and self.conn.upload_start is None:
                         self.conn.upload_start = monotonic_time()
-                    self.conn.send(b"%x\r\n" % len(data))
-                    self.conn.send(data)
+                    size = sum(len(fragment) for fragment in fragments)
+                    self.conn.send(b"%x\r\n" % size)
+                    # TCP_CORK is set on the connection, there is
+                    # no need to join the fragments before sending them
+                    for fragment in fragments:
+                        self.conn.send(fragment)
                     self.conn.send(b"\r\n")
-                    self.bytes_transferred += len(data)
+                    self.bytes_transferred += size
                 eventlet_yield()
             except (Exception, ChunkWriteTimeout) as exc:
                 self.failed = True
@@ -665,14 +717,18 @@ class EcChunkWriter(object):
         # Wait until the data is completely sent to continue
         self.queue.join()
 
-    def send(self, data):
+    def send(self, fragments):
+        """
+        Queue a list of fragments, to be sent as one block
+        of the chunked body.
+        """
         # do not send empty data because
         # this will end the chunked body
-        if not data:
+        if not any(fragments):
             return
-        # put the data to send into the queue
-        # it will be processed by the send coroutine
-        self.queue.put(data)
+        # put the fragments to send into the queue
+        # they will be processed by the send coroutine
+        self.queue.put(fragments)
 
     def finish(self, metachunk_size, metachunk_hash):
         """
@@ -743,8 +799,14 @@ class EcChunkWriter(object):
 class EcMetachunkWriter(io.MetachunkWriter):
     def __init__(self, sysmeta, meta_chunk, global_checksum, storage_method,
                  connection_timeout=None, write_timeout=None,
-                 read_timeout=None,
+                 read_timeout=None, ec_encode_in_thread=False,
                  **kwargs):
+        """
+        :param ec_encode_in_thread: encode segments in a native thread
+            (from eventlet's thread pool), so that other coroutines,
+            including the ones sending the previous fragments to the rawx
+            services, keep running while a segment is being encoded.
+        """
         kwargs.setdefault('chunk_buffer_min', storage_method.ec_segment_size)
         kwargs.setdefault('chunk_buffer_max', storage_method.ec_segment_size)
         super(EcMetachunkWriter, self).__init__(
@@ -759,8 +821,20 @@ class EcMetachunkWriter(io.MetachunkWriter):
         self.write_timeout = write_timeout or io.CHUNK_TIMEOUT
         self.read_timeout = read_timeout or io.CLIENT_TIMEOUT
         self.failed_chunks = list()
+        self.ec_encode_in_thread = ec_encode_in_thread
         self.logger = kwargs.get('logger', LOGGER)
 
+    @classmethod
+    def filter_kwargs(cls, kwargs):
+        filtered = super(EcMetachunkWriter, cls).filter_kwargs(kwargs)
+        if 'ec_encode_in_thread' in kwargs:
+            filtered['ec_encode_in_thread'] = kwargs['ec_encode_in_thread']
+        return filtered
+
+    def _encode_in_thread(self, segment):
+        """Encode a segment in a native thread."""
+        return tpool.execute(self.storage_method.driver.encode, segment)
+
     def stream(self, source, size):
         writers = self._get_writers()
 
@@ -811,11 +885,12 @@ class EcMetachunkWriter(io.MetachunkWriter):
             return current_writers
 
         for writer in writers:
-            fragment = fragments[writer.chunk['num']]
+            chunk_fragments = fragments[writer.chunk['num']]
             if not writer.failed:
                 if writer.checksum:
-                    writer.checksum.update(fragment)
-                writer.send(fragment)
+                    for fragment in chunk_fragments:
+                        writer.checksum.update(fragment)
+                writer.send(chunk_fragments)
             else:
                 current_writers.remove(writer)
                 self.failed_chunks.append(writer.chunk)
@@ -824,11 +899,29 @@ class EcMetachunkWriter(io.MetachunkWriter):
                             self.failed_chunks)
         return current_writers
 
+    def _aligned_buffer_size(self, bytes_transferred):
+        """
+        Return the size of the next read from the source.
+
+        When the buffer is at least as big as an EC segment, read only
+        what is missing to complete the current segment: this keeps reads
+        aligned on segment boundaries, and lets the encoder give them to
+        the driver without copying them.
+        """
+        buffer_size = self.buffer_size()
+        segment_size = self.storage_method.ec_segment_size
+        if buffer_size >= segment_size:
+            buffer_size -= bytes_transferred % segment_size
+        return buffer_size
+
     def _stream(self, source, size, writers):
         bytes_transferred = 0
 
         # create EC encoding generator
-        ec_stream = ec_encode(self.storage_method, len(self.meta_chunk))
+        ec_stream = ec_encode(
+            self.storage_method, len(self.meta_chunk),
+            encode=self._encode_in_thread if self.ec_encode_in_thread
+            else None)
         # init generator
         ec_stream.send(None)
 
@@ -854,7 +947,8 @@ class EcMetachunkWriter(io.MetachunkWriter):
                 curr_writers = writers
                 if size:
                     while True:
-                        buffer_size = self.buffer_size()
+                        buffer_size = self._aligned_buffer_size(
+                            bytes_transferred)
                         remaining_bytes = size - bytes_transferred
                         if buffer_size < remaining_bytes:
                             read_size = buffer_size
@@ -868,7 +962,8 @@ class EcMetachunkWriter(io.MetachunkWriter):
                                                             curr_writers)
                 else:
                     while True:
-                        data = read(self.buffer_size())
+                        data = read(
+                            self._aligned_buffer_size(bytes_transferred))
                         bytes_transferred += len(data)
                         if len(data) == 0:
                             break
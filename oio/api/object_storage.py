@@ -29,7 +29,9 @@ from oio.api.ec import ECWriteHandler
 from oio.api.io import MetachunkPreparer, LinkHandler
 from oio.api.replication import ReplicatedWriteHandler
 from oio.common.utils import cid_from_name, GeneratorIO, monotonic_time, \
-    depaginate, set_deadline_from_read_timeout, compute_perfdata_stats
+    depaginate, set_deadline_from_read_timeout, compute_perfdata_stats, \
+    grouper
+from oio.common.green import GreenPool, eventlet
 from oio.common.easy_value import float_value, true_value
 from oio.common.logger import get_logger
 from oio.common.decorators import ensure_headers, ensure_request_id, \
@@ -41,7 +43,8 @@ from oio.common.decorators import handle_account_not_found, \
 from oio.common.storage_functions import _sort_chunks, fetch_stream, \
     fetch_stream_ec
 from oio.common.fullpath import encode_fullpath
-from oio.common.cache import del_cached_object_metadata
+from oio.common.cache import del_cached_object_metadata, \
+    metadata_cache_from_conf
 
 
 class ObjectStorageApi(object):
@@ -61,7 +64,8 @@ class ObjectStorageApi(object):
     """
     EXTRA_KEYWORDS = ('chunk_checksum_algo', 'autocreate',
                       'chunk_buffer_min', 'chunk_buffer_max',
-                      'cache', 'tls')
+                      'ec_encode_in_thread', 'ec_decode_in_thread',
+                      'ec_readahead_segments', 'cache', 'tls')
 
     def __init__(self, namespace, logger=None, perfdata=None, **kwargs):
         """
@@ -86,9 +90,27 @@ class ObjectStorageApi(object):
         :keyword autocreate: if set, container will be created automatically.
             Default value is True.
         :type autocreate: `bool`
+        :keyword ec_encode_in_thread: if set, erasure coding of uploaded
+            data is done in native threads, and does not block other
+            coroutines. Default value is False.
+        :type ec_encode_in_thread: `bool`
+        :keyword ec_decode_in_thread: if set, erasure coded data is decoded
+            in native threads when downloading. Default value is False.
+        :type ec_decode_in_thread: `bool`
+        :keyword ec_readahead_segments: number of erasure coding segments
+            to read in advance from each chunk when downloading, and to
+            decode at once. Default value is 1.
+        :type ec_readahead_segments: `int`
         :keyword endpoint: network location of the oio-proxy to talk to.
         :type endpoint: `str`
         :keyword cache: dict-like object used as a cache for object metadata.
+        :keyword cache_size: if set and `cache` is not, build a
+            `oio.common.cache.MetadataCache` holding at most this number
+            of object and container metadata entries. `cache_max_bytes`,
+            `cache_ttl` and `cache_negative_ttl` are also recognized.
+            If `cache_path` is set, the cache is a memory-mapped file
+            shared by all processes using the same path.
+            See `oio.common.cache.metadata_cache_from_conf`.
         """
         self.namespace = namespace
         conf = {"namespace": self.namespace}
@@ -103,6 +125,10 @@ class ObjectStorageApi(object):
         for key in self.__class__.EXTRA_KEYWORDS:
             if key in kwargs:
                 self._global_kwargs[key] = kwargs[key]
+        if 'cache' not in self._global_kwargs:
+            cache = metadata_cache_from_conf(kwargs)
+            if cache is not None:
+                self._global_kwargs['cache'] = cache
         self.logger.debug("Global API parameters: %s", self._global_kwargs)
 
         from oio.account.client import AccountClient
@@ -348,7 +374,7 @@ class ObjectStorageApi(object):
     @ensure_request_id
     def container_list(self, account, limit=None, marker=None,
                        end_marker=None, prefix=None, delimiter=None,
-                       s3_buckets_only=False, **kwargs):
+                       s3_buckets_only=False, details=False, **kwargs):
         """
         Get the list of containers of an account.
 
@@ -363,6 +389,9 @@ class ObjectStorageApi(object):
         :keyword delimiter:
         :keyword s3_buckets_only: list only S3 buckets.
         :type s3_buckets_only: `bool`
+        :keyword details: append the whole description of each
+            container (as a `dict`) to its entry.
+        :type details: `bool`
         :type marker: `bool`
         :return: the list of containers of an account
         :rtype: `list` of items (`list`) with 5 fields:
@@ -376,6 +405,7 @@ class ObjectStorageApi(object):
                                            prefix=prefix,
                                            delimiter=delimiter,
                                            s3_buckets_only=s3_buckets_only,
+                                           details=details,
                                            **kwargs)
         return resp["listing"]
 
@@ -401,7 +431,8 @@ class ObjectStorageApi(object):
     @ensure_headers
     @ensure_request_id
     def container_snapshot(self, account, container, dst_account,
-                           dst_container, batch_size=100, **kwargs):
+                           dst_container, batch_size=100, concurrency=10,
+                           progress_callback=None, **kwargs):
         """
         Take a snapshot of a container.
 
@@ -415,6 +446,9 @@ class ObjectStorageApi(object):
         the number of objects hosted by the container. You should consider
         setting a long read_timeout on the request.
 
+        The chunks of `concurrency` objects are copied at the same time,
+        while the previous batch of chunks is saved in the snapshot.
+
         :param account: account in which the source container is.
         :type account: `str`
         :param container: name of the source container.
@@ -424,6 +458,10 @@ class ObjectStorageApi(object):
         :param dst_container: name of the new container (i.e. the snapshot).
         :type dst_container: `str`
         :keyword batch_size: number of chunks to copy at a time.
+        :keyword concurrency: number of objects whose chunks are copied
+            at the same time.
+        :keyword progress_callback: function called with the number of
+            objects already saved in the snapshot, after each batch.
         """
         try:
             self.container.container_freeze(account, container, **kwargs)
@@ -439,52 +477,108 @@ class ObjectStorageApi(object):
                 properties=False,
                 versions=True,
                 **kwargs)
+
+            def _located_objects():
+                # Locate the objects of the source container by batches.
+                # Errors must not be raised here (the pool would wait
+                # forever), but by the function processing the objects.
+                try:
+                    for objs in grouper(obj_gen, 100):
+                        located = self.object_locate_many(
+                            account, container,
+                            [(obj['name'], obj['version']) for obj in objs],
+                            properties=False, **kwargs)
+                        for obj, (_name, result) in zip(objs, located):
+                            yield obj, result
+                except Exception as err:
+                    yield None, err
+
+            def _snapshot_object(args):
+                obj, result = args
+                if isinstance(result, Exception):
+                    raise result
+                return self._snapshot_object(
+                    dst_account, dst_container, obj, result[0], result[1],
+                    **kwargs)
+
+            pool = GreenPool(concurrency)
+            # Pending update of the snapshot, number of objects it saves
+            update = None
+            nb_saved = 0
+            nb_objects = 0
             target_beans = []
             copy_beans = []
-            for obj in obj_gen:
-                obj_meta, chunks = self.object_locate(
-                    account, container, obj["name"], version=obj['version'],
-                    **kwargs)
-                fullpath = encode_fullpath(
-                    dst_account, dst_container, obj['name'], obj['version'],
-                    obj['content'])
-                storage_method = STORAGE_METHODS.load(obj['chunk_method'])
-                chunks_by_pos = _sort_chunks(chunks, storage_method.ec,
-                                             logger=self.logger)
-                handler = LinkHandler(
-                    fullpath, chunks_by_pos, storage_method,
-                    self.blob_client, policy=obj_meta['policy'],
-                    **kwargs)
-                try:
-                    chunks_copies = handler.link()
-                except exc.UnfinishedUploadException as ex:
-                    self.logger.warn(
-                        'Failed to upload all data (%s), deleting chunks',
-                        ex.exception)
-                    kwargs['cid'] = obj['container_id']
-                    self._delete_orphan_chunks(
-                        ex.chunks_already_uploaded, **kwargs)
-                    ex.reraise()
-                t_beans, c_beans = self._prepare_meta2_raw_update(
-                    chunks, chunks_copies, obj['content'])
+            for t_beans, c_beans in pool.imap(_snapshot_object,
+                                              _located_objects()):
                 target_beans.extend(t_beans)
                 copy_beans.extend(c_beans)
+                nb_objects += 1
                 if len(target_beans) > batch_size:
-                    self.container.container_raw_update(
+                    # Save the previous batch before sending the next one,
+                    # keep copying chunks in the meantime.
+                    if update is not None:
+                        update.wait()
+                        self._snapshot_progress(
+                            dst_account, dst_container, nb_saved,
+                            progress_callback)
+                    update = eventlet.spawn(
+                        self.container.container_raw_update,
                         target_beans, copy_beans,
                         dst_account, dst_container,
                         frozen=True, **kwargs)
+                    nb_saved = nb_objects
                     target_beans = []
                     copy_beans = []
+            if update is not None:
+                update.wait()
             if target_beans:
                 self.container.container_raw_update(
                     target_beans, copy_beans,
                     dst_account, dst_container,
                     frozen=True, **kwargs)
+            self._snapshot_progress(dst_account, dst_container, nb_objects,
+                                    progress_callback)
             self.container.container_touch(dst_account, dst_container)
         finally:
             self.container.container_enable(account, container, **kwargs)
 
+    def _snapshot_object(self, dst_account, dst_container, obj, obj_meta,
+                         chunks, **kwargs):
+        """
+        Copy (link) the chunks of an object for a snapshot.
+
+        :returns: the lists of original and replacement chunk beans,
+            to be used as input for `container_raw_update`.
+        """
+        fullpath = encode_fullpath(
+            dst_account, dst_container, obj['name'], obj['version'],
+            obj['content'])
+        storage_method = STORAGE_METHODS.load(obj['chunk_method'])
+        chunks_by_pos = _sort_chunks(chunks, storage_method.ec,
+                                     logger=self.logger)
+        handler = LinkHandler(
+            fullpath, chunks_by_pos, storage_method,
+            self.blob_client, policy=obj_meta['policy'],
+            **kwargs)
+        try:
+            chunks_copies = handler.link()
+        except exc.UnfinishedUploadException as ex:
+            self.logger.warn(
+                'Failed to upload all data (%s), deleting chunks',
+                ex.exception)
+            self._delete_orphan_chunks(
+                ex.chunks_already_uploaded, obj['container_id'], **kwargs)
+            ex.reraise()
+        return self._prepare_meta2_raw_update(
+            chunks, chunks_copies, obj['content'])
+
+    def _snapshot_progress(self, dst_account, dst_container, nb_objects,
+                           progress_callback=None):
+        self.logger.debug('Snapshot %s/%s: %d objects saved',
+                          dst_account, dst_container, nb_objects)
+        if progress_callback is not None:
+            progress_callback(nb_objects)
+
     @handle_container_not_found
     @patch_kwargs
     @ensure_headers
@@ -1005,6 +1099,36 @@ class ObjectStorageApi(object):
             return obj_meta, chunks
         return obj_meta, _fetch_ext_info(chunks)
 
+    def object_locate_many(self, account, container, objs,
+                           properties=True, **kwargs):
+        """
+        Get a description of several objects of a container, along with
+        the list of their chunks, with as few requests as possible.
+
+        :param objs: names of the objects, or (name, version) tuples
+        :param properties: should the request return object properties
+            along with content description
+        :type properties: `bool`
+        :keyword batch_size: number of objects per request
+        :returns: a list of tuples with the name of the object and either
+            a tuple with object metadata `dict` and chunk `list`,
+            or the exception raised while locating the object
+            (`NoSuchObject`, `NoSuchContainer`...),
+            in the same order as `objs`
+        """
+        results = list()
+        for obj, result in self.container.content_locate_many(
+                account, container, objs, properties=properties, **kwargs):
+            if isinstance(result, exc.NotFound):
+                if result.status in (406, 431):
+                    result = exc.NoSuchContainer(
+                        "Container '%s' does not exist." % container)
+                else:
+                    result = exc.NoSuchObject(
+                        "Object '%s' does not exist." % obj)
+            results.append((obj, result))
+        return results
+
     def object_analyze(self, *args, **kwargs):
         """
         :deprecated: use `object_locate`
@@ -1476,39 +1600,92 @@ class ObjectStorageApi(object):
     @patch_kwargs
     @ensure_headers
     @ensure_request_id
-    def account_refresh(self, account=None, **kwargs):
+    def account_refresh(self, account=None, concurrency=1,
+                        account_concurrency=1, max_rate=0, marker=None,
+                        progress_callback=None, **kwargs):
         """
         Refresh counters of an account.
 
         :param account: name of the account to refresh,
             or None to refresh all accounts (slow)
         :type account: `str`
+        :keyword concurrency: number of containers of each account
+            refreshed in parallel
+        :type concurrency: `int`
+        :keyword account_concurrency: number of accounts refreshed
+            in parallel
+        :type account_concurrency: `int`
+        :keyword max_rate: maximum number of containers refreshed
+            per second (0 means no limit)
+        :type max_rate: `float`
+        :keyword marker: when refreshing all accounts, skip the accounts
+            whose name is lower than or equal to the marker
+        :type marker: `str`
+        :keyword progress_callback: called with the name of each account
+            once this account and all the previous ones (in lexical order)
+            have been refreshed: it can be used as the marker to resume
+            an interrupted refresh.
         """
         if account is None:
-            accounts = self.account_list(**kwargs)
+            accounts = sorted(acct for acct in self.account_list(**kwargs)
+                              if marker is None or acct > marker)
         else:
             accounts = [account]
 
-        for account in accounts:
-            try:
-                self.account.account_refresh(account, **kwargs)
+        # The time slot of the next container refresh,
+        # shared by all accounts.
+        next_slot = [0.0]
 
-                containers = depaginate(
-                    self.container_list,
-                    item_key=lambda x: x[0],
-                    marker_key=lambda x: x[-1][0],
-                    account=account,
-                    **kwargs)
-                for container in containers:
-                    try:
-                        self.container_refresh(account, container, **kwargs)
-                    except exc.NoSuchContainer:
-                        # container remove in the meantime
-                        pass
-            except exc.NoSuchAccount:
-                # account remove in the meantime
+        def _throttle():
+            if max_rate <= 0:
+                return
+            now = time.time()
+            slot = max(now, next_slot[0])
+            next_slot[0] = slot + 1.0 / max_rate
+            if slot > now:
+                eventlet.sleep(slot - now)
+
+        def _refresh_account(account):
+            self._account_refresh(account, concurrency, _throttle, **kwargs)
+            return account
+
+        pool = GreenPool(max(1, account_concurrency))
+        # Results are yielded in the order of the accounts
+        for account in pool.imap(_refresh_account, accounts):
+            if progress_callback is not None:
+                progress_callback(account)
+
+    def _account_refresh(self, account, concurrency, throttle, **kwargs):
+        """
+        Refresh the counters of an account, then all its containers,
+        `concurrency` at a time.
+        """
+        def _refresh_container(container):
+            throttle()
+            try:
+                self.container_refresh(account, container, **kwargs)
+            except exc.NoSuchContainer:
+                # container remove in the meantime
                 pass
 
+        try:
+            self.account.account_refresh(account, **kwargs)
+            containers = depaginate(
+                self.container_list,
+                item_key=lambda x: x[0],
+                marker_key=lambda x: x[-1][0],
+                account=account,
+                **kwargs)
+            pool = GreenPool(max(1, concurrency))
+            # Consume the listing here: an exception raised by the input
+            # of imap would never reach us.
+            for batch in grouper(containers, 1000):
+                for _ in pool.imap(_refresh_container, batch):
+                    pass
+        except exc.NoSuchAccount:
+            # account remove in the meantime
+            pass
+
     def all_accounts_refresh(self, **kwargs):
         """
         :deprecated: call `account_refresh(None)` instead
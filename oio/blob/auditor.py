@@ -13,25 +13,28 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library.
 
-from oio.common.green import ratelimit
+from oio.common.green import ratelimit, eventlet, tpool, LightQueue, \
+    Semaphore
 
 from contextlib import closing
 from string import hexdigits
 import hashlib
+import os
 import zlib
 import time
 
+from oio.blob.checkpoint import volume_checkpoint_from_conf
 from oio.blob.utils import check_volume, read_chunk_metadata
 from oio.container.client import ContainerClient
 from oio.common.daemon import Daemon
 from oio.common import exceptions as exc
-from oio.common.utils import paths_gen
 from oio.common.easy_value import int_value
 from oio.common.logger import get_logger
 from oio.common.constants import STRLEN_CHUNKID
 
 
 SLEEP_TIME = 30
+READ_BUFFER_SIZE = 1024 * 1024
 
 
 class BlobAuditorWorker(object):
@@ -48,6 +51,8 @@ class BlobAuditorWorker(object):
         self.last_reported = 0
         self.chunks_run_time = 0
         self.bytes_running_time = 0
+        # Shared by the readers: the byte rate is limited for all of them
+        self.bytes_lock = Semaphore(1)
         self.bytes_processed = 0
         self.total_bytes_processed = 0
         self.total_chunks_processed = 0
@@ -57,7 +62,17 @@ class BlobAuditorWorker(object):
             conf.get('chunks_per_second'), 30)
         self.max_bytes_per_second = int_value(
             conf.get('bytes_per_second'), 10000000)
+        # Number of chunks read at the same time
+        self.concurrency = int_value(conf.get('concurrency'), 1)
+        self.read_buffer_size = int_value(
+            conf.get('read_buffer_size'), READ_BUFFER_SIZE)
+        # Number of chunks to gather before checking them against
+        # the metadata of their contents
+        self.metadata_batch_size = int_value(
+            conf.get('metadata_batch_size'), 256)
         self.container_client = ContainerClient(conf, logger=self.logger)
+        self.checkpoint = volume_checkpoint_from_conf(conf, self.volume,
+                                                      logger=self.logger)
 
     def audit_pass(self):
         self.namespace, self.address = check_volume(self.volume)
@@ -70,11 +85,12 @@ class BlobAuditorWorker(object):
         total_faulty = 0
         audit_time = 0
 
-        paths = paths_gen(self.volume)
+        self.checkpoint.start_pass()
+        paths = self.audit_chunks()
 
         for path in paths:
             loop_time = time.time()
-            self.safe_chunk_audit(path)
+            self.checkpoint.done(path)
             self.chunks_run_time = ratelimit(
                 self.chunks_run_time,
                 self.max_chunks_per_second
@@ -121,6 +137,7 @@ class BlobAuditorWorker(object):
                 self.bytes_processed = 0
                 self.last_reported = now
             audit_time += (now - loop_time)
+        self.checkpoint.end_pass()
         elapsed = (time.time() - start_time) or 0.000001
         self.logger.info(
             '%(elapsed).02f '
@@ -144,18 +161,27 @@ class BlobAuditorWorker(object):
             }
         )
 
-    def safe_chunk_audit(self, path):
+    def _chunk_id_from_path(self, path):
+        """Get the chunk ID from the path, or None if not a chunk."""
         chunk_id = path.rsplit('/', 1)[-1]
         # TODO(FVE): if ".pending" suffix, check for stale upload
         if len(chunk_id) != STRLEN_CHUNKID:
             self.logger.warn('WARN Not a chunk %s' % path)
-            return
+            return None
         for c in chunk_id:
             if c not in hexdigits:
                 self.logger.warn('WARN Not a chunk %s' % path)
-                return
+                return None
+        return chunk_id
+
+    def _safe_audit(self, path, func, *args):
+        """
+        Call `func` with `args`, count and log the errors.
+
+        :returns: the result of `func`, or None in case of error
+        """
         try:
-            self.chunk_audit(path, chunk_id)
+            return func(*args)
         except exc.FaultyChunk as err:
             self.faulty_chunks += 1
             self.logger.error('ERROR faulty chunk %s: %s', path, err)
@@ -168,18 +194,234 @@ class BlobAuditorWorker(object):
         except Exception:
             self.errors += 1
             self.logger.exception('ERROR while auditing chunk %s', path)
+        return None
 
+    def safe_chunk_audit(self, path):
+        chunk_id = self._chunk_id_from_path(path)
+        if not chunk_id:
+            return
+        self._safe_audit(path, self.chunk_audit, path, chunk_id)
         self.passes += 1
 
+    def audit_chunks(self):
+        """
+        Audit all the chunks of the volume, with a pipeline:
+        - a green thread walks through the volume,
+        - `concurrency` green threads read the chunks (in native threads)
+          and check their data,
+        - the chunks are checked against the metadata of their contents
+          by batches, with one request per batch of contents of a same
+          container.
+
+        Yield the path of each chunk, once audited.
+        """
+        paths = LightQueue(self.concurrency * 4)
+        # Bounded too: the chunks are read no faster than they are
+        # consumed (and rate limited) by the caller.
+        read_chunks = LightQueue(self.concurrency * 4)
+        walk_errors = list()
+
+        def _walk():
+            try:
+                for path in self.checkpoint.walk():
+                    chunk_id = self._chunk_id_from_path(path)
+                    if chunk_id:
+                        paths.put((path, chunk_id))
+                    else:
+                        self.checkpoint.done(path)
+            except Exception as err:
+                # Raised by the consumer, once the readers are stopped
+                walk_errors.append(err)
+            for _ in range(self.concurrency):
+                paths.put(None)
+
+        def _read():
+            # Each reader has its own buffer
+            buf = bytearray(self.read_buffer_size)
+            while True:
+                item = paths.get()
+                if item is None:
+                    read_chunks.put(None)
+                    return
+                path, chunk_id = item
+                meta = self._safe_audit(path, self._read_chunk_in_thread,
+                                        path, chunk_id, buf)
+                read_chunks.put((path, meta))
+
+        walker = eventlet.spawn(_walk)
+        readers = [eventlet.spawn(_read) for _ in range(self.concurrency)]
+        try:
+            pending = dict()
+            nb_pending = 0
+            running = self.concurrency
+            while running:
+                item = read_chunks.get()
+                if item is None:
+                    running -= 1
+                    continue
+                path, meta = item
+                if meta is None:
+                    self.passes += 1
+                    yield path
+                    continue
+                key = (meta['container_id'], meta['content_id'])
+                pending.setdefault(key, list()).append((path, meta))
+                nb_pending += 1
+                if nb_pending >= self.metadata_batch_size:
+                    for path in self._check_chunks_metadata(pending):
+                        yield path
+                    pending = dict()
+                    nb_pending = 0
+            if walk_errors:
+                raise walk_errors[0]
+            for path in self._check_chunks_metadata(pending):
+                yield path
+        finally:
+            walker.kill()
+            for reader in readers:
+                reader.kill()
+
+    def _read_chunk_in_thread(self, path, chunk_id, buf):
+        meta, bytes_read = tpool.execute(self.read_chunk, path, chunk_id, buf)
+        self._bytes_ratelimit(bytes_read)
+        self.bytes_processed += bytes_read
+        self.total_bytes_processed += bytes_read
+        return meta
+
+    def _bytes_ratelimit(self, nb_bytes):
+        # ratelimit() sleeps before updating the running time:
+        # concurrent readers must wait for their turn.
+        with self.bytes_lock:
+            self.bytes_running_time = ratelimit(
+                self.bytes_running_time,
+                self.max_bytes_per_second,
+                increment=nb_bytes)
+
+    def read_chunk(self, path, chunk_id, buf):
+        """
+        Read a chunk and check its data, using `buf` as read buffer.
+        Does not involve any green thread (can be run in a native thread).
+
+        :returns: the metadata of the chunk, and the number of bytes read
+        """
+        with open(path, 'rb') as chunk_file:
+            fadvise = getattr(os, 'posix_fadvise', None)
+            if fadvise:
+                fadvise(chunk_file.fileno(), 0, 0,
+                        os.POSIX_FADV_SEQUENTIAL)
+            meta = self._chunk_metadata(chunk_file, chunk_id)
+            reader = ChunkReader(chunk_file, int(meta['chunk_size']),
+                                 meta['chunk_hash'].lower(),
+                                 compression=meta.get("compression", ""),
+                                 buf=buf)
+            with closing(reader):
+                for _ in reader:
+                    pass
+            if fadvise:
+                # Do not pollute the page cache
+                fadvise(chunk_file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        return meta, reader.bytes_read
+
+    def _locate_contents(self, container_id, contents):
+        """
+        Locate contents of a container, with one request per batch
+        of contents whose name and version are known.
+
+        :param contents: a list of (content ID, chunk metadata) tuples
+        :returns: a list with, for each content, its list of chunks,
+            None if it does not exist, or the exception raised
+            while locating it
+        """
+        results = [None] * len(contents)
+        indexes = list()
+        paths = list()
+        for index, (content_id, meta) in enumerate(contents):
+            if meta.get('content_path') and meta.get('content_version'):
+                indexes.append(index)
+                paths.append((meta['content_path'], meta['content_version']))
+                continue
+            try:
+                _obj_meta, results[index] = \
+                    self.container_client.content_locate(
+                        cid=container_id, content=content_id,
+                        properties=False)
+            except exc.NotFound:
+                pass
+            except Exception as err:
+                results[index] = err
+        if not paths:
+            return results
+
+        try:
+            located = self.container_client.content_locate_many(
+                cid=container_id, paths=paths, properties=False)
+        except Exception as err:
+            located = [(path, err) for path in paths]
+        for index, (_path, result) in zip(indexes, located):
+            if isinstance(result, exc.NotFound):
+                continue
+            if isinstance(result, Exception):
+                results[index] = result
+                continue
+            obj_meta, data = result
+            # Another content may have been created with the same name
+            if obj_meta.get('id') == contents[index][0]:
+                results[index] = data
+        return results
+
+    def _check_chunks_metadata(self, chunks_by_content):
+        """
+        Check chunks against the metadata of their contents,
+        with one request per batch of contents of a same container.
+
+        Yield the path of each chunk, once checked.
+        """
+        contents_by_container = dict()
+        for (container_id, content_id), chunks in chunks_by_content.items():
+            contents_by_container.setdefault(container_id, list()).append(
+                (content_id, chunks))
+        for container_id, contents in contents_by_container.items():
+            located = self._locate_contents(
+                container_id,
+                [(content_id, chunks[0][1])
+                 for content_id, chunks in contents])
+            for (content_id, chunks), data in zip(contents, located):
+                if isinstance(data, Exception):
+                    self.errors += len(chunks)
+                    self.passes += len(chunks)
+                    self.logger.error(
+                        'ERROR while locating content %s/%s: %s',
+                        container_id, content_id, data)
+                    for path, _meta in chunks:
+                        yield path
+                    continue
+                for path, meta in chunks:
+                    if data is None:
+                        self._safe_audit(path, self._raise_orphan)
+                    else:
+                        self._safe_audit(path, self.chunk_meta_audit,
+                                         meta, data)
+                    self.passes += 1
+                    yield path
+
+    @staticmethod
+    def _raise_orphan():
+        raise exc.OrphanChunk('Chunk not found in container')
+
     def chunk_audit(self, path, chunk_id):
         with open(path, 'rb') as chunk_file:
             return self.chunk_file_audit(chunk_file, chunk_id)
 
-    def chunk_file_audit(self, chunk_file, chunk_id):
+    @staticmethod
+    def _chunk_metadata(chunk_file, chunk_id):
         try:
             meta, _ = read_chunk_metadata(chunk_file, chunk_id)
         except exc.MissingAttribute as err:
             raise exc.FaultyChunk(err)
+        return meta
+
+    def chunk_file_audit(self, chunk_file, chunk_id):
+        meta = self._chunk_metadata(chunk_file, chunk_id)
         size = int(meta['chunk_size'])
         md5_checksum = meta['chunk_hash'].lower()
         reader = ChunkReader(chunk_file, size, md5_checksum,
@@ -187,10 +429,7 @@ class BlobAuditorWorker(object):
         with closing(reader):
             for buf in reader:
                 buf_len = len(buf)
-                self.bytes_running_time = ratelimit(
-                    self.bytes_running_time,
-                    self.max_bytes_per_second,
-                    increment=buf_len)
+                self._bytes_ratelimit(buf_len)
                 self.bytes_processed += buf_len
                 self.total_bytes_processed += buf_len
 
@@ -199,32 +438,37 @@ class BlobAuditorWorker(object):
             content_id = meta['content_id']
             _obj_meta, data = self.container_client.content_locate(
                 cid=container_id, content=content_id, properties=False)
-
-            # Check chunk data
-            chunk_data = None
-            metachunks = set()
-            for c in data:
-                if c['url'].endswith(meta['chunk_id']):
-                    metachunks.add(c['pos'].split('.', 2)[0])
-                    chunk_data = c
-            if not chunk_data:
-                raise exc.OrphanChunk('Not found in content')
-
-            metachunk_size = meta.get('metachunk_size')
-            if metachunk_size is not None \
-                    and chunk_data['size'] != int(metachunk_size):
-                raise exc.FaultyChunk('Invalid metachunk size found')
-
-            metachunk_hash = meta.get('metachunk_hash')
-            if metachunk_hash is not None \
-                    and chunk_data['hash'] != meta['metachunk_hash']:
-                raise exc.FaultyChunk('Invalid metachunk hash found')
-
-            if chunk_data['pos'] != meta['chunk_pos']:
-                raise exc.FaultyChunk('Invalid chunk position found')
-
         except exc.NotFound:
             raise exc.OrphanChunk('Chunk not found in container')
+        self.chunk_meta_audit(meta, data)
+
+    def chunk_meta_audit(self, meta, data):
+        """
+        Check the metadata of a chunk against the list of chunks
+        of its content.
+        """
+        # Check chunk data
+        chunk_data = None
+        metachunks = set()
+        for c in data:
+            if c['url'].endswith(meta['chunk_id']):
+                metachunks.add(c['pos'].split('.', 2)[0])
+                chunk_data = c
+        if not chunk_data:
+            raise exc.OrphanChunk('Not found in content')
+
+        metachunk_size = meta.get('metachunk_size')
+        if metachunk_size is not None \
+                and chunk_data['size'] != int(metachunk_size):
+            raise exc.FaultyChunk('Invalid metachunk size found')
+
+        metachunk_hash = meta.get('metachunk_hash')
+        if metachunk_hash is not None \
+                and chunk_data['hash'] != meta['metachunk_hash']:
+            raise exc.FaultyChunk('Invalid metachunk hash found')
+
+        if chunk_data['pos'] != meta['chunk_pos']:
+            raise exc.FaultyChunk('Invalid chunk position found')
 
 
 class BlobAuditor(Daemon):
@@ -260,8 +504,16 @@ class BlobAuditor(Daemon):
 
 
 class ChunkReader(object):
-    def __init__(self, fp, size, md5_checksum, compression=None):
+    """
+    Read a chunk and check its size and checksum.
+
+    :param buf: if set, read the chunk into this buffer, and yield
+        views of it (which are valid until the next iteration)
+    """
+
+    def __init__(self, fp, size, md5_checksum, compression=None, buf=None):
         self.fp = fp
+        self.buf = buf
         self.decompressor = None
         self.error = None
         if compression and compression not in ('off', ):
@@ -278,8 +530,12 @@ class ChunkReader(object):
 
     def __iter__(self):
         self.iter_md5 = hashlib.md5()
+        view = memoryview(self.buf) if self.buf is not None else None
         while True:
-            buf = self.fp.read()
+            if view is not None:
+                buf = view[:self.fp.readinto(view)]
+            else:
+                buf = self.fp.read()
             if buf and self.decompressor:
                 try:
                     buf = self.decompressor.decompress(buf)
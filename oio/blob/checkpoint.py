@@ -0,0 +1,201 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+import errno
+import os
+import time
+from collections import OrderedDict
+
+from oio.common.easy_value import boolean_value, float_value
+from oio.common.json import json
+
+
+class VolumeCheckpoint(object):
+    """
+    Walk through the chunks of a volume, subdirectory by subdirectory,
+    in lexical order, and keep track of the progress.
+
+    The progress is saved (if `path` is set) in a JSON file:
+    - the last subdirectory whose files have all been processed,
+    - the start time of the current pass,
+    - the start time of the last complete pass.
+
+    A pass interrupted (by a restart) resumes after the last subdirectory
+    processed. In incremental mode, files whose mtime and ctime are older
+    than the start of the last complete pass are skipped.
+    """
+
+    def __init__(self, volume, path=None, interval=60.0, incremental=False,
+                 logger=None):
+        self.volume = volume.rstrip(os.sep)
+        self.path = path
+        self.interval = interval
+        self.incremental = incremental
+        self.logger = logger
+        self.marker = None
+        self.pass_start = None
+        self.last_pass_start = None
+        self.last_save = 0.0
+        # Subdirectory -> [number of files not processed yet, all yielded]
+        self._dirs = OrderedDict()
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r') as fd:
+                state = json.load(fd)
+        except IOError as err:
+            if err.errno != errno.ENOENT:
+                raise
+            return
+        except ValueError as err:
+            if self.logger:
+                self.logger.warn('Ignoring invalid checkpoint %s: %s',
+                                 self.path, err)
+            return
+        self.marker = state.get('marker')
+        self.pass_start = state.get('pass_start')
+        self.last_pass_start = state.get('last_pass_start')
+
+    def save(self):
+        self.last_save = time.time()
+        if not self.path:
+            return
+        state = {'volume': self.volume,
+                 'marker': self.marker,
+                 'pass_start': self.pass_start,
+                 'last_pass_start': self.last_pass_start}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as fd:
+            json.dump(state, fd)
+            fd.flush()
+            os.fsync(fd.fileno())
+        os.rename(tmp_path, self.path)
+
+    def start_pass(self):
+        """Start a new pass, or resume the interrupted one."""
+        self.load()
+        self._dirs.clear()
+        if self.pass_start is not None and self.marker is not None:
+            if self.logger:
+                self.logger.info(
+                    'Resuming pass started at %s after %s',
+                    time.ctime(self.pass_start), self.marker)
+        else:
+            self.marker = None
+            self.pass_start = time.time()
+        self.save()
+
+    def end_pass(self):
+        """Record the end of a complete pass."""
+        self.last_pass_start = self.pass_start
+        self.pass_start = None
+        self.marker = None
+        self.save()
+
+    def _subdir(self, path):
+        return os.path.relpath(os.path.dirname(path), self.volume)
+
+    @staticmethod
+    def _join(subdir, name):
+        if subdir == os.curdir:
+            return name
+        return os.path.join(subdir, name)
+
+    @staticmethod
+    def _key(subdir):
+        """
+        Sort key of a subdirectory: the order of the keys is the order
+        of the walk (a directory, then its subdirectories, recursively).
+        """
+        if subdir == os.curdir:
+            return ()
+        return tuple(subdir.split(os.sep))
+
+    def _is_done(self, subdir):
+        """Tell if the files of the subdirectory have been processed."""
+        return self.marker is not None \
+            and self._key(subdir) <= self._key(self.marker)
+
+    def _is_parent(self, subdir):
+        """Tell if the subdirectory is the marker or one of its parents."""
+        key = self._key(subdir)
+        return self._key(self.marker)[:len(key)] == key
+
+    def walk(self):
+        """
+        Yield the path of the files of the volume which have not been
+        processed yet. `done()` must be called for each of them.
+        """
+        marker = self.marker
+        min_time = self.last_pass_start if self.incremental else None
+        for root, dirs, files in os.walk(self.volume):
+            subdir = os.path.relpath(root, self.volume)
+            dirs.sort()
+            if marker is not None:
+                # Keep the marker and its parents (their subdirectories
+                # may not have been processed), skip the others
+                # subdirectories already processed.
+                dirs[:] = [d for d in dirs
+                           if not self._is_done(self._join(subdir, d))
+                           or self._is_parent(self._join(subdir, d))]
+            if self._is_done(subdir):
+                continue
+            progress = self._dirs[subdir] = [0, False]
+            for name in files:
+                path = os.path.join(root, name)
+                if min_time is not None:
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    if max(stat.st_mtime, stat.st_ctime) < min_time:
+                        continue
+                progress[0] += 1
+                yield path
+            progress[1] = True
+            self._advance()
+
+    def done(self, path):
+        """Tell the file has been processed."""
+        progress = self._dirs.get(self._subdir(path))
+        if progress is None:
+            return
+        progress[0] -= 1
+        if progress[1] and progress[0] <= 0:
+            self._advance()
+
+    def _advance(self):
+        while self._dirs:
+            subdir, (pending, walked) = next(iter(self._dirs.items()))
+            if pending > 0 or not walked:
+                break
+            self._dirs.popitem(last=False)
+            self.marker = subdir
+        if time.time() - self.last_save >= self.interval:
+            self.save()
+
+
+def volume_checkpoint_from_conf(conf, volume, logger=None):
+    """
+    Build a `VolumeCheckpoint` from the configuration of a daemon:
+    'checkpoint_path', 'checkpoint_interval' and 'incremental'.
+    """
+    return VolumeCheckpoint(
+        volume, path=conf.get('checkpoint_path'),
+        interval=float_value(conf.get('checkpoint_interval'), 60.0),
+        incremental=boolean_value(conf.get('incremental'), False),
+        logger=logger)
@@ -20,6 +20,7 @@ from datetime import datetime
 from random import random
 from string import hexdigits
 
+from oio.blob.checkpoint import volume_checkpoint_from_conf
 from oio.blob.utils import check_volume, read_chunk_metadata
 from oio.rdir.client import RdirClient
 from oio.common.daemon import Daemon
@@ -29,7 +30,7 @@ from oio.common.constants import STRLEN_CHUNKID, CHUNK_SUFFIX_PENDING, \
 from oio.common.easy_value import int_value
 from oio.common.http_urllib3 import get_pool_manager
 from oio.common.logger import get_logger
-from oio.common.utils import paths_gen, request_id
+from oio.common.utils import request_id
 
 
 class BlobIndexer(Daemon):
@@ -57,6 +58,8 @@ class BlobIndexer(Daemon):
         self.index_client = RdirClient(conf, logger=self.logger,
                                        pool_manager=pm)
         self.namespace, self.volume_id = check_volume(self.volume)
+        self.checkpoint = volume_checkpoint_from_conf(conf, self.volume,
+                                                      logger=self.logger)
 
     def safe_update_index(self, path):
         chunk_id = path.rsplit('/', 1)[-1]
@@ -128,10 +131,12 @@ class BlobIndexer(Daemon):
         self.errors = 0
         self.successes = 0
 
-        paths = paths_gen(self.volume)
+        self.checkpoint.start_pass()
+        paths = self.checkpoint.walk()
         self.report('started', start_time)
         for path in paths:
             self.safe_update_index(path)
+            self.checkpoint.done(path)
             self.chunks_run_time = ratelimit(
                 self.chunks_run_time,
                 self.max_chunks_per_second
@@ -139,6 +144,7 @@ class BlobIndexer(Daemon):
             now = time.time()
             if now - self.last_reported >= self.report_interval:
                 self.report('running', start_time)
+        self.checkpoint.end_pass()
         self.report('ended', start_time)
 
     def update_index(self, path, chunk_id):
@@ -17,13 +17,14 @@ from string import hexdigits
 
 from oio.common.green import ratelimit, time, GreenPool
 
+from oio.blob.checkpoint import volume_checkpoint_from_conf
 from oio.blob.client import BlobClient
 from oio.blob.utils import check_volume, read_chunk_metadata
 from oio.common.exceptions import ContentNotFound
 from oio.container.client import ContainerClient
 from oio.common.daemon import Daemon
 from oio.common import exceptions as exc
-from oio.common.utils import paths_gen, statfs, cid_from_name
+from oio.common.utils import statfs, cid_from_name
 from oio.common.easy_value import int_value, true_value
 from oio.common.logger import get_logger
 from oio.common.constants import STRLEN_CHUNKID
@@ -70,6 +71,8 @@ class BlobMoverWorker(object):
         self.excluded_rawx = \
             [rawx for rawx in conf.get('excluded_rawx', '').split(',') if rawx]
         self.fake_excluded_chunks = self._generate_fake_excluded_chunks()
+        self.checkpoint = volume_checkpoint_from_conf(conf, self.volume,
+                                                      logger=self.logger)
 
     def _generate_fake_excluded_chunks(self):
         conscience_client = ConscienceClient(self.conf, logger=self.logger)
@@ -96,7 +99,9 @@ class BlobMoverWorker(object):
 
         pool = GreenPool(self.concurrency)
 
-        paths = paths_gen(self.volume)
+        self.checkpoint.start_pass()
+        paths = self.checkpoint.walk()
+        complete = True
 
         for path in paths:
             loop_time = time.time()
@@ -109,12 +114,13 @@ class BlobMoverWorker(object):
                     self.logger.info(
                         'current usage %.2f%%: target reached (%.2f%%)', usage,
                         self.usage_target)
+                    complete = False
                     break
                 self.last_usage_check = now
 
             # Spawn a chunk move task.
             # The call will block if no green thread is available.
-            pool.spawn_n(self.safe_chunk_move, path)
+            pool.spawn_n(self._safe_chunk_move_checkpoint, path)
 
             self.chunks_run_time = ratelimit(
                 self.chunks_run_time,
@@ -150,8 +156,11 @@ class BlobMoverWorker(object):
                 self.last_reported = now
             mover_time += (now - loop_time)
             if self.limit != 0 and self.total_chunks_processed >= self.limit:
+                complete = False
                 break
         pool.waitall()
+        if complete:
+            self.checkpoint.end_pass()
         elapsed = (time.time() - start_time) or 0.000001
         self.logger.info(
             '%(elapsed).02f '
@@ -169,6 +178,12 @@ class BlobMoverWorker(object):
             }
         )
 
+    def _safe_chunk_move_checkpoint(self, path):
+        try:
+            self.safe_chunk_move(path)
+        finally:
+            self.checkpoint.done(path)
+
     def safe_chunk_move(self, path):
         chunk_id = path.rsplit('/', 1)[-1]
         if len(chunk_id) != STRLEN_CHUNKID:
@@ -22,7 +22,7 @@ from oio.common.exceptions import OioException, OrphanChunk, RetryLater
 from oio.common.green import time
 from oio.common.tool import Tool, ToolWorker
 from oio.event.evob import EventTypes
-from oio.rdir.client import RdirClient
+from oio.rdir.client import RDIR_FETCH_MAX_LIMIT, RdirClient
 
 
 class BlobRebuilder(Tool):
@@ -139,7 +139,7 @@ class BlobRebuilder(Tool):
     def _fetch_items_from_rawx_id(self):
         lost_chunks = self.rdir_client.chunk_fetch(
             self.rawx_id, limit=self.rdir_fetch_limit, rebuild=True,
-            full_urls=True,
+            max_limit=RDIR_FETCH_MAX_LIMIT, full_urls=True,
             shuffle=self.rdir_shuffle_chunks, timeout=self.rdir_timeout)
         for container_id, chunk_id, descr in lost_chunks:
             yield self.namespace, container_id, descr['content_id'], chunk_id
@@ -225,16 +225,53 @@ class RefreshAccount(Command):
             help='Refresh all accounts (<account> is ignored)',
             action=ValueFormatStoreTrueAction
         )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<concurrency>',
+            type=int,
+            default=1,
+            help='Number of containers of each account refreshed '
+                 'in parallel (default: 1)'
+        )
+        parser.add_argument(
+            '--account-concurrency',
+            metavar='<concurrency>',
+            type=int,
+            default=1,
+            help='Number of accounts refreshed in parallel, '
+                 'with --all (default: 1)'
+        )
+        parser.add_argument(
+            '--max-rate',
+            metavar='<rate>',
+            type=float,
+            default=0,
+            help='Maximum number of containers refreshed per second '
+                 '(default: no limit)'
+        )
+        parser.add_argument(
+            '--marker',
+            metavar='<account>',
+            help='With --all, resume the refresh after this account'
+        )
         return parser
 
+    def _progress(self, account):
+        self.log.info('Refreshed all accounts up to %s', account)
+
     def take_action(self, parsed_args):
         self.log.debug('take_action(%s)', parsed_args)
 
+        kwargs = {'concurrency': parsed_args.concurrency,
+                  'max_rate': parsed_args.max_rate}
         if parsed_args.all_accounts:
-            self.app.client_manager.storage.account_refresh()
+            self.app.client_manager.storage.account_refresh(
+                account_concurrency=parsed_args.account_concurrency,
+                marker=parsed_args.marker,
+                progress_callback=self._progress, **kwargs)
         elif parsed_args.account is not None:
             self.app.client_manager.storage.account_refresh(
-                account=parsed_args.account)
+                account=parsed_args.account, **kwargs)
         else:
             from argparse import ArgumentError
             raise ArgumentError(parsed_args.account,
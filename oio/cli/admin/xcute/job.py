@@ -240,6 +240,9 @@ class JobUpdate(XcuteCommand, ShowOne):
         parser.add_argument(
             '--tasks-batch-size', type=int,
             help='Max tasks batch size.')
+        parser.add_argument(
+            '--tasks-concurrency', type=int,
+            help='Max tasks processed concurrently in a batch.')
         parser.add_argument(
             '-p', '--param',
             dest='params',
@@ -257,6 +260,8 @@ class JobUpdate(XcuteCommand, ShowOne):
             job_config['tasks_per_second'] = parsed_args.tasks_per_second
         if parsed_args.tasks_batch_size is not None:
             job_config['tasks_batch_size'] = parsed_args.tasks_batch_size
+        if parsed_args.tasks_concurrency is not None:
+            job_config['tasks_concurrency'] = parsed_args.tasks_concurrency
         if parsed_args.params is not None:
             job_config['params'] = parsed_args.params
         new_job_config = self.xcute.job_update(parsed_args.job_id, job_config)
@@ -34,7 +34,7 @@ class RawxRebuild(SingleServiceCommandMixin, XcuteRdirCommand):
 
         parser.add_argument(
             '--chunks-per-second', type=int,
-            help='Max chunks per second. '
+            help='Max chunks rebuilt per second. '
                  '(default=%d)'
                  % self.JOB_CLASS.DEFAULT_TASKS_PER_SECOND)
         parser.add_argument(
@@ -99,10 +99,19 @@ class RawxDecommission(SingleServiceCommandMixin, XcuteRdirCommand):
         SingleServiceCommandMixin.patch_parser(self, parser)
 
         parser.add_argument(
-            '--chunks-per-second', type=int,
-            help='Max chunks per second. '
+            '--contents-per-second', '--chunks-per-second',
+            dest='contents_per_second', type=int,
+            help='Max contents per second: the chunks of a same content '
+                 'are moved together, by a single task '
+                 '("--chunks-per-second" is a deprecated alias). '
                  '(default=%d)'
                  % self.JOB_CLASS.DEFAULT_TASKS_PER_SECOND)
+        parser.add_argument(
+            '--concurrency', type=int,
+            help='Max contents whose chunks are moved concurrently '
+                 'by each worker. '
+                 '(default=%d)'
+                 % self.JOB_CLASS.DEFAULT_TASKS_CONCURRENCY)
         parser.add_argument(
             '--rawx-timeout', type=float,
             help='Timeout for rawx operations, in seconds. (default=%f)'
@@ -140,6 +149,7 @@ class RawxDecommission(SingleServiceCommandMixin, XcuteRdirCommand):
             'usage_check_interval': parsed_args.usage_check_interval
         }
         return {
-            'tasks_per_second': parsed_args.chunks_per_second,
+            'tasks_per_second': parsed_args.contents_per_second,
+            'tasks_concurrency': parsed_args.concurrency,
             'params': job_params
         }
@@ -933,8 +933,17 @@ class SnapshotContainer(ContainerCommandMixin, Lister):
             '--chunk-batch-size',
             metavar='<size>',
             default=100,
+            type=int,
             help=('The number of chunks updated at the same time.')
         )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<concurrency>',
+            default=10,
+            type=int,
+            help=('The number of objects whose chunks are copied '
+                  'at the same time (default: 10).')
+        )
         parser.add_argument(
             '--timeout',
             default=60.0,
@@ -959,9 +968,13 @@ class SnapshotContainer(ContainerCommandMixin, Lister):
                          (container + "-" + Timestamp().normal))
         batch_size = parsed_args.chunk_batch_size
 
+        def _progress(nb_objects):
+            self.log.info('%d objects saved in the snapshot', nb_objects)
+
         self.app.client_manager.storage.container_snapshot(
             account, container, dst_account,
             dst_container, batch_size=batch_size,
-            deadline=deadline)
+            concurrency=parsed_args.concurrency,
+            progress_callback=_progress, deadline=deadline)
         lines = [(dst_account, dst_container, "OK")]
         return ('Account', 'Container', 'Status'), lines
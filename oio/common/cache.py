@@ -13,7 +13,500 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library.
 
-from oio.common.utils import cid_from_name
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+from collections import OrderedDict
+
+from six import PY2
+
+from oio.common.easy_value import float_value, int_value
+from oio.common.exceptions import NotFound
+from oio.common.json import json
+from oio.common.utils import cid_from_name, monotonic_time
+
+
+class MetadataCache(object):
+    """
+    Dict-like LRU cache, bounded in number of entries and in bytes,
+    whose entries expire after a time-to-live.
+
+    An instance can be passed as the `cache` keyword argument of
+    `ObjectStorageApi` or `ContainerClient` to cache object and
+    container metadata. Unlike a plain `dict`, it also caches
+    "not found" replies, during `negative_ttl` seconds.
+    """
+
+    def __init__(self, size=65536, max_bytes=0, ttl=60.0, negative_ttl=0.0):
+        """
+        :param size: maximum number of entries (0 means unlimited)
+        :param max_bytes: maximum estimated size of the entries,
+            in bytes (0 means unlimited)
+        :param ttl: default time-to-live of entries, in seconds
+            (0 means no expiration)
+        :param negative_ttl: time-to-live of "not found" entries,
+            in seconds (0 disables negative caching)
+        """
+        self.size = size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # key -> (value, expiration time, estimated size)
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _estimate_size(key, value):
+        return len(key) + len(json.dumps(value, separators=(',', ':')))
+
+    def _pop(self, key):
+        _value, _expiration, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def _evict(self):
+        while self._entries and (
+                (self.size and len(self._entries) > self.size) or
+                (self.max_bytes and self.bytes > self.max_bytes)):
+            key = next(iter(self._entries))
+            self._pop(key)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, expiration, _size = entry
+        if expiration and expiration <= monotonic_time():
+            self._pop(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        # Mark the entry as the most recently used
+        del self._entries[key]
+        self._entries[key] = entry
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Set an entry in the cache.
+
+        :param ttl: time-to-live of this entry, in seconds,
+            instead of the default one
+        """
+        if ttl is None:
+            ttl = self.ttl
+        expiration = monotonic_time() + ttl if ttl else 0
+        size = self._estimate_size(key, value)
+        if key in self._entries:
+            self._pop(key)
+        self._entries[key] = (value, expiration, size)
+        self.bytes += size
+        self._evict()
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        self._pop(key)
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        expiration = entry[1]
+        if expiration and expiration <= monotonic_time():
+            self._pop(key)
+            self.expirations += 1
+            return False
+        return True
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """
+        :returns: a `dict` with the number of entries, their estimated
+            size, and hit, miss, eviction and expiration counters
+        """
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+class SharedMetadataCache(object):
+    """
+    Dict-like cache stored in a memory-mapped file, shared by all the
+    processes opening the same file (e.g. the workers of a WSGI server).
+
+    The file holds a fixed-size hash table of `nb_buckets` buckets of
+    `ways` slots. Each slot stores one JSON-serialized entry of at most
+    `slot_size` bytes (bigger entries are not cached). When a bucket is
+    full, an entry is evicted with the CLOCK algorithm (an approximation
+    of LRU): each hit sets a reference bit on the entry, and the
+    eviction hand skips (and clears) referenced entries.
+
+    Writers lock the bucket they modify with `fcntl.lockf`. Readers do
+    not lock anything: each slot carries a sequence number which is odd
+    while the slot is being written, and which is checked before and
+    after reading the slot.
+
+    Counters returned by `stats()` are local to the current process.
+    """
+
+    MAGIC = b'OIOMDC01'
+    # magic, nb_buckets, ways, slot_size
+    HEADER = struct.Struct('<8sIII')
+    # sequence number, key hash, expiration time, reference bit,
+    # key length, value length
+    SLOT_HEADER = struct.Struct('<IQdB3xHI')
+    # offset of the reference bit in a slot
+    REF_OFFSET = 20
+
+    def __init__(self, path, size=65536, slot_size=2048, ways=8,
+                 ttl=60.0, negative_ttl=0.0):
+        """
+        :param path: path to the file holding the cache
+            (preferably on a tmpfs, like /dev/shm)
+        :param size: number of slots, used only when creating the file
+        :param slot_size: maximum size of an entry, in bytes,
+            used only when creating the file
+        :param ways: number of slots per bucket,
+            used only when creating the file
+        :param ttl: default time-to-live of entries, in seconds
+            (0 means no expiration)
+        :param negative_ttl: time-to-live of "not found" entries,
+            in seconds (0 disables negative caching)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._init_file(max(1, size // ways), ways, slot_size)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._mmap = mmap.mmap(self._fd, self._file_size)
+        except Exception:
+            os.close(self._fd)
+            raise
+
+    def _init_file(self, nb_buckets, ways, slot_size):
+        header = os.read(self._fd, self.HEADER.size)
+        if len(header) == self.HEADER.size:
+            magic, nb_buckets_, ways_, slot_size_ = self.HEADER.unpack(header)
+            if magic == self.MAGIC:
+                # The file has already been created by another process,
+                # use its geometry.
+                self._set_geometry(nb_buckets_, ways_, slot_size_)
+                return
+        self._set_geometry(nb_buckets, ways, slot_size)
+        os.ftruncate(self._fd, 0)
+        os.ftruncate(self._fd, self._file_size)
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd,
+                 self.HEADER.pack(self.MAGIC, nb_buckets, ways, slot_size))
+
+    def _set_geometry(self, nb_buckets, ways, slot_size):
+        self.nb_buckets = nb_buckets
+        self.ways = ways
+        self.slot_size = slot_size
+        # One byte per bucket for the eviction hand,
+        # also used as the lock of the bucket.
+        self._hands_offset = self.HEADER.size
+        self._slots_offset = self._hands_offset + nb_buckets
+        self._file_size = self._slots_offset + nb_buckets * ways * slot_size
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            os.close(self._fd)
+
+    @staticmethod
+    def _hash(key):
+        return struct.unpack('<Q', hashlib.md5(key).digest()[:8])[0]
+
+    def _slot_offset(self, bucket, way):
+        return self._slots_offset + \
+            (bucket * self.ways + way) * self.slot_size
+
+    def _read_slot(self, offset):
+        """
+        :returns: a tuple (sequence number, key hash, expiration,
+            key, value), or None if the slot is being written
+        """
+        mm = self._mmap
+        seq, key_hash, expiration, _ref, key_len, value_len = \
+            self.SLOT_HEADER.unpack_from(mm, offset)
+        if seq & 1:
+            return None
+        start = offset + self.SLOT_HEADER.size
+        payload = mm[start:start + key_len + value_len]
+        if self.SLOT_HEADER.unpack_from(mm, offset)[0] != seq:
+            return None
+        return (seq, key_hash, expiration,
+                payload[:key_len], payload[key_len:])
+
+    def _lookup(self, key, key_hash, bucket):
+        """
+        :returns: the offset of the slot holding the key and
+            the slot itself, or (None, None)
+        """
+        for way in range(self.ways):
+            offset = self._slot_offset(bucket, way)
+            slot = self._read_slot(offset)
+            if slot and slot[1] == key_hash and slot[3] == key:
+                return offset, slot
+        return None, None
+
+    def _lock(self, bucket, op=fcntl.LOCK_EX):
+        fcntl.lockf(self._fd, op, 1, self._hands_offset + bucket)
+
+    def _write_slot(self, offset, key_hash, expiration, key, value):
+        mm = self._mmap
+        seq = self.SLOT_HEADER.unpack_from(mm, offset)[0]
+        # Mark the slot as being written (the sequence number wraps
+        # around, keeping its parity)
+        struct.pack_into('<I', mm, offset, (seq + 1) & 0xFFFFFFFF)
+        start = offset + self.SLOT_HEADER.size
+        mm[start:start + len(key) + len(value)] = key + value
+        self.SLOT_HEADER.pack_into(mm, offset, (seq + 1) & 0xFFFFFFFF,
+                                   key_hash, expiration,
+                                   1, len(key), len(value))
+        # Mark the slot as written
+        struct.pack_into('<I', mm, offset, (seq + 2) & 0xFFFFFFFF)
+
+    def _victim(self, bucket, now):
+        """
+        Find a free, expired or not recently used slot in the bucket.
+        Must be called with the bucket locked.
+
+        :returns: the offset of the slot, and True if a valid entry
+            has to be evicted
+        """
+        mm = self._mmap
+        hand_offset = self._hands_offset + bucket
+        for way in range(self.ways):
+            offset = self._slot_offset(bucket, way)
+            _seq, _hash, expiration, _ref, key_len, _len = \
+                self.SLOT_HEADER.unpack_from(mm, offset)
+            if not key_len or (expiration and expiration <= now):
+                return offset, False
+        hand = mm[hand_offset] if not PY2 else ord(mm[hand_offset])
+        # Two rounds at most: the first one clears reference bits
+        for i in range(2 * self.ways):
+            way = (hand + i) % self.ways
+            offset = self._slot_offset(bucket, way)
+            ref_offset = offset + self.REF_OFFSET
+            ref = mm[ref_offset] if not PY2 else ord(mm[ref_offset])
+            if ref:
+                mm[ref_offset:ref_offset + 1] = b'\x00'
+                continue
+            mm[hand_offset:hand_offset + 1] = \
+                struct.pack('B', (way + 1) % self.ways)
+            return offset, True
+        return self._slot_offset(bucket, hand % self.ways), True
+
+    def get(self, key, default=None):
+        key = key.encode('utf-8')
+        key_hash = self._hash(key)
+        offset, slot = self._lookup(key, key_hash,
+                                    key_hash % self.nb_buckets)
+        if slot is None:
+            self.misses += 1
+            return default
+        expiration = slot[2]
+        if expiration and expiration <= time.time():
+            self.expirations += 1
+            self.misses += 1
+            return default
+        try:
+            value = json.loads(slot[4])
+        except ValueError:
+            self.misses += 1
+            return default
+        # Set the reference bit (no need to lock)
+        ref_offset = offset + self.REF_OFFSET
+        self._mmap[ref_offset:ref_offset + 1] = b'\x01'
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Set an entry in the cache. Entries which do not fit in a slot
+        are silently ignored.
+
+        :param ttl: time-to-live of this entry, in seconds,
+            instead of the default one
+        """
+        key = key.encode('utf-8')
+        value = json.dumps(value, separators=(',', ':')).encode('utf-8')
+        if self.SLOT_HEADER.size + len(key) + len(value) > self.slot_size:
+            return
+        if ttl is None:
+            ttl = self.ttl
+        now = time.time()
+        expiration = now + ttl if ttl else 0.0
+        key_hash = self._hash(key)
+        bucket = key_hash % self.nb_buckets
+        self._lock(bucket)
+        try:
+            offset, _slot = self._lookup(key, key_hash, bucket)
+            if offset is None:
+                offset, evicted = self._victim(bucket, now)
+                if evicted:
+                    self.evictions += 1
+            self._write_slot(offset, key_hash, expiration, key, value)
+        finally:
+            self._lock(bucket, fcntl.LOCK_UN)
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        key = key.encode('utf-8')
+        key_hash = self._hash(key)
+        bucket = key_hash % self.nb_buckets
+        self._lock(bucket)
+        try:
+            offset, _slot = self._lookup(key, key_hash, bucket)
+            if offset is None:
+                raise KeyError(key)
+            self._write_slot(offset, 0, 0.0, b'', b'')
+        finally:
+            self._lock(bucket, fcntl.LOCK_UN)
+
+    def __contains__(self, key):
+        key = key.encode('utf-8')
+        key_hash = self._hash(key)
+        _offset, slot = self._lookup(key, key_hash,
+                                     key_hash % self.nb_buckets)
+        return slot is not None and \
+            not (slot[2] and slot[2] <= time.time())
+
+    def __len__(self):
+        now = time.time()
+        count = 0
+        for bucket in range(self.nb_buckets):
+            for way in range(self.ways):
+                _seq, _hash, expiration, _ref, key_len, _len = \
+                    self.SLOT_HEADER.unpack_from(
+                        self._mmap, self._slot_offset(bucket, way))
+                if key_len and not (expiration and expiration <= now):
+                    count += 1
+        return count
+
+    def clear(self):
+        for bucket in range(self.nb_buckets):
+            self._lock(bucket)
+            try:
+                for way in range(self.ways):
+                    self._write_slot(self._slot_offset(bucket, way),
+                                     0, 0.0, b'', b'')
+            finally:
+                self._lock(bucket, fcntl.LOCK_UN)
+
+    def stats(self):
+        """
+        :returns: a `dict` with the number of entries, the size of the
+            cache, and hit, miss, eviction and expiration counters
+            of the current process
+        """
+        return {
+            'entries': len(self),
+            'bytes': self._file_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+def metadata_cache_from_conf(conf, prefix='cache_'):
+    """
+    Build a `MetadataCache` from a configuration dictionary.
+
+    Recognized keys are `cache_size`, `cache_max_bytes`, `cache_ttl`
+    and `cache_negative_ttl`. If `cache_path` is also set,
+    a `SharedMetadataCache` is built instead, with `cache_size` slots
+    (or `cache_max_bytes` divided by `cache_slot_size`) of
+    `cache_slot_size` bytes.
+
+    :returns: a `MetadataCache` or a `SharedMetadataCache`,
+        or None if neither `cache_size` nor `cache_max_bytes` is set.
+    """
+    size = int_value(conf.get(prefix + 'size'), 0)
+    max_bytes = int_value(conf.get(prefix + 'max_bytes'), 0)
+    if not size and not max_bytes:
+        return None
+    ttl = float_value(conf.get(prefix + 'ttl'), 60.0)
+    negative_ttl = float_value(conf.get(prefix + 'negative_ttl'), 0.0)
+    path = conf.get(prefix + 'path')
+    if path:
+        slot_size = int_value(conf.get(prefix + 'slot_size'), 2048)
+        return SharedMetadataCache(
+            path, size=size or max_bytes // slot_size, slot_size=slot_size,
+            ttl=ttl, negative_ttl=negative_ttl)
+    return MetadataCache(
+        size=size, max_bytes=max_bytes, ttl=ttl, negative_ttl=negative_ttl)
+
+
+def _get_negative_entry(cache_value):
+    """
+    Raise the `NotFound` exception saved in a negative cache entry.
+    """
+    if cache_value is not None and 'not_found' in cache_value:
+        http_status, status, message = cache_value['not_found']
+        raise NotFound(http_status, status, message)
+
+
+def _set_negative_entry(cache, cache_key, err):
+    """
+    Save a `NotFound` exception in the cache, if it supports
+    negative caching.
+    """
+    negative_ttl = getattr(cache, 'negative_ttl', 0)
+    if not negative_ttl:
+        return
+    cache.set(cache_key,
+              {'not_found': (err.http_status, err.status, err.message)},
+              ttl=negative_ttl)
 
 
 def _get_container_metadata_cache_key(account=None, reference=None, cid=None):
@@ -26,13 +519,18 @@ def get_cached_container_metadata(account=None, reference=None, cid=None,
                                   cache=None, **kwargs):
     """
     Get the container metadata from the cache (if there is one)
+
+    :raises `oio.common.exceptions.NotFound`: if the container
+        is known not to exist
     """
     if cache is None:
         return None
 
     cache_key = _get_container_metadata_cache_key(
         account=account, reference=reference, cid=cid)
-    return cache.get(cache_key)
+    container_meta = cache.get(cache_key)
+    _get_negative_entry(container_meta)
+    return container_meta
 
 
 def set_cached_container_metadata(container_meta,
@@ -52,6 +550,23 @@ def set_cached_container_metadata(container_meta,
     cache[cache_key] = container_meta
 
 
+def set_cached_container_not_found(err, account=None, reference=None,
+                                   cid=None, cache=None, **kwargs):
+    """
+    Remember that the container does not exist (if there is a cache,
+    and it supports negative caching)
+
+    :param err: the exception raised by the request
+    :type err: `oio.common.exceptions.NotFound`
+    """
+    if cache is None:
+        return
+
+    cache_key = _get_container_metadata_cache_key(
+        account=account, reference=reference, cid=cid)
+    _set_negative_entry(cache, cache_key, err)
+
+
 def del_cached_container_metadata(account=None, reference=None, cid=None,
                                   cache=None, **kwargs):
     """
@@ -82,6 +597,9 @@ def get_cached_object_metadata(account=None, reference=None, path=None,
                                cache=None, **kwargs):
     """
     Get the object metadata and location from the cache (if there is one)
+
+    :raises `oio.common.exceptions.NotFound`: if the object
+        is known not to exist
     """
     if cache is None or version:
         # Cache isn't compatible with versioning
@@ -92,6 +610,7 @@ def get_cached_object_metadata(account=None, reference=None, path=None,
     cache_value = cache.get(cache_key)
     if cache_value is None:
         return None, None
+    _get_negative_entry(cache_value)
 
     content_meta = cache_value.get('meta')
     if content_meta is None:
@@ -140,6 +659,25 @@ def set_cached_object_metadata(content_meta, content_chunks,
     cache[cache_key] = cache_value
 
 
+def set_cached_object_not_found(err, account=None, reference=None,
+                                path=None, cid=None, version=None,
+                                cache=None, **kwargs):
+    """
+    Remember that the object does not exist (if there is a cache,
+    and it supports negative caching)
+
+    :param err: the exception raised by the request
+    :type err: `oio.common.exceptions.NotFound`
+    """
+    if cache is None or version:
+        # Cache isn't compatible with versioning
+        return
+
+    cache_key = _get_object_metadata_cache_key(
+        account=account, reference=reference, path=path, cid=cid)
+    _set_negative_entry(cache, cache_key, err)
+
+
 def del_cached_object_metadata(account=None, reference=None, path=None,
                                cid=None, version=None, cache=None, **kwargs):
     """
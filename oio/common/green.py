@@ -25,6 +25,7 @@ from six import string_types
 import eventlet.hubs as eventlet_hubs # noqa
 from eventlet import sleep, patcher, greenthread # noqa
 from eventlet import Queue, Timeout, GreenPile, GreenPool # noqa
+from eventlet import tpool # noqa
 from eventlet.green import thread, threading, socket # noqa
 from eventlet.event import Event # noqa
 from eventlet.green.httplib import (HTTPConnection, HTTPSConnection, # noqa
@@ -62,8 +62,15 @@ class RedisConnection(object):
         'db': int,  # Redis database number
     }
 
+    lua_release_lock = """
+        if redis.call('GET', KEYS[1]) == ARGV[1] then
+            return redis.call('DEL', KEYS[1]);
+        end;
+        return 0;
+        """
+
     def __init__(self, host=None, sentinel_hosts=None,
-                 sentinel_name=None, **kwargs):
+                 sentinel_name=None, cluster_hosts=None, **kwargs):
         self.__redis_mod = importlib.import_module('redis')
         self.__redis_sentinel_mod = importlib.import_module('redis.sentinel')
 
@@ -73,8 +80,21 @@ class RedisConnection(object):
         self._sentinel = None
         self._sentinel_hosts = None
         self._sentinel_name = None
+        self._cluster_nodes = None
+        self._script_release_lock = None
         self._conn_kwargs = self._filter_conn_kwargs(kwargs)
 
+        if cluster_hosts:
+            # Requires redis-py >= 4.1
+            self.__redis_cluster_mod = importlib.import_module(
+                'redis.cluster')
+            if isinstance(cluster_hosts, string_types):
+                cluster_hosts = cluster_hosts.split(',')
+            self._cluster_nodes = [
+                self.__redis_cluster_mod.ClusterNode(h, int(p))
+                for h, p in (hp.rsplit(':', 1) for hp in cluster_hosts)]
+            return
+
         if host:
             self._host, self._port = host.rsplit(':', 1)
             self._port = int(self._port)
@@ -119,11 +139,31 @@ class RedisConnection(object):
             {k[9:]: v for k, v in sentinel_conn_kwargs.items()
              if k.startswith('sentinel_')})
 
+    @property
+    def cluster(self):
+        """Tell if the connection is to a Redis Cluster."""
+        return self._cluster_nodes is not None
+
+    def hash_tag(self, name):
+        """
+        In cluster mode, make `name` a hash tag: all the keys built
+        with this tag will be stored in the same slot (and thus can be
+        used by the same script or transaction).
+        """
+        if self.cluster:
+            return '{' + name + '}'
+        return name
+
     @property
     def conn(self):
-        """Retrieve Redis connection (normal or sentinel)"""
+        """Retrieve Redis connection (normal, sentinel or cluster)"""
         if self._sentinel:
             return self._sentinel.master_for(self._sentinel_name)
+        if self.cluster:
+            if not self._conn:
+                self._conn = self.__redis_cluster_mod.RedisCluster(
+                    startup_nodes=self._cluster_nodes, **self._conn_kwargs)
+            return self._conn
         if not self._conn:
             self._conn = self.__redis_mod.StrictRedis(
                 host=self._host, port=self._port,
@@ -132,7 +172,7 @@ class RedisConnection(object):
 
     @property
     def conn_slave(self):
-        """Retrieve Redis connection (normal or sentinel)"""
+        """Retrieve Redis connection (normal, sentinel or cluster)"""
         if self._sentinel:
             return self._sentinel.slave_for(self._sentinel_name)
         return self.conn
@@ -172,8 +212,16 @@ class RedisConnection(object):
     def release_lock(self, lockname, identifier):
         """Release a previously acquired Lock"""
         conn = self.conn
-        pipe = conn.pipeline(True)
         lockname = 'lock:' + lockname
+        if self.cluster:
+            # Cluster pipelines do not support WATCH
+            if self._script_release_lock is None:
+                self._script_release_lock = self.register_script(
+                    self.lua_release_lock)
+            return bool(self._script_release_lock(
+                keys=[lockname], args=[identifier]))
+
+        pipe = conn.pipeline(True)
 
         while True:
             try:
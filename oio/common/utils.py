@@ -439,6 +439,19 @@ def depaginate(func, item_key=None, listing_key=None, marker_key=None,
                 yield item_key(item)
 
 
+def grouper(iterable, size):
+    """
+    Yield lists of `size` items from `iterable`
+    (the last list may be shorter).
+    """
+    iterator = iter(iterable)
+    while True:
+        group = list(islice(iterator, size))
+        if not group:
+            return
+        yield group
+
+
 # See <linux/time.h>
 # Glib2 uses CLOCK_MONOTONIC
 __CLOCK_MONOTONIC = 1
@@ -26,6 +26,7 @@ import math
 import re
 import os
 import pickle
+import zlib
 from tarfile import TarInfo, REGTYPE, NUL, PAX_FORMAT, BLOCKSIZE, XHDTYPE, \
     DIRTYPE, AREGTYPE, InvalidHeaderError
 
@@ -37,11 +38,12 @@ from werkzeug.routing import Map, Rule
 from werkzeug.exceptions import BadRequest, RequestedRangeNotSatisfiable, \
     Conflict, UnprocessableEntity, ServiceUnavailable
 
-from werkzeug.wsgi import wrap_file
 
 from oio.api.object_storage import ObjectStorageApi, _sort_chunks
 from oio.common import exceptions as exc
 from oio.common.configuration import read_conf
+from oio.common.easy_value import int_value
+from oio.common.green import GreenPool
 from oio.common.json import json
 from oio.common.logger import get_logger
 from oio.common.wsgi import WerkzeugApp
@@ -67,7 +69,8 @@ SLO_HEADERS = (SLO, SLO_SIZE, SLO_ETAG)
 
 
 class OioTarEntry(object):
-    def __init__(self, conn, account, container, name, data=None):
+    def __init__(self, conn, account, container, name, data=None,
+                 located=None):
         self._slo = None
         self._buf = None
         self.acct = account
@@ -76,9 +79,13 @@ class OioTarEntry(object):
         self._filesize = 0
         # contains MD5 of single object or list of chunks
         self._checksums = None
-        self.compute(conn, data)
+        self.compute(conn, data, located)
 
-    def compute(self, conn, data=None):
+    def compute(self, conn, data=None, located=None):
+        """
+        :param located: the description of the object (with its
+            properties) and the list of its chunks, if already known
+        """
         tarinfo = TarInfo()
         tarinfo.name = self.name
         tarinfo.mode = 0o700
@@ -99,7 +106,11 @@ class OioTarEntry(object):
             self._buf = tarinfo.tobuf(format=PAX_FORMAT, encoding='utf-8')
             return
 
-        entry = conn.object_get_properties(self.acct, self.ref, self.name)
+        if located is not None:
+            entry, chunks = located
+        else:
+            entry = conn.object_get_properties(self.acct, self.ref, self.name)
+            chunks = None
 
         properties = entry['properties']
 
@@ -121,16 +132,18 @@ class OioTarEntry(object):
                 }
                 offset += ck['bytes']
         else:
-            tarinfo.size = int(entry['length'])
-            meta, chunks = conn.object_locate(self.acct, self.ref, self.name,
-                                              properties=False)
+            tarinfo.size = int(entry.get('size', entry.get('length')))
+            if chunks is None:
+                meta, chunks = conn.object_locate(
+                    self.acct, self.ref, self.name, properties=False)
+            else:
+                meta = entry
             storage_method = STORAGE_METHODS.load(meta['chunk_method'])
             chunks = _sort_chunks(chunks, storage_method.ec)
             for idx in chunks:
-                chunks[idx] = chunks[idx][0]
-                del chunks[idx]['url']
-                del chunks[idx]['score']
-                del chunks[idx]['pos']
+                # Do not alter the chunks, they may come from a cache
+                chunks[idx] = {k: v for k, v in chunks[idx][0].items()
+                               if k not in ('url', 'score', 'pos')}
             self._checksums = chunks
         self._filesize = tarinfo.size
 
@@ -269,7 +282,12 @@ class LimitedStream(object):
 
 
 class ContainerTarFile(object):
-    """ Expose a File Object API to be used with wrap_file """
+    """
+    Stream the TAR content of a container, block range by block range.
+    Object data is forwarded from the object_fetch iterators as it comes,
+    without being loaded entirely into memory.
+    Also expose a File Object API to be used with wrap_file.
+    """
 
     def __init__(self, storage_api, account, container,
                  range_, oio_map, logger):
@@ -277,38 +295,50 @@ class ContainerTarFile(object):
         self.container = container
         self.range_ = range_
         self.oio_map = oio_map
-        self.manifest = oio_map[:]
+        self.manifest = oio_map
         self.storage = storage_api
         self.logger = logger
+        self._stream = None
+        self._buffer = b''
         if len(range_) != 2:
             self.logger.warn('no valid ranges provided for %s %s', account,
                              container)
 
     def __iter__(self):
-        return self
+        if self._stream is None:
+            self._stream = self._iter_data()
+        return self._stream
 
     def __next__(self):
-        data = self.read()
-        if data == b'':
-            raise StopIteration
-        return data
+        return next(iter(self))
+
+    @staticmethod
+    def _iter_fetch(data):
+        """Forward the data of an object_fetch, close it when stopped."""
+        try:
+            for chunk in data:
+                yield chunk
+        finally:
+            close = getattr(data, 'close', None)
+            if close:
+                close()
 
     # FIXME: create_tar_oio_XXX functions should be merged
     def create_tar_oio_stream(self, entry, range_):
-        """Extract data from entry from object"""
-        mem = b''
+        """Yield data of the blocks of the entry (header, object, padding)"""
         name = entry['name']
+        size = 0
 
         if range_[0] < entry['hdr_blocks']:
             tar = OioTarEntry(self.storage, self.acct, self.container, name)
-
-            for bl in range(entry['hdr_blocks']):
-                if bl >= range_[0] and bl <= range_[1]:
-                    mem += tar.buf[bl * BLOCKSIZE:bl * BLOCKSIZE + BLOCKSIZE]
+            hdr_end = min(range_[1], entry['hdr_blocks'] - 1)
+            buf = tar.buf[range_[0] * BLOCKSIZE:(hdr_end + 1) * BLOCKSIZE]
+            size += len(buf)
+            yield buf
             range_ = (entry['hdr_blocks'], range_[1])
 
         if range_[0] > range_[1]:
-            return mem
+            return
 
         # for sanity, shift ranges
         range_ = (range_[0] - entry['hdr_blocks'],
@@ -340,7 +370,9 @@ class ContainerTarFile(object):
                 _, data = self.storage.object_fetch(
                     self.acct, cnt, path, ranges=[(slo_start, slo_end)],
                     properties=False)
-                mem += b''.join(data)
+                for chunk in self._iter_fetch(data):
+                    size += len(chunk)
+                    yield chunk
 
                 start = max(0, start - part['bytes'])
                 end -= part['bytes']
@@ -350,16 +382,18 @@ class ContainerTarFile(object):
             _, data = self.storage.object_fetch(
                 self.acct, self.container, name, ranges=[(start, end)],
                 properties=False)
-            mem += b''.join(data)
+            for chunk in self._iter_fetch(data):
+                size += len(chunk)
+                yield chunk
 
         if last:
-            mem += NUL * (BLOCKSIZE - remainder)
+            size += BLOCKSIZE - remainder
+            yield NUL * (BLOCKSIZE - remainder)
 
-        if not mem:
+        if not size:
             self.logger.error("no data extracted")
-        if divmod(len(mem), BLOCKSIZE)[1]:
+        if divmod(size, BLOCKSIZE)[1]:
             self.logger.error("data written does not match blocksize")
-        return mem
 
     def create_tar_oio_properties(self, entry, range_, name):
         """
@@ -429,54 +463,53 @@ class ContainerTarFile(object):
 
         return mem
 
-    def read(self, size=-1):
+    def _iter_data(self):
         """
-        Stream TAR content
-        each call will send object by object, or by chunk of `size`
-        if object is too large
+        Yield TAR content of the requested block range, entry by entry
+        (and for objects, piece by piece as it is downloaded).
         """
-        # Is there API to stream data from OIO SDK (to avoid copy ?)
-        data = b''
-
-        size = divmod(size, 512)[0]
-
-        if self.range_[0] > self.range_[1]:
-            self.logger.debug("EOF reached")
-            return data
-
-        for val in self.oio_map[:]:
+        for val in self.oio_map:
+            if self.range_[0] > self.range_[1]:
+                break
             if self.range_[0] > val['end_block']:
-                self.oio_map.remove(val)
                 continue
 
-            if size > 0 and val['end_block'] - self.range_[0] > size:
-                # TODO (mbonfils) add a unit test
-                end_block = self.range_[0] + size
-            else:
-                end_block = min(self.range_[1], val['end_block'])
-
+            end_block = min(self.range_[1], val['end_block'])
             assert self.range_[0] >= val['start_block']
-            assert self.range_[0] <= self.range_[1], \
-                "Got start %d / end %d" % (self.range_[0], self.range_[1])
 
             _s = val['start_block']
             # map ranges to object range
             range_ = (self.range_[0] - _s, end_block - _s)
-            self.range_ = (end_block + 1, self.range_[1])
 
             if 'name' not in val:
-                data = NUL * (range_[1] - range_[0] + 1) * BLOCKSIZE
+                data = (NUL * (range_[1] - range_[0] + 1) * BLOCKSIZE, )
             elif val['name'] in (CONTAINER_PROPERTIES, CONTAINER_MANIFEST):
-                data = self.create_tar_oio_properties(val, range_, val['name'])
+                data = (self.create_tar_oio_properties(val, range_,
+                                                       val['name']), )
             else:
                 data = self.create_tar_oio_stream(val, range_)
-            if end_block == val['end_block']:
-                self.oio_map.remove(val)
-            break
+            for chunk in data:
+                if chunk:
+                    yield chunk
+            self.range_ = (end_block + 1, self.range_[1])
+        self.logger.debug("EOF reached")
 
+    def read(self, size=-1):
+        """
+        Read TAR content: each call returns at most `size` bytes
+        of the next piece of data (or the whole piece if `size` < 0).
+        """
+        if not self._buffer:
+            self._buffer = next(iter(self), b'')
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
         return data
 
     def close(self):
+        if self._stream is not None:
+            # Stop the pending download, if any
+            self._stream.close()
         if self.range_[0] <= self.range_[1]:
             self.logger.info("Not all data has been consumed: %d/%d",
                              self.range_[0], self.range_[1])
@@ -780,11 +813,14 @@ class ContainerBackup(RedisConnection, WerkzeugApp):
     """WSGI Application to dump or restore a container."""
 
     REDIS_TIMEOUT = 3600 * 24  # Redis keys will expire after one day
-    BUFSIZE = 52428800  # 50 MB
 
     # Number of blocks to serve to avoid splitting headers (1MiB)
     BLK_ALIGN = 2048
 
+    # Number of manifest entries per (compressed) item of the Redis list
+    # caching the manifest
+    MANIFEST_CHUNK_SIZE = 10000
+
     def __init__(self, conf):
         if conf:
             self.conf = read_conf(conf['key_file'],
@@ -801,6 +837,9 @@ class ContainerBackup(RedisConnection, WerkzeugApp):
         ])
         self.REDIS_TIMEOUT = self.conf.get("redis_cache_timeout",
                                            self.REDIS_TIMEOUT)
+        # Number of objects whose tar entry is computed in parallel
+        self.concurrency = int_value(
+            self.conf.get("manifest_concurrency"), 10)
 
         redis_conf = {k[6:]: v for k, v in self.conf.items()
                       if k.startswith("redis_")}
@@ -828,6 +867,60 @@ class ContainerBackup(RedisConnection, WerkzeugApp):
         """Redis connection object"""
         return self.conn
 
+    def _load_manifest(self, key):
+        """Load a manifest cached into Redis (or None)."""
+        items = self.redis.lrange(key, 0, -1)
+        if not items:
+            return None
+        manifest = []
+        for item in items:
+            manifest.extend(json.loads(zlib.decompress(item).decode('utf-8'),
+                                       object_pairs_hook=OrderedDict))
+        return manifest
+
+    def _save_manifest(self, key, manifest):
+        """
+        Cache a manifest into Redis, as a list of compressed chunks
+        of entries (a single value would be too large for big containers).
+        """
+        pipeline = self.redis.pipeline(True)
+        pipeline.delete(key)
+        for start in range(0, len(manifest), self.MANIFEST_CHUNK_SIZE):
+            data = json.dumps(manifest[start:start + self.MANIFEST_CHUNK_SIZE],
+                              sort_keys=True)
+            pipeline.rpush(key, zlib.compress(data.encode('utf-8')))
+        pipeline.expire(key, self.REDIS_TIMEOUT)
+        pipeline.execute()
+
+    def _object_tar_entries(self, account, container):
+        """
+        Yield a tar entry for each object of the container, in the order
+        of their names. Objects are listed page by page, and located by
+        batches: the entries of each page are computed in parallel.
+        """
+        pool = GreenPool(self.concurrency)
+        marker = None
+        while True:
+            objs = self.proxy.object_list(account, container, marker=marker)
+            # FIXME: should we backup deleted objects?
+            objects = [obj for obj in objs['objects'] if not obj['deleted']]
+            located = dict(self.proxy.object_locate_many(
+                account, container,
+                [(obj['name'], obj['version']) for obj in objects]))
+
+            def _tar_entry(obj):
+                result = located[obj['name']]
+                if isinstance(result, Exception):
+                    raise result
+                return OioTarEntry(self.proxy, account, container,
+                                   obj['name'], located=result)
+
+            for tar in pool.imap(_tar_entry, objects):
+                yield tar
+            if not objs.get('truncated'):
+                break
+            marker = objs.get('next_marker') or objs['objects'][-1]['name']
+
     @redis_cnx
     def generate_manifest(self, account, container):
         """
@@ -839,11 +932,11 @@ class ContainerBackup(RedisConnection, WerkzeugApp):
             raise exc.NoSuchContainer()
 
         # TODO hash_map should contains if deleted or version flags are set
-        hash_map = "container_streaming:{0}/{1}".format(account, container)
-        cache = self.redis.get(hash_map)
+        hash_map = "container_manifest:{0}/{1}".format(account, container)
+        cache = self._load_manifest(hash_map)
         if cache:
             self.logger.debug("using cache")
-            return json.loads(cache, object_pairs_hook=OrderedDict)
+            return cache
 
         map_objs = []
         start_block = 0
@@ -864,12 +957,7 @@ class ContainerBackup(RedisConnection, WerkzeugApp):
             entry['end_block'] = start_block - 1
             map_objs.append(entry)
 
-        objs = self.proxy.object_list(account, container)
-        for obj in sorted(objs['objects'], key=lambda x: x['name']):
-            # FIXME: should we backup deleted objects?
-            if obj['deleted']:
-                continue
-            tar = OioTarEntry(self.proxy, account, container, obj['name'])
+        for tar in self._object_tar_entries(account, container):
             if (start_block // self.BLK_ALIGN) != \
                     ((start_block + tar.header_blocks) // self.BLK_ALIGN):
                 # header is over boundary, we have to add padding blocks
@@ -885,7 +973,7 @@ class ContainerBackup(RedisConnection, WerkzeugApp):
                 })
                 start_block += padding
             entry = {
-                'name': obj['name'],
+                'name': tar.name,
                 'size': tar.filesize,
                 'hdr_blocks': tar.header_blocks,
                 'blocks': tar.header_blocks + tar.data_blocks,
@@ -937,8 +1025,7 @@ class ContainerBackup(RedisConnection, WerkzeugApp):
             "got %d instead of %d" % (tar2.data_blocks, tar.data_blocks)
 
         self.logger.debug("add entry to cache")
-        self.redis.set(hash_map, json.dumps(map_objs, sort_keys=True),
-                       ex=self.REDIS_TIMEOUT)
+        self._save_manifest(hash_map, map_objs)
         return map_objs
 
     def _do_head(self, _, account, container):
@@ -1012,17 +1099,15 @@ class ContainerBackup(RedisConnection, WerkzeugApp):
                 'Content-Type': 'application/tar',
                 'Content-Length': str(length),
             }
-            return Response(wrap_file(req.environ, tar,
-                                      buffer_size=self.BUFSIZE),
-                            headers=hdrs, status=200)
+            return Response(tar, headers=hdrs, status=200,
+                            direct_passthrough=True)
 
         start, end, block_start, block_end = self._extract_range(req, blocks)
 
         tar = ContainerTarFile(self.proxy, account, container,
                                (block_start, block_end - 1),
                                results, self.logger)
-        return Response(wrap_file(req.environ, tar,
-                                  buffer_size=self.BUFSIZE),
+        return Response(tar, direct_passthrough=True,
                         headers={
                             'Accept-Ranges': 'bytes',
                             'Content-Type': 'application/tar',
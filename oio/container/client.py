@@ -25,8 +25,9 @@ from oio.common.decorators import ensure_headers
 from oio.common.json import json
 from oio.common import exceptions
 from oio.common.cache import get_cached_container_metadata, \
-    set_cached_container_metadata, del_cached_container_metadata, \
-    get_cached_object_metadata, set_cached_object_metadata, \
+    set_cached_container_metadata, set_cached_container_not_found, \
+    del_cached_container_metadata, get_cached_object_metadata, \
+    set_cached_object_metadata, set_cached_object_not_found, \
     del_cached_object_metadata
 from oio.common.easy_value import boolean_value
 from oio.common.exceptions import OioNetworkException
@@ -39,6 +40,9 @@ SYSMETA_KEYS = ("chunk-method", "ctime", "mtime", "deleted", "hash",
                 "hash-method", "id", "length", "mime-type", "name", "policy",
                 "size", "version")
 CHUNK_SYSMETA_PREFIX = '__OIO_CHUNK__'
+# Statuses of the items of content/locate_many telling
+# the content or the container is missing
+CONTENT_NOT_FOUND_STATUSES = (404, 406, 420, 426, 431)
 
 
 def extract_chunk_qualities(properties, raw=False):
@@ -199,6 +203,11 @@ class ContainerClient(ProxyClient):
         params = self._make_params(account, reference)
         data = json.dumps({'properties': properties or {},
                            'system': system or {}})
+
+        # Forget that the container may have been missing
+        del_cached_container_metadata(
+            account=account, reference=reference, **kwargs)
+
         resp, body = self._request('POST', '/create', params=params,
                                    data=data, **kwargs)
         if resp.status not in (204, 201):
@@ -231,6 +240,10 @@ class ContainerClient(ProxyClient):
                                          'properties': properties or {},
                                          'system': kwargs.get('system', {})})
             data = json.dumps({"containers": unformatted_data})
+            for container in containers:
+                # Forget that the container may have been missing
+                del_cached_container_metadata(
+                    account=account, reference=container, **kwargs)
             resp, body = self._request('POST', '/create_many', params=params,
                                        data=data, **kwargs)
             if resp.status not in (204, 200):
@@ -306,6 +319,12 @@ class ContainerClient(ProxyClient):
             user properties.
         :deprecated: use `container_get_properties` instead
         """
+        if kwargs.get('cache') is not None:
+            # Share the cached container metadata
+            # with container_get_properties()
+            container_meta = self.container_get_properties(
+                account=account, reference=reference, cid=cid, **kwargs)
+            return {'properties': container_meta['properties']}
         params = self._make_params(account, reference, cid=cid)
         _resp, body = self._request('GET', '/show', params=params, **kwargs)
         return body
@@ -410,8 +429,15 @@ class ContainerClient(ProxyClient):
         if not properties:
             properties = list()
         data = json.dumps(properties)
-        _resp, container_meta = self._request(
-            'POST', '/get_properties', data=data, params=params, **kwargs)
+        try:
+            _resp, container_meta = self._request(
+                'POST', '/get_properties', data=data, params=params,
+                **kwargs)
+        except exceptions.NotFound as exc:
+            set_cached_container_not_found(
+                exc, account=account, reference=reference, cid=cid,
+                **kwargs)
+            raise
 
         set_cached_container_metadata(
             container_meta, account=account, reference=reference, cid=cid,
@@ -723,6 +749,11 @@ class ContainerClient(ProxyClient):
             resp, chunks = self._direct_request(
                 'GET', uri, params=params, **kwargs)
             content_meta = extract_content_headers_meta(resp.headers)
+        except exceptions.NotFound as exc:
+            set_cached_object_not_found(
+                exc, account=account, reference=reference, path=path,
+                cid=cid, version=version, **kwargs)
+            raise
         except exceptions.OioNetworkException as exc:
             # TODO(FVE): this special behavior can be removed when
             # the 'content/locate' protocol is changed to include
@@ -744,6 +775,138 @@ class ContainerClient(ProxyClient):
 
         return content_meta, chunks
 
+    def _content_locate_batch(self, uri, params, batch, **kwargs):
+        """
+        Locate a batch of contents with one request.
+
+        :param batch: a list of (name, version) tuples
+        :returns: a list of (metadata, chunk list) tuples or exceptions
+        """
+        data = json.dumps({'contents': [{'name': name, 'version': version}
+                                        for name, version in batch]})
+        try:
+            _resp, body = self._direct_request(
+                'POST', uri, data=data, params=params, **kwargs)
+        except exceptions.TooLarge:
+            if len(batch) < 2:
+                raise
+            pivot = len(batch) // 2
+            return (self._content_locate_batch(uri, params, batch[:pivot],
+                                               **kwargs) +
+                    self._content_locate_batch(uri, params, batch[pivot:],
+                                               **kwargs))
+        results = list()
+        for item in body['contents']:
+            status = item['status']
+            if status == 200:
+                content_meta = item['meta']
+                content_meta['properties'] = item.get('properties') or {}
+                results.append((content_meta, item['chunks']))
+            elif status in CONTENT_NOT_FOUND_STATUSES:
+                results.append(
+                    exceptions.NotFound(404, status, item.get('message')))
+            else:
+                results.append(
+                    exceptions.from_status(status, item.get('message')))
+        return results
+
+    def _content_locate_or_error(self, account, reference, path,
+                                 version=None, **kwargs):
+        try:
+            return self.content_locate(account, reference, path,
+                                       version=version, **kwargs)
+        except Exception as exc:
+            return exc
+
+    def content_locate_many(self, account=None, reference=None, paths=None,
+                            cid=None, properties=True, batch_size=100,
+                            concurrency=10, **kwargs):
+        """
+        Get a description of several contents of a container, along with
+        the list of their chunks, with one request per batch of contents.
+
+        When the proxy does not support batches, the contents are located
+        with concurrent requests.
+
+        :param paths: names of the contents, or (name, version) tuples
+        :param batch_size: number of contents per request (the proxy
+            accepts 100 contents per request by default)
+        :param concurrency: number of concurrent requests, when the proxy
+            does not support batches
+        :returns: a list of tuples with the name of the content and either
+            a tuple with content metadata `dict` and chunk `list`,
+            or the exception raised while locating the content,
+            in the same order as `paths`
+        :rtype: `list` of `tuple`
+        """
+        batch = list()
+        for path in paths:
+            if isinstance(path, (tuple, list)):
+                batch.append(tuple(path))
+            else:
+                batch.append((path, None))
+        results = [None] * len(batch)
+
+        # Look for the contents in the cache first
+        missing = list()
+        for index, (path, version) in enumerate(batch):
+            try:
+                content_meta, chunks = get_cached_object_metadata(
+                    account=account, reference=reference, path=path,
+                    cid=cid, version=version, properties=properties,
+                    **kwargs)
+            except exceptions.NotFound as exc:
+                results[index] = (path, exc)
+                continue
+            if content_meta is not None and chunks is not None:
+                for chunk in chunks:
+                    chunk['score'] = self.rawx_scores.get(
+                        chunk['url'].split('/')[2], 0)
+                results[index] = (path, (content_meta, chunks))
+            else:
+                missing.append(index)
+        if len(missing) < len(batch):
+            eventlet.spawn_n(self._maybe_refresh_rawx_scores, **kwargs)
+
+        uri = self._make_uri('content/locate_many')
+        params = self._make_params(account, reference, cid=cid)
+        params['properties'] = properties
+        for start in range(0, len(missing), batch_size):
+            indexes = missing[start:start + batch_size]
+            try:
+                located = self._content_locate_batch(
+                    uri, params, [batch[index] for index in indexes],
+                    **kwargs)
+            except exceptions.NotFound:
+                # Proxy does not support batches, locate the contents
+                # one by one (and fill the cache)
+                indexes = missing[start:]
+                pool = eventlet.GreenPool(concurrency)
+                located = pool.imap(
+                    lambda index: self._content_locate_or_error(
+                        account, reference, batch[index][0], cid=cid,
+                        version=batch[index][1], properties=properties,
+                        **kwargs),
+                    indexes)
+                for index, result in zip(indexes, located):
+                    results[index] = (batch[index][0], result)
+                break
+
+            for index, result in zip(indexes, located):
+                path, version = batch[index]
+                results[index] = (path, result)
+                if isinstance(result, exceptions.NotFound):
+                    set_cached_object_not_found(
+                        result, account=account, reference=reference,
+                        path=path, cid=cid, version=version, **kwargs)
+                elif not isinstance(result, Exception):
+                    set_cached_object_metadata(
+                        result[0], result[1],
+                        account=account, reference=reference, path=path,
+                        cid=cid, version=version, properties=properties,
+                        **kwargs)
+        return results
+
     @extract_reference_params
     def content_prepare(self, account=None, reference=None, path=None,
                         position=0, size=None, cid=None, stgpol=None,
@@ -793,8 +956,14 @@ class ContainerClient(ProxyClient):
 
         uri = self._make_uri('content/get_properties')
         data = json.dumps(properties) if properties else None
-        resp, body = self._direct_request(
-            'POST', uri, data=data, params=params, **kwargs)
+        try:
+            resp, body = self._direct_request(
+                'POST', uri, data=data, params=params, **kwargs)
+        except exceptions.NotFound as exc:
+            set_cached_object_not_found(
+                exc, account=account, reference=reference, path=path,
+                cid=cid, version=version, **kwargs)
+            raise
         obj_meta = extract_content_headers_meta(resp.headers)
         obj_meta.update(body)
 
@@ -201,20 +201,31 @@ class Content(object):
             **kwargs)
 
     def _update_spare_chunk(self, current_chunk, new_url, **kwargs):
-        old = {'type': 'chunk',
-               'id': current_chunk.url,
-               'hash': current_chunk.checksum,
-               'size': current_chunk.size,
-               'pos': current_chunk.pos,
-               'content': self.content_id}
-        new = {'type': 'chunk',
-               'id': new_url,
-               'hash': current_chunk.checksum,
-               'size': current_chunk.size,
-               'pos': current_chunk.pos,
-               'content': self.content_id}
+        self._update_spare_chunks([(current_chunk, new_url)], **kwargs)
+
+    def _update_spare_chunks(self, moves, **kwargs):
+        """
+        Replace the URL of several chunks with a single meta2 request.
+
+        :param moves: `list` of (current_chunk, new_url) tuples
+        """
+        old = list()
+        new = list()
+        for current_chunk, new_url in moves:
+            old.append({'type': 'chunk',
+                        'id': current_chunk.url,
+                        'hash': current_chunk.checksum,
+                        'size': current_chunk.size,
+                        'pos': current_chunk.pos,
+                        'content': self.content_id})
+            new.append({'type': 'chunk',
+                        'id': new_url,
+                        'hash': current_chunk.checksum,
+                        'size': current_chunk.size,
+                        'pos': current_chunk.pos,
+                        'content': self.content_id})
         self.container_client.container_raw_update(
-            [old], [new], cid=self.container_id,
+            old, new, cid=self.container_id,
             path=self.path, version=self.version,
             **kwargs)
 
@@ -256,13 +267,7 @@ class Content(object):
         self.container_client.content_delete(
             cid=self.container_id, path=self.path, **kwargs)
 
-    def move_chunk(self, chunk_id, service_id=None,
-                   check_quality=False, dry_run=False,
-                   max_attempts=3, **kwargs):
-        """
-        Move a chunk to another place. Optionally ensure that the
-        new place is an improvement over the current one.
-        """
+    def _find_chunk_to_move(self, chunk_id, service_id=None):
         if isinstance(chunk_id, Chunk):
             current_chunk = chunk_id
             chunk_id = current_chunk.id
@@ -279,13 +284,25 @@ class Content(object):
 
         if current_chunk is None or current_chunk not in self.chunks:
             raise exc.OrphanChunk("Chunk not found in content")
+        return current_chunk, service_id
 
+    def _copy_chunk_to_spare(self, current_chunk, service_id=None,
+                             check_quality=False, dry_run=False,
+                             max_attempts=3, **kwargs):
+        """
+        Find a spare location for a chunk and copy the chunk there.
+        Do not update meta2.
+
+        :returns: the URL of the spare chunk and the qualities
+            of the spare chunks
+        """
         if service_id:
             other_chunks = self.chunks.filter(
                 metapos=current_chunk.metapos).exclude(host=service_id).all()
         else:
             other_chunks = self.chunks.filter(
-                metapos=current_chunk.metapos).exclude(id=chunk_id).all()
+                metapos=current_chunk.metapos).exclude(
+                    id=current_chunk.id).all()
 
         spare_urls, qualities = self._get_spare_chunk(
             other_chunks, [current_chunk], position=current_chunk.pos,
@@ -312,7 +329,7 @@ class Content(object):
                         'Copying chunk from %s to %s', src.url, spare_urls[0])
                     # TODO(FVE): retry to copy (max_attempts times)
                     self.blob_client.chunk_copy(
-                        src.url, spare_urls[0], chunk_id=chunk_id,
+                        src.url, spare_urls[0], chunk_id=current_chunk.id,
                         fullpath=self.full_path, cid=self.container_id,
                         path=self.path, version=self.version,
                         content_id=self.content_id, **kwargs)
@@ -326,20 +343,74 @@ class Content(object):
             else:
                 raise UnrecoverableContent(
                     'No copy available of chunk to move')
+        return spare_urls[0], qualities
 
-            self._update_spare_chunk(current_chunk, spare_urls[0])
-
-            try:
-                self.blob_client.chunk_delete(current_chunk.url, **kwargs)
-            except Exception as err:
-                self.logger.warn(
-                    "Failed to delete chunk %s: %s", current_chunk.url, err)
+    def _delete_moved_chunk(self, current_chunk, **kwargs):
+        try:
+            self.blob_client.chunk_delete(current_chunk.url, **kwargs)
+        except Exception as err:
+            self.logger.warn(
+                "Failed to delete chunk %s: %s", current_chunk.url, err)
 
-        current_chunk.url = spare_urls[0]
+    def move_chunk(self, chunk_id, service_id=None,
+                   check_quality=False, dry_run=False,
+                   max_attempts=3, **kwargs):
+        """
+        Move a chunk to another place. Optionally ensure that the
+        new place is an improvement over the current one.
+        """
+        current_chunk, service_id = self._find_chunk_to_move(
+            chunk_id, service_id=service_id)
+        spare_url, qualities = self._copy_chunk_to_spare(
+            current_chunk, service_id=service_id,
+            check_quality=check_quality, dry_run=dry_run,
+            max_attempts=max_attempts, **kwargs)
+        if not dry_run:
+            self._update_spare_chunk(current_chunk, spare_url)
+            self._delete_moved_chunk(current_chunk, **kwargs)
+
+        current_chunk.url = spare_url
         current_chunk.quality = qualities[current_chunk.url]
 
         return current_chunk.raw()
 
+    def move_chunks(self, chunk_ids, service_id=None,
+                    check_quality=False, dry_run=False,
+                    max_attempts=3, **kwargs):
+        """
+        Move several chunks of the content to other places,
+        then update meta2 with a single request.
+
+        :returns: a `list` of (chunk_id, result) tuples, where result is
+            the description of the moved chunk, or the exception which
+            prevented the chunk from being moved.
+        """
+        results = list()
+        moves = list()
+        for chunk_id in chunk_ids:
+            try:
+                current_chunk, chunk_service_id = self._find_chunk_to_move(
+                    chunk_id, service_id=service_id)
+                spare_url, qualities = self._copy_chunk_to_spare(
+                    current_chunk, service_id=chunk_service_id,
+                    check_quality=check_quality, dry_run=dry_run,
+                    max_attempts=max_attempts, **kwargs)
+            except Exception as err:
+                results.append((chunk_id, err))
+                continue
+            moves.append((Chunk(dict(current_chunk.raw())), spare_url))
+            # Update the chunk right now, so the spare chunks
+            # of the next ones are selected knowing its new place.
+            current_chunk.url = spare_url
+            current_chunk.quality = qualities[current_chunk.url]
+            results.append((chunk_id, current_chunk.raw()))
+
+        if moves and not dry_run:
+            self._update_spare_chunks(moves, **kwargs)
+            for old_chunk, _ in moves:
+                self._delete_moved_chunk(old_chunk, **kwargs)
+        return results
+
     def move_linked_chunk(self, chunk_id, from_url):
         current_chunk = self.chunks.filter(id=chunk_id).one()
         if current_chunk is None:
@@ -0,0 +1,245 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+import errno
+import os
+import time
+from collections import OrderedDict
+
+from oio.common.json import json
+
+
+class _Progress(object):
+    """
+    Progress of a walk through sorted items, processed concurrently.
+    The marker is the last item whose predecessors have all been
+    processed.
+    """
+
+    def __init__(self, marker=None):
+        self.marker = marker
+        self.walked = False
+        # Item -> number of tasks not processed yet
+        self._pending = OrderedDict()
+
+    @property
+    def complete(self):
+        return self.walked and not self._pending
+
+    def skip(self, item):
+        return self.marker is not None and item <= self.marker
+
+    def start(self, item, count=1):
+        self._pending[item] = self._pending.get(item, 0) + count
+
+    def done(self, item):
+        pending = self._pending.get(item)
+        if pending is None:
+            return
+        self._pending[item] = pending - 1
+        while self._pending:
+            item, pending = next(iter(self._pending.items()))
+            if pending > 0:
+                break
+            self._pending.popitem(last=False)
+            self.marker = item
+
+
+class IntegrityCheckpoint(object):
+    """
+    Keep track of the progress of a check of the whole namespace,
+    which goes through accounts, containers and objects in lexical order.
+
+    The progress is saved (if `path` is set) in a JSON file:
+    - the last account whose containers have all been checked,
+    - for the accounts being checked, the last container whose objects
+      have all been checked, and for the containers being checked,
+      the last object checked (with all its predecessors),
+    - the start time of the current pass and of the last complete pass.
+
+    A pass interrupted (by a restart) resumes after these markers.
+    """
+
+    def __init__(self, path=None, interval=60.0, logger=None):
+        self.path = path
+        self.interval = interval
+        self.logger = logger
+        self.pass_start = None
+        self.last_pass_start = None
+        self.last_save = 0.0
+        self._reset()
+
+    def _reset(self, state=None):
+        state = state or dict()
+        self._accounts = _Progress(state.get('account'))
+        # Markers of the accounts being checked, as loaded
+        self._markers = state.get('accounts') or dict()
+        # Account -> progress of its containers
+        self._containers = dict()
+        # (account, container) -> progress of its objects
+        self._objects = dict()
+
+    def state(self):
+        accounts = dict()
+        for account, markers in self._markers.items():
+            accounts[account] = {
+                'container': markers.get('container'),
+                'objects': dict(markers.get('objects') or dict())}
+        for account, progress in self._containers.items():
+            accounts.setdefault(account, {'objects': dict()})
+            accounts[account]['container'] = progress.marker
+        for (account, container), progress in self._objects.items():
+            if progress.marker is not None:
+                accounts[account]['objects'][container] = progress.marker
+        return {'account': self._accounts.marker,
+                'accounts': accounts,
+                'pass_start': self.pass_start,
+                'last_pass_start': self.last_pass_start}
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r') as fd:
+                state = json.load(fd)
+        except IOError as err:
+            if err.errno != errno.ENOENT:
+                raise
+            return
+        except ValueError as err:
+            if self.logger:
+                self.logger.warn('Ignoring invalid checkpoint %s: %s',
+                                 self.path, err)
+            return
+        self._reset(state)
+        self.pass_start = state.get('pass_start')
+        self.last_pass_start = state.get('last_pass_start')
+
+    def save(self):
+        self.last_save = time.time()
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as fd:
+            json.dump(self.state(), fd)
+            fd.flush()
+            os.fsync(fd.fileno())
+        os.rename(tmp_path, self.path)
+
+    def _maybe_save(self):
+        if time.time() - self.last_save >= self.interval:
+            self.save()
+
+    def start_pass(self):
+        """Start a new pass, or resume the interrupted one."""
+        self.load()
+        if self.pass_start is not None and (self._accounts.marker is not None
+                                            or self._markers):
+            if self.logger:
+                self.logger.info(
+                    'Resuming pass started at %s after account %s',
+                    time.ctime(self.pass_start), self._accounts.marker)
+        else:
+            self._reset()
+            self.pass_start = time.time()
+        self.save()
+
+    def end_pass(self):
+        """Record the end of a complete pass."""
+        self.last_pass_start = self.pass_start
+        self.pass_start = None
+        self._reset()
+        self.save()
+
+    def skip_account(self, account):
+        return self._accounts.skip(account)
+
+    def skip_container(self, account, container):
+        progress = self._containers.get(account)
+        return progress is not None and progress.skip(container)
+
+    def skip_object(self, account, container, obj):
+        progress = self._objects.get((account, container))
+        return progress is not None and progress.skip(obj)
+
+    def account_started(self, account):
+        self._accounts.start(account)
+        self._containers[account] = _Progress(
+            self._markers.get(account, dict()).get('container'))
+
+    def account_walked(self, account):
+        """Tell all the containers of the account have been started."""
+        progress = self._containers.get(account)
+        if progress is not None:
+            progress.walked = True
+            self._check_account(account)
+
+    def _check_account(self, account):
+        if not self._containers[account].complete:
+            return
+        del self._containers[account]
+        self._markers.pop(account, None)
+        self._accounts.done(account)
+        self._maybe_save()
+
+    def container_started(self, account, container):
+        """
+        :returns: True if the container is part of the tracked walk
+            (and `container_walked` must be called), False otherwise.
+        """
+        progress = self._containers.get(account)
+        if progress is None:
+            return False
+        progress.start(container)
+        markers = self._markers.get(account, dict()).get('objects') or dict()
+        self._objects[(account, container)] = _Progress(markers.get(container))
+        return True
+
+    def container_walked(self, account, container):
+        """Tell all the objects of the container have been started."""
+        progress = self._objects.get((account, container))
+        if progress is not None:
+            progress.walked = True
+            self._check_container(account, container)
+
+    def _check_container(self, account, container):
+        if not self._objects[(account, container)].complete:
+            return
+        del self._objects[(account, container)]
+        self._markers.get(account, dict()).get('objects', dict()).pop(
+            container, None)
+        self._containers[account].done(container)
+        self._check_account(account)
+
+    def object_started(self, account, container, obj, count=1):
+        """
+        :param count: the number of versions of the object to check
+        :returns: True if the object is part of the tracked walk
+            (and `object_done` must be called for each version),
+            False otherwise.
+        """
+        progress = self._objects.get((account, container))
+        if progress is None:
+            return False
+        progress.start(obj, count)
+        return True
+
+    def object_done(self, account, container, obj):
+        """Tell one version of the object has been checked."""
+        progress = self._objects.get((account, container))
+        if progress is not None:
+            progress.done(obj)
+            self._check_container(account, container)
+            self._maybe_save()
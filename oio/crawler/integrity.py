@@ -25,16 +25,22 @@ from oio.common.green import Event, GreenPool, LightQueue, sleep, Semaphore,\
 import os
 import csv
 import sys
+from array import array
+from binascii import hexlify, unhexlify
+from bisect import bisect_left
 from time import time
 from six import iteritems
+from six.moves import intern
 
 from oio.blob.rebuilder import BlobRebuilder
 from oio.common import exceptions as exc
+from oio.common.cache import MetadataCache
 from oio.common.fullpath import decode_fullpath
 from oio.common.json import json
 from oio.common.logger import get_logger
 from oio.common.storage_method import STORAGE_METHODS
-from oio.common.utils import cid_from_name, CacheDict
+from oio.crawler.checkpoint import IntegrityCheckpoint
+from oio.common.utils import cid_from_name
 from oio.event.beanstalk import BeanstalkdSender
 from oio.api.object_storage import ObjectStorageApi
 from oio.api.object_storage import _sort_chunks
@@ -192,6 +198,177 @@ class ItemResult(object):
         return separator.join(err_format % x for x in self.errors)
 
 
+class ObjectVersion(object):
+    """
+    Version of an object, as found in a container listing.
+    Can be read like the `dict` returned by the listing.
+    """
+
+    __slots__ = ('name', 'id', 'version')
+
+    def __init__(self, name, id_, version):
+        self.name = name
+        self.id = id_
+        self.version = version
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __repr__(self):
+        return 'ObjectVersion(%r, %r, %r)' % (self.name, self.id,
+                                              self.version)
+
+
+def _intern(name):
+    try:
+        return intern(name)
+    except TypeError:
+        # Python 2 does not intern unicode strings
+        return name
+
+
+class ContainerListing(object):
+    """
+    Compact and read-only listing of the objects of a container.
+
+    Behaves like a `dict` whose keys are object names and values are
+    lists of `ObjectVersion`, the most recent version first.
+    Names are interned and kept sorted in a list, versions and content
+    IDs are stored in arrays, records are built on demand.
+    """
+
+    CONTENT_ID_SIZE = 16
+
+    def __init__(self, entries=()):
+        """
+        :param entries: (name, version, content ID) tuples
+        """
+        entries = sorted(entries, key=lambda entry: (entry[0], -entry[1]))
+        self._names = list()
+        # Index of the first version of each object, plus the total
+        self._offsets = array('L')
+        self._versions = array('q')
+        for index, (name, version, _) in enumerate(entries):
+            if not self._names or self._names[-1] != name:
+                self._names.append(_intern(name))
+                self._offsets.append(index)
+            self._versions.append(version)
+        self._offsets.append(len(entries))
+        try:
+            self._ids = b''.join(self._pack_id(entry[2])
+                                 for entry in entries)
+            self._packed_ids = True
+        except (TypeError, ValueError):
+            # Not hexadecimal IDs, keep them as they are
+            self._ids = [entry[2] for entry in entries]
+            self._packed_ids = False
+
+    @classmethod
+    def _pack_id(cls, content_id):
+        if len(content_id) != 2 * cls.CONTENT_ID_SIZE \
+                or content_id != content_id.upper():
+            raise ValueError('Not an uppercase hexadecimal ID')
+        return unhexlify(content_id)
+
+    def _id(self, index):
+        if not self._packed_ids:
+            return self._ids[index]
+        start = index * self.CONTENT_ID_SIZE
+        return hexlify(
+            self._ids[start:start + self.CONTENT_ID_SIZE]).decode().upper()
+
+    def _index(self, name):
+        index = bisect_left(self._names, name)
+        if index < len(self._names) and self._names[index] == name:
+            return index
+        return None
+
+    def _object_versions(self, index):
+        name = self._names[index]
+        return [ObjectVersion(name, self._id(i), self._versions[i])
+                for i in range(self._offsets[index],
+                               self._offsets[index + 1])]
+
+    @property
+    def nb_versions(self):
+        return len(self._versions)
+
+    @property
+    def nbytes(self):
+        """Estimated memory footprint of the listing, in bytes."""
+        return (sys.getsizeof(self._names) +
+                sum(sys.getsizeof(name) for name in self._names) +
+                sys.getsizeof(self._offsets) +
+                sys.getsizeof(self._versions) +
+                sys.getsizeof(self._ids))
+
+    def __contains__(self, name):
+        return self._index(name) is not None
+
+    def __getitem__(self, name):
+        index = self._index(name)
+        if index is None:
+            raise KeyError(name)
+        return self._object_versions(index)
+
+    def get(self, name, default=None):
+        index = self._index(name)
+        if index is None:
+            return default
+        return self._object_versions(index)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def keys(self):
+        return iter(self._names)
+
+    def values(self):
+        for index in range(len(self._names)):
+            yield self._object_versions(index)
+
+    def items(self):
+        for index, name in enumerate(self._names):
+            yield name, self._object_versions(index)
+
+
+def _estimate_size(item):
+    nbytes = getattr(item, 'nbytes', None)
+    if nbytes is not None:
+        return nbytes
+    if isinstance(item, (tuple, list)):
+        return sys.getsizeof(item) + sum(_estimate_size(x) for x in item)
+    return len(json.dumps(item, separators=(',', ':'), default=str))
+
+
+class ListingCache(MetadataCache):
+    """
+    Cache of the listings and check results of the `Checker`,
+    bounded in number of entries and in bytes.
+    """
+
+    @staticmethod
+    def _estimate_size(key, value):
+        return _estimate_size(key) + _estimate_size(value)
+
+    def _evict(self):
+        # Never evict the entry which has just been set: a listing
+        # bigger than the budget would otherwise be fetched again
+        # for each of its objects.
+        while len(self._entries) > 1 and (
+                (self.size and len(self._entries) > self.size) or
+                (self.max_bytes and self.bytes > self.max_bytes)):
+            key = next(iter(self._entries))
+            self._pop(key)
+            self.evictions += 1
+
+
 class Checker(object):
     def __init__(self, namespace, concurrency=50,
                  error_file=None, rebuild_file=None, check_xattr=True,
@@ -200,7 +377,9 @@ class Checker(object):
                  min_time_in_error=0.0, required_confirmations=0,
                  beanstalkd_addr=None,
                  beanstalkd_tube=BlobRebuilder.DEFAULT_BEANSTALKD_WORKER_TUBE,
-                 cache_size=2**24, **_kwargs):
+                 cache_size=2**24, cache_max_bytes=2**30,
+                 checkpoint=None, shard=0, nb_shards=1,
+                 locate_batch_size=100, **_kwargs):
         self.pool = GreenPool(concurrency)
         self.error_file = error_file
         self.error_sender = None
@@ -248,7 +427,13 @@ class Checker(object):
         self.object_exceptions = 0
         self.chunk_exceptions = 0
 
-        self.list_cache = CacheDict(cache_size)
+        # Listings and results, kept within a memory budget
+        self.list_cache = ListingCache(size=cache_size,
+                                       max_bytes=cache_max_bytes, ttl=0)
+        # Objects located by batches, before being checked:
+        # (account, container, obj, version) -> (meta, chunks) or exception
+        self.locate_batch_size = locate_batch_size
+        self.located = dict()
         self.running_tasks = {}
         self.running_lock = Semaphore(1)
         self.result_queue = LightQueue(concurrency)
@@ -264,6 +449,16 @@ class Checker(object):
         self.min_time_in_error = min_time_in_error
         self.required_confirmations = required_confirmations
 
+        # IntegrityCheckpoint, to resume the check of all accounts
+        self.checkpoint = checkpoint
+        # Check only the containers whose ID, modulo the number of shards,
+        # is the index of the shard (when recursing from accounts).
+        if nb_shards < 1 or not 0 <= shard < nb_shards:
+            raise ValueError('shard must be between 0 and %d' %
+                             (nb_shards - 1, ))
+        self.shard = shard
+        self.nb_shards = nb_shards
+
     def reset_stats(self):
         self.accounts_checked = 0
         self.containers_checked = 0
@@ -628,6 +823,13 @@ class Checker(object):
         :returns: a tuple with object metadata and a list of chunks.
         """
         try:
+            located = self.located.pop(
+                (target.account, target.container, target.obj,
+                 target.version), None)
+            if isinstance(located, Exception):
+                raise located
+            if located is not None:
+                return located
             return self.api.object_locate(
                 target.account, target.container, target.obj,
                 version=target.version, properties=False)
@@ -785,7 +987,9 @@ class Checker(object):
                 # safeguard, probably useless
                 if not marker:
                     marker = resp['objects'][-1]['name']
-                results.extend(resp['objects'])
+                # Keep only what is needed from the listing
+                results.extend((obj['name'], obj['version'], obj['id'])
+                               for obj in resp['objects'])
                 if not truncated or self.limit_listings > 1:
                     break
             else:
@@ -793,12 +997,9 @@ class Checker(object):
                 ct_meta.pop('objects')
                 break
 
-        container_listing = dict()
         # Save all object versions, with the most recent first
-        for obj in results:
-            container_listing.setdefault(obj['name'], list()).append(obj)
-        for versions in container_listing.values():
-            versions.sort(key=lambda o: o['version'], reverse=True)
+        container_listing = ContainerListing(results)
+        del results
 
         if self.limit_listings <= 1:
             # We just listed the whole container, keep the result in a cache
@@ -807,16 +1008,54 @@ class Checker(object):
         self._unlock((account, container))
 
         if recurse > 0:
-            for obj_vers in container_listing.values():
+            batch = list()
+            for name, obj_vers in container_listing.items():
+                check_obj = self.check_obj
+                if self.checkpoint is not None:
+                    if self.checkpoint.skip_object(account, container, name):
+                        continue
+                    if self.checkpoint.object_started(
+                            account, container, name, len(obj_vers)):
+                        check_obj = self._check_obj_checkpoint
                 for obj in obj_vers:
                     tcopy = target.copy_object()
                     tcopy.obj = obj['name']
                     tcopy.content_id = obj['id']
                     tcopy.version = str(obj['version'])
-                    self._spawn_n(self.check_obj, tcopy, recurse - 1)
+                    batch.append((check_obj, tcopy))
+                if len(batch) >= self.locate_batch_size:
+                    self._check_objs(batch, recurse - 1)
+                    batch = list()
+            self._check_objs(batch, recurse - 1)
         self.send_result(target, errors)
         return container_listing, ct_meta
 
+    def _check_objs(self, batch, recurse=0):
+        """
+        Locate a batch of objects of a same container with as few
+        requests as possible, then spawn their checks.
+
+        :param batch: a list of (check function, target) tuples
+        """
+        if not batch or not self.running:
+            return
+        if len(batch) > 1:
+            target = batch[0][1]
+            try:
+                located = self.api.object_locate_many(
+                    target.account, target.container,
+                    [(tgt.obj, tgt.version) for _, tgt in batch],
+                    properties=False, batch_size=self.locate_batch_size)
+                for (_, tgt), (_, result) in zip(batch, located):
+                    self.located[(tgt.account, tgt.container, tgt.obj,
+                                  tgt.version)] = result
+            except Exception as err:
+                # Each object will be located by its own check
+                self.logger.warn('Failed to locate objects of %s: %s',
+                                 target.copy_container(), err)
+        for check_obj, tgt in batch:
+            self._spawn_n(check_obj, tgt, recurse)
+
     def check_account(self, target, recurse=0):
         account = target.account
 
@@ -863,10 +1102,18 @@ class Checker(object):
         self._unlock(account)
 
         if recurse > 0:
-            for container in containers:
+            for container in sorted(containers):
+                if not self._in_shard(account, container):
+                    continue
+                check_container = self.check_container
+                if self.checkpoint is not None:
+                    if self.checkpoint.skip_container(account, container):
+                        continue
+                    if self.checkpoint.container_started(account, container):
+                        check_container = self._check_container_checkpoint
                 tcopy = target.copy_account()
                 tcopy.container = container
-                self._spawn_n(self.check_container, tcopy, recurse - 1)
+                self._spawn_n(check_container, tcopy, recurse - 1)
 
         self.send_result(target, errors)
         return containers
@@ -883,8 +1130,44 @@ class Checker(object):
 
     def check_all_accounts(self, recurse=0):
         all_accounts = self.api.account_list()
-        for acct in all_accounts:
-            self.check(Target(acct), recurse=recurse)
+        if self.checkpoint is None:
+            for acct in all_accounts:
+                self.check(Target(acct), recurse=recurse)
+            return
+
+        self.checkpoint.start_pass()
+        for acct in sorted(all_accounts):
+            if self.checkpoint.skip_account(acct):
+                continue
+            self.checkpoint.account_started(acct)
+            self._spawn_n(self._check_account_checkpoint, Target(acct),
+                          recurse)
+
+    def _in_shard(self, account, container):
+        if self.nb_shards <= 1:
+            return True
+        cid = cid_from_name(account, container)
+        return int(cid, 16) % self.nb_shards == self.shard
+
+    def _check_account_checkpoint(self, target, recurse=0):
+        try:
+            return self.check_account(target, recurse=recurse)
+        finally:
+            self.checkpoint.account_walked(target.account)
+
+    def _check_container_checkpoint(self, target, recurse=0):
+        try:
+            return self.check_container(target, recurse=recurse)
+        finally:
+            self.checkpoint.container_walked(target.account,
+                                             target.container)
+
+    def _check_obj_checkpoint(self, target, recurse=0):
+        try:
+            return self.check_obj(target, recurse=recurse)
+        finally:
+            self.checkpoint.object_done(target.account, target.container,
+                                        target.obj)
 
     def fetch_results(self, rate_limiter=None):
         while self.running and not self.result_queue.empty():
@@ -962,7 +1245,8 @@ class Checker(object):
         for result in self.fetch_results():
             self.log_result(result)
             yield result
-        self.list_cache = CacheDict(self.list_cache.size)
+        self.list_cache.clear()
+        self.located.clear()
 
     def stop(self):
         self.logger.info("Stopping")
@@ -1021,6 +1305,12 @@ def run_once(checker, entries=None, rate_limiter=None):
         checker.check_all_accounts(recurse=DEFAULT_DEPTH)
     for _ in checker.run(rate_limiter):
         pass
+    if checker.checkpoint is not None and not entries:
+        if checker.running:
+            checker.checkpoint.end_pass()
+        else:
+            # Interrupted, the next run will resume from here
+            checker.checkpoint.save()
     if not checker.report():
         return 1
     return 0
@@ -1091,6 +1381,17 @@ def main():
                               "events to (default=%s)." %
                               BlobRebuilder.DEFAULT_BEANSTALKD_WORKER_TUBE))
 
+    parser.add_argument('--cache-max-bytes', type=int, default=2**30,
+                        help=("Maximum memory used to cache listings "
+                              "and check results, in bytes "
+                              "(default: 1GiB)."))
+    parser.add_argument('--checkpoint', metavar='PATH',
+                        help=("When checking all accounts, save the "
+                              "progress in this file, and resume from it "
+                              "after a restart."))
+    parser.add_argument('--checkpoint-interval', type=float, default=60.0,
+                        help=("Minimum time between two saves of the "
+                              "checkpoint (default: 60.0 seconds)."))
     parser.add_argument('--concurrency', '--workers', type=int,
                         default=50,
                         help='Number of concurrent checks (default: 50).')
@@ -1119,6 +1420,14 @@ def main():
     parser.add_argument('-p', '--presence',
                         action='store_true', default=False,
                         help="Presence check, the xattr check is skipped.")
+    parser.add_argument('--shard', type=int, default=0,
+                        help=("Index of the shard of containers to check, "
+                              "from 0 to --shards minus 1 (default: 0)."))
+    parser.add_argument('--shards', type=int, default=1,
+                        help=("Split the containers in this number of "
+                              "shards, according to their ID, to share the "
+                              "check between several crawlers "
+                              "(default: 1)."))
     parser.add_argument('-r', '--ratelimit',
                         help=('Set the hour-based rate limiting policy. '
                               'Ex: "0h30:10;6h45:2;15h30:3;9h45:5;20h00:8".'))
@@ -1147,6 +1456,11 @@ def main():
             entries = None
             limit_listings = 0
     logger = get_logger_from_args(args)
+    checkpoint = None
+    if args.checkpoint:
+        checkpoint = IntegrityCheckpoint(
+            path=args.checkpoint, interval=args.checkpoint_interval,
+            logger=logger)
     checker = Checker(
         args.namespace,
         error_file=args.output,
@@ -1161,6 +1475,10 @@ def main():
         required_confirmations=args.confirmations,
         beanstalkd_addr=args.beanstalkd,
         beanstalkd_tube=args.beanstalkd_tube,
+        cache_max_bytes=args.cache_max_bytes,
+        checkpoint=checkpoint,
+        shard=args.shard,
+        nb_shards=args.shards,
     )
 
     if args.ratelimit:
@@ -318,6 +318,10 @@ class Connection(object):
 
     def send_command(self, command, *args, **kwargs):
         encoded = self.pack_command(command, kwargs.get('body'), *args)
+        self.send_packed(encoded)
+
+    def send_packed(self, encoded):
+        """Send already packed command(s)."""
         if not self._sock:
             self.connect()
         try:
@@ -507,6 +511,42 @@ class Beanstalk(object):
         else:
             raise InvalidResponse(command_name, status, results)
 
+    def execute_pipeline(self, commands):
+        """
+        Send several commands in one write, then read their responses.
+
+        :param commands: a list of tuples with the name of a command
+            and its arguments (commands with a body are not supported)
+        :returns: a list with, for each command, its result or the
+            `ResponseError` it raised
+        """
+        connection = self._get_connection()
+        try:
+            connection.send_packed(b''.join(
+                connection.pack_command(command[0], None, *command[1:])
+                for command in commands))
+            results = list()
+            for command in commands:
+                try:
+                    results.append(
+                        self.parse_response(connection, command[0]))
+                except ResponseError as err:
+                    results.append(err)
+            return results
+        except (ConnectionError, TimeoutError, InvalidResponse):
+            # The remaining responses cannot be read reliably
+            connection.disconnect()
+            raise
+        finally:
+            self._release_connection(connection)
+
+    def pipeline(self):
+        """
+        Get an object delaying delete, release and bury commands,
+        to send them at once with `Pipeline.execute()`.
+        """
+        return Pipeline(self)
+
     def put(self, body, priority=DEFAULT_PRIORITY, delay=0, ttr=DEFAULT_TTR):
         assert isinstance(body, str), 'body must be str'
         _, results = self.execute_command('put', priority, delay, ttr,
@@ -526,6 +566,25 @@ class Beanstalk(object):
         else:
             return self.execute_command('reserve')
 
+    def reserve_many(self, max_jobs, timeout=None):
+        """
+        Reserve up to `max_jobs` jobs.
+
+        Wait (at most `timeout` seconds) for the first job. The other ones
+        are reserved only if they are ready, with pipelined commands.
+
+        :returns: a list of tuples (job_id, data)
+        """
+        jobs = [self.reserve(timeout=timeout)]
+        if max_jobs > 1:
+            results = self.execute_pipeline(
+                [('reserve-with-timeout', 0)] * (max_jobs - 1))
+            # Even after a TIMED_OUT response, a new job may have been
+            # reserved by one of the next commands.
+            jobs.extend(res for res in results
+                        if not isinstance(res, ResponseError))
+        return jobs
+
     def bury(self, job_id, priority=DEFAULT_PRIORITY):
         self.execute_command('bury', job_id, priority)
 
@@ -643,6 +702,45 @@ class Beanstalk(object):
             self._connection = None
 
 
+class Pipeline(object):
+    """
+    Wrapper over a `Beanstalk` client, queuing delete, release and bury
+    commands, to send them in one write when `execute()` is called.
+    Other methods are forwarded to the client.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = list()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def __len__(self):
+        return len(self.commands)
+
+    def bury(self, job_id, priority=DEFAULT_PRIORITY):
+        self.commands.append(('bury', job_id, priority))
+
+    def release(self, job_id, priority=DEFAULT_PRIORITY, delay=0):
+        self.commands.append(('release', job_id, priority, delay))
+
+    def delete(self, job_id):
+        self.commands.append(('delete', job_id))
+
+    def execute(self):
+        """
+        Send the queued commands.
+
+        :returns: a list of tuples with each command (name and arguments)
+            and its result, or the `ResponseError` it raised
+        """
+        if not self.commands:
+            return list()
+        commands, self.commands = self.commands, list()
+        return list(zip(commands, self.client.execute_pipeline(commands)))
+
+
 class TubedBeanstalkd(object):
     """
     Beanstalkd wrapper that will talk to a single tube.
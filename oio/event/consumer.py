@@ -13,7 +13,7 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library.
 
-from oio.common.green import eventlet, Timeout, greenthread
+from oio.common.green import eventlet, Timeout, greenthread, GreenPool
 
 import signal
 import os
@@ -125,10 +125,13 @@ class EventWorker(Worker):
         self.app_env = dict()
         self.concurrency = 1
         self.graceful_timeout = 1
+        self.reserve_batch_size = 1
         self.tube = None
 
     def init(self):
         self.concurrency = int_value(self.conf.get('concurrency'), 10)
+        self.reserve_batch_size = int_value(
+            self.conf.get('reserve_batch_size'), 1)
         self.tube = self.conf.get("tube", DEFAULT_TUBE)
         acct_refresh_interval = int_value(
             self.conf.get('acct_refresh_interval'), 3600)
@@ -214,7 +217,10 @@ class EventWorker(Worker):
                 beanstalk.watch(self.tube)
             while True:
                 try:
-                    job_id, data = beanstalk.reserve()
+                    if self.reserve_batch_size > 1:
+                        jobs = beanstalk.reserve_many(self.reserve_batch_size)
+                    else:
+                        jobs = [beanstalk.reserve()]
                     if conn_error:
                         self.logger.warn("beanstalk reconnected")
                         conn_error = False
@@ -224,33 +230,64 @@ class EventWorker(Worker):
                         conn_error = True
                     eventlet.sleep(BEANSTALK_RECONNECTION)
                     continue
-                event = self.safe_decode_job(job_id, data)
-                if not event:
-                    self.logger.warn("Burying event %s: %s",
-                                     job_id, "malformed")
-                    beanstalk.bury(job_id)
+                if len(jobs) > 1:
+                    self.process_jobs(jobs, beanstalk)
                 else:
-                    try:
-                        self.process_event(job_id, event, beanstalk)
-                    except (ClientException, OioNetworkException) as exc:
-                        self.logger.warn("Burying event %s (%s): %s",
-                                         job_id, event.get('event'), exc)
-                        beanstalk.bury(job_id)
-                    except ExplicitBury:
-                        self.logger.info("Burying event %s (%s)",
-                                         job_id, event.get('event'))
-                        beanstalk.bury(job_id)
-                    except StopServe:
-                        self.logger.info("Releasing event %s (%s): stopping",
-                                         job_id, event.get('event'))
-                        beanstalk.release(job_id)
-                    except Exception:
-                        self.logger.exception("Burying event %s: %s",
-                                              job_id, event)
-                        beanstalk.bury(job_id)
+                    self.process_job(jobs[0][0], jobs[0][1], beanstalk)
         except StopServe:
             pass
 
+    def process_jobs(self, jobs, beanstalk):
+        """
+        Process several jobs concurrently, then send all delete, release
+        and bury commands at once.
+        """
+        pipeline = beanstalk.pipeline()
+        pool = GreenPool(len(jobs))
+        try:
+            for job_id, data in jobs:
+                pool.spawn_n(self.process_job, job_id, data, pipeline)
+            pool.waitall()
+        finally:
+            # If interrupted, unfinished jobs stay reserved
+            # until the connection is closed.
+            try:
+                results = pipeline.execute()
+            except ConnectionError as exc:
+                self.logger.warn("Failed to acknowledge %d jobs: %s",
+                                 len(jobs), exc)
+                results = list()
+            for command, result in results:
+                if isinstance(result, ResponseError):
+                    self.logger.warn("Job %s: %s failed: %s",
+                                     command[1], command[0], result)
+
+    def process_job(self, job_id, data, beanstalk):
+        event = self.safe_decode_job(job_id, data)
+        if not event:
+            self.logger.warn("Burying event %s: %s",
+                             job_id, "malformed")
+            beanstalk.bury(job_id)
+            return
+        try:
+            self.process_event(job_id, event, beanstalk)
+        except (ClientException, OioNetworkException) as exc:
+            self.logger.warn("Burying event %s (%s): %s",
+                             job_id, event.get('event'), exc)
+            beanstalk.bury(job_id)
+        except ExplicitBury:
+            self.logger.info("Burying event %s (%s)",
+                             job_id, event.get('event'))
+            beanstalk.bury(job_id)
+        except StopServe:
+            self.logger.info("Releasing event %s (%s): stopping",
+                             job_id, event.get('event'))
+            beanstalk.release(job_id)
+        except Exception:
+            self.logger.exception("Burying event %s: %s",
+                                  job_id, event)
+            beanstalk.bury(job_id)
+
     def process_event(self, job_id, event, beanstalk):
         handler = self.get_handler(event)
         if not handler:
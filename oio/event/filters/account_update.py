@@ -14,9 +14,11 @@
 # License along with this library.
 
 
+from oio.common.green import eventlet, Event as GreenEvent
 from oio.common.constants import REQID_HEADER, CONNECTION_TIMEOUT, \
     READ_TIMEOUT, HIDDEN_ACCOUNTS
-from oio.common.exceptions import ClientException, OioTimeout
+from oio.common.easy_value import float_value, int_value
+from oio.common.exceptions import ClientException, OioTimeout, from_status
 from oio.common.utils import request_id
 from oio.event.evob import Event, EventError, EventTypes
 from oio.event.filters.base import Filter
@@ -28,6 +30,17 @@ CONTAINER_EVENTS = [
         EventTypes.CONTAINER_DELETED]
 
 
+class PendingUpdates(object):
+    """Container state updates waiting to be sent together."""
+
+    def __init__(self):
+        # (account, container) -> most recent update
+        self.updates = dict()
+        self.done = GreenEvent()
+        self.flushed = False
+        self.timer = None
+
+
 class AccountUpdateFilter(Filter):
     """
     Fill in the account service with information coming from meta2 services
@@ -41,6 +54,65 @@ class AccountUpdateFilter(Filter):
                                                       CONNECTION_TIMEOUT))
         self.read_timeout = float(self.conf.get('read_timeout',
                                                 READ_TIMEOUT))
+        # How long to wait for other container state updates
+        # before sending them all (0 to disable).
+        self.coalesce_window = float_value(
+            self.conf.get('coalesce_window'), 0.0)
+        self.coalesce_max_updates = int_value(
+            self.conf.get('coalesce_max_updates'), 100)
+        self._pending = None
+
+    def _flush(self, batch):
+        """Send the pending updates, wake up the events waiting."""
+        if batch.flushed:
+            return
+        batch.flushed = True
+        if self._pending is batch:
+            self._pending = None
+        # Cancelling a timer may yield, the batch must be detached before
+        batch.timer.cancel()
+        keys = list(batch.updates)
+        try:
+            results = self.account.container_update_many(
+                [batch.updates[key] for key in keys],
+                connection_timeout=self.connection_timeout,
+                read_timeout=self.read_timeout,
+                headers={REQID_HEADER: request_id('account-update-')})
+        except Exception as exc:
+            batch.done.send_exception(exc)
+        else:
+            batch.done.send(dict(zip(keys, results)))
+
+    def _coalesce_update(self, account, container, body):
+        """
+        Add a container state update to the pending ones,
+        and wait for them to be sent.
+
+        :returns: False if the update has been superseded by a more
+            recent one, True otherwise
+        :raises ClientException: if the update failed
+        """
+        batch = self._pending
+        if batch is None:
+            batch = self._pending = PendingUpdates()
+            batch.timer = eventlet.spawn_after(
+                self.coalesce_window, self._flush, batch)
+        key = (account, container)
+        previous = batch.updates.get(key)
+        if previous is not None and previous['mtime'] >= body['mtime']:
+            return False
+        update = dict(body, account=account, name=container)
+        batch.updates[key] = update
+        if len(batch.updates) >= self.coalesce_max_updates:
+            self._flush(batch)
+        results = batch.done.wait()
+        if batch.updates[key] is not update:
+            # Superseded while waiting
+            return False
+        result = results[key]
+        if result['status'] // 100 != 2:
+            raise from_status(result['status'], result.get('message'))
+        return True
 
     def process(self, env, beanstalkd, cb):
         event = Event(env)
@@ -65,10 +137,18 @@ class AccountUpdateFilter(Filter):
                     body['mtime'] = mtime
                 elif event.event_type == EventTypes.CONTAINER_DELETED:
                     body['dtime'] = mtime
-                self.account.container_update(
-                    url.get('account'), url.get('user'), body,
-                    connection_timeout=self.connection_timeout,
-                    read_timeout=self.read_timeout, headers=headers)
+                if (self.coalesce_window > 0.0 and
+                        event.event_type == EventTypes.CONTAINER_STATE):
+                    if not self._coalesce_update(
+                            url.get('account'), url.get('user'), body):
+                        self.logger.debug(
+                            "Discarding event %s (job_id=%s): superseded",
+                            event.event_type, event.job_id)
+                else:
+                    self.account.container_update(
+                        url.get('account'), url.get('user'), body,
+                        connection_timeout=self.connection_timeout,
+                        read_timeout=self.read_timeout, headers=headers)
             elif event.event_type == EventTypes.ACCOUNT_SERVICES:
                 url = event.env.get('url')
                 if isinstance(event.data, list):
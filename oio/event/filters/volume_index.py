@@ -13,7 +13,10 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library.
 
+from oio.common.green import eventlet, Event as GreenEvent
 from oio.common.constants import REQID_HEADER
+from oio.common.easy_value import float_value, int_value
+from oio.common.utils import request_id
 from oio.event.evob import Event, EventError, EventTypes
 from oio.event.filters.base import Filter
 from oio.common.exceptions import OioException, VolumeException
@@ -24,11 +27,28 @@ SERVICE_EVENTS = [EventTypes.ACCOUNT_SERVICES, EventTypes.META2_DELETED,
                   EventTypes.CONTAINER_DELETED]
 
 
+class PendingChunks(object):
+    """Chunk records waiting to be sent to the same volume."""
+
+    def __init__(self):
+        self.chunks = list()
+        self.done = GreenEvent()
+        self.flushed = False
+        self.timer = None
+
+
 class VolumeIndexFilter(Filter):
 
     def __init__(self, *args, **kwargs):
         super(VolumeIndexFilter, self).__init__(*args, **kwargs)
         self.rdir = self.app_env['rdir_client']
+        # Send chunk records by batches of rdir_batch_size records
+        # (or after rdir_batch_delay seconds), for each volume.
+        self.rdir_batch_size = int_value(self.conf.get('rdir_batch_size'), 1)
+        self.rdir_batch_delay = float_value(
+            self.conf.get('rdir_batch_delay'), 0.05)
+        # (event type, volume ID) -> PendingChunks
+        self._pending = dict()
 
     _attempts_push = 3
     _attempts_delete = 3
@@ -61,6 +81,50 @@ class VolumeIndexFilter(Filter):
                 "container_id=%s content_id=%s chunk_id=%s): %s", reqid,
                 volume_id, container_id, content_id, chunk_id, ex)
 
+    def _flush_chunks(self, key, batch):
+        """Send the pending chunk records, wake up the events waiting."""
+        if batch.flushed:
+            return
+        batch.flushed = True
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+        # Cancelling a timer may yield, the batch must be detached before
+        batch.timer.cancel()
+        event_type, volume_id = key
+        reqid = request_id('volume-index-')
+        headers = {REQID_HEADER: reqid}
+        try:
+            if event_type == EventTypes.CHUNK_DELETED:
+                errors = self.rdir.chunk_delete_many(batch.chunks,
+                                                     headers=headers)
+            else:
+                errors = self.rdir.chunk_push_many(batch.chunks,
+                                                   headers=headers)
+        except Exception as exc:
+            errors = {volume_id: exc}
+        for exc in errors.values():
+            self.logger.warn(
+                "%s of %d chunks failed (reqid=%s volume_id=%s): %s",
+                "deindexing" if event_type == EventTypes.CHUNK_DELETED
+                else "indexing", len(batch.chunks), reqid, volume_id, exc)
+        batch.done.send(None)
+
+    def _batch_chunk(self, event_type, chunk):
+        """
+        Add a chunk record to the pending ones (of the same volume),
+        and wait for them to be sent.
+        """
+        key = (event_type, chunk['volume_id'])
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = PendingChunks()
+            batch.timer = eventlet.spawn_after(
+                self.rdir_batch_delay, self._flush_chunks, key, batch)
+        batch.chunks.append(chunk)
+        if len(batch.chunks) >= self.rdir_batch_size:
+            self._flush_chunks(key, batch)
+        batch.done.wait()
+
     def _service_push(self, reqid, type_,
                       volume_id, url, cid, mtime):
         if type_ != 'meta2':
@@ -104,7 +168,17 @@ class VolumeIndexFilter(Filter):
             content_path = data.get('content_path')
             content_ver = data.get('content_version')
             try:
-                if event.event_type == EventTypes.CHUNK_DELETED:
+                if self.rdir_batch_size > 1:
+                    chunk = {'volume_id': volume_id,
+                             'container_id': container_id,
+                             'content_id': content_id,
+                             'chunk_id': chunk_id}
+                    if event.event_type != EventTypes.CHUNK_DELETED:
+                        chunk.update(content_path=content_path,
+                                     content_version=content_ver,
+                                     mtime=mtime)
+                    self._batch_chunk(event.event_type, chunk)
+                elif event.event_type == EventTypes.CHUNK_DELETED:
                     self._chunk_delete(
                         event.reqid,
                         volume_id, container_id, content_id, chunk_id)
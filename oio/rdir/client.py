@@ -28,7 +28,7 @@ from oio.common.decorators import ensure_headers, ensure_request_id
 from oio.conscience.client import ConscienceClient
 from oio.directory.client import DirectoryClient
 from oio.common.utils import depaginate, cid_from_name
-from oio.common.green import sleep
+from oio.common.green import eventlet, sleep
 from oio.common.easy_value import true_value
 
 RDIR_ACCT = '_RDIR'
@@ -39,6 +39,9 @@ JOKER_SVC_TARGET = '__any_slot'
 # Default rdir replicas for meta2/rawx services
 DEFAULT_RDIR_REPLICAS = 3
 
+# Maximum number of records the rdir service returns per fetch request
+RDIR_FETCH_MAX_LIMIT = 10000
+
 
 def _make_id(ns, type_, addr):
     return "%s|%s|%s" % (ns, type_, addr)
@@ -485,10 +488,9 @@ class RdirClient(HttpApi):
         self._rdir_request(volume_id, 'POST', 'create',
                            service_type=service_type, **kwargs)
 
-    def chunk_push(self, volume_id, container_id, content_id, chunk_id,
-                   content_path, content_version,
-                   headers=None, **data):
-        """Reference a chunk in the reverse directory"""
+    @staticmethod
+    def _chunk_record(container_id, content_id, chunk_id,
+                      content_path, content_version, **data):
         body = {
             # Will be stripped and kept only in the key
             'chunk_id': chunk_id,
@@ -502,10 +504,55 @@ class RdirClient(HttpApi):
         # Mostly mtime
         for key, value in data.items():
             body[key] = value
+        return body
+
+    def _chunk_request_many(self, method, action, records, create=False,
+                            **kwargs):
+        """
+        Send records to the reverse directory, one request per volume.
+
+        :param records: tuples with a volume ID and a record
+        :returns: a dictionary of errors, by volume ID
+        """
+        records_by_volume = dict()
+        for volume_id, record in records:
+            records_by_volume.setdefault(volume_id, list()).append(record)
+        errors = dict()
+        for volume_id, vol_records in records_by_volume.items():
+            try:
+                self._rdir_request(volume_id, method, action, create=create,
+                                   json=vol_records, **kwargs)
+            except OioException as exc:
+                errors[volume_id] = exc
+        return errors
 
+    def chunk_push(self, volume_id, container_id, content_id, chunk_id,
+                   content_path, content_version,
+                   headers=None, **data):
+        """Reference a chunk in the reverse directory"""
+        body = self._chunk_record(container_id, content_id, chunk_id,
+                                  content_path, content_version, **data)
         self._rdir_request(volume_id, 'POST', 'push', create=True,
                            json=body, headers=headers)
 
+    def chunk_push_many(self, chunks, headers=None, **kwargs):
+        """
+        Reference several chunks in the reverse directory, with one
+        request per volume (and per rdir service in charge of it).
+
+        :param chunks: dictionaries with 'volume_id', 'container_id',
+            'content_id', 'chunk_id', 'content_path' and 'content_version'
+            keys, and optionally other fields to save (mostly 'mtime')
+        :returns: a dictionary of errors, by volume ID
+        """
+        records = list()
+        for chunk in chunks:
+            data = dict(chunk)
+            volume_id = data.pop('volume_id')
+            records.append((volume_id, self._chunk_record(**data)))
+        return self._chunk_request_many('POST', 'push', records, create=True,
+                                        headers=headers, **kwargs)
+
     def chunk_delete(self, volume_id, container_id, content_id, chunk_id,
                      **kwargs):
         """Unreference a chunk from the reverse directory"""
@@ -516,10 +563,41 @@ class RdirClient(HttpApi):
         self._rdir_request(volume_id, 'DELETE', 'delete',
                            json=body, **kwargs)
 
+    def chunk_delete_many(self, chunks, **kwargs):
+        """
+        Unreference several chunks from the reverse directory, with one
+        request per volume (and per rdir service in charge of it).
+
+        :param chunks: dictionaries with 'volume_id', 'container_id',
+            'content_id' and 'chunk_id' keys
+        :returns: a dictionary of errors, by volume ID
+        """
+        records = [(chunk['volume_id'],
+                    {'container_id': chunk['container_id'],
+                     'content_id': chunk['content_id'],
+                     'chunk_id': chunk['chunk_id']})
+                   for chunk in chunks]
+        return self._chunk_request_many('DELETE', 'delete', records,
+                                        **kwargs)
+
+    def _chunk_fetch_page(self, volume, req_body, max_attempts=3, **kwargs):
+        for i in range(max_attempts):
+            try:
+                return self._rdir_request(
+                    volume, 'POST', 'fetch', json=req_body, **kwargs)
+            except OioNetworkException:
+                # Monotonic backoff
+                if i < max_attempts - 1:
+                    sleep(i * 1.0)
+                    continue
+                # Too many attempts
+                raise
+
     def chunk_fetch(self, volume, limit=1000, rebuild=False,
                     container_id=None, max_attempts=3,
                     start_after=None, shuffle=False, full_urls=False,
-                    old_format=False, **kwargs):
+                    old_format=False, prefetch=True, max_limit=None,
+                    **kwargs):
         """
         Fetch the list of chunks belonging to the specified volume.
 
@@ -539,6 +617,13 @@ class RdirClient(HttpApi):
         :type start_after: `str`
         :keyword old_format: yield (container, content, chunk and value)
             instead of just (container, chunk and value).
+        :keyword prefetch: request the next page of results while
+            the caller processes the current one.
+        :type prefetch: `bool`
+        :keyword max_limit: each time the caller has to wait for a page
+            of results, double the number of results per request,
+            up to this value (by default, `limit` is not changed).
+        :type max_limit: `int`
         """
         req_body = {'limit': limit}
         if rebuild:
@@ -547,48 +632,62 @@ class RdirClient(HttpApi):
             req_body['container_id'] = container_id
         if start_after:
             req_body['start_after'] = start_after
+        max_limit = min(max(limit, max_limit or limit), RDIR_FETCH_MAX_LIMIT)
 
-        while True:
-            for i in range(max_attempts):
-                try:
-                    resp, resp_body = self._rdir_request(
-                        volume, 'POST', 'fetch', json=req_body, **kwargs)
+        next_page = None
+        try:
+            resp, resp_body = self._chunk_fetch_page(
+                volume, dict(req_body), max_attempts=max_attempts, **kwargs)
+            while True:
+                truncated = resp.headers.get(
+                        HEADER_PREFIX + 'list-truncated')
+                if truncated is None:
+                    # TODO(adu): Delete when it will no longer be used
+                    if not resp_body:
+                        break
+                    truncated = True
+                    req_body['start_after'] = resp_body[-1][0]
+                else:
+                    truncated = true_value(truncated)
+                    if truncated:
+                        req_body['start_after'] = resp.headers[
+                            HEADER_PREFIX + 'list-marker']
+
+                if truncated and prefetch:
+                    next_page = eventlet.spawn(
+                        self._chunk_fetch_page, volume, dict(req_body),
+                        max_attempts=max_attempts, **kwargs)
+
+                if shuffle:
+                    random.shuffle(resp_body)
+                for (key, value) in resp_body:
+                    container, chunk = key.split('|')
+                    if full_urls:
+                        chunk = 'http://%s/%s' % (volume, chunk)
+                    if old_format:
+                        yield container, value['content_id'], chunk, value
+                    else:
+                        yield container, chunk, value
+
+                if not truncated:
                     break
-                except OioNetworkException:
-                    # Monotonic backoff
-                    if i < max_attempts - 1:
-                        sleep(i * 1.0)
-                        continue
-                    # Too many attempts
-                    raise
 
-            truncated = resp.headers.get(
-                    HEADER_PREFIX + 'list-truncated')
-            if truncated is None:
-                # TODO(adu): Delete when it will no longer be used
-                if not resp_body:
-                    break
-                truncated = True
-                req_body['start_after'] = resp_body[-1][0]
-            else:
-                truncated = true_value(truncated)
-                if truncated:
-                    req_body['start_after'] = resp.headers[
-                        HEADER_PREFIX + 'list-marker']
-
-            if shuffle:
-                random.shuffle(resp_body)
-            for (key, value) in resp_body:
-                container, chunk = key.split('|')
-                if full_urls:
-                    chunk = 'http://%s/%s' % (volume, chunk)
-                if old_format:
-                    yield container, value['content_id'], chunk, value
+                if next_page is None:
+                    resp, resp_body = self._chunk_fetch_page(
+                        volume, dict(req_body), max_attempts=max_attempts,
+                        **kwargs)
+                    waited = True
                 else:
-                    yield container, chunk, value
-
-            if not truncated:
-                break
+                    waited = not next_page.dead
+                    page, next_page = next_page, None
+                    resp, resp_body = page.wait()
+                if waited and req_body['limit'] < max_limit:
+                    # The caller is faster than the rdir service,
+                    # make fewer (and bigger) requests.
+                    req_body['limit'] = min(req_body['limit'] * 2, max_limit)
+        finally:
+            if next_page is not None:
+                next_page.kill()
 
     def admin_incident_set(self, volume, date, **kwargs):
         body = {'date': int(float(date))}
@@ -561,6 +561,10 @@ class XcuteBackend(RedisConnection):
         redis_conf = {k[6:]: v for k, v in self.conf.items()
                       if k.startswith('redis_')}
         super(XcuteBackend, self).__init__(**redis_conf)
+        if self.cluster:
+            # The scripts use keys shared by all jobs, and take arguments
+            # as keys: they cannot be routed to a single slot.
+            raise ValueError('xcute does not support Redis Cluster')
 
         self.script_create = self.register_script(
             self.lua_create)
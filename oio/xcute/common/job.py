@@ -46,6 +46,11 @@ class XcuteTask(object):
         return job_params != self.job_params
 
     def process(self, task_id, task_payload):
+        """
+        Process a task and return its results (a `dict` of counters).
+        An exception raised after a part of the task has been done
+        may carry the results of this part in a `task_result` attribute.
+        """
         raise NotImplementedError()
 
 
@@ -56,6 +61,7 @@ class XcuteJob(object):
 
     DEFAULT_TASKS_PER_SECOND = 32
     MAX_TASKS_BATCH_SIZE = 32
+    DEFAULT_TASKS_CONCURRENCY = 1
 
     def __init__(self, conf, logger=None):
         self.conf = conf
@@ -90,6 +96,15 @@ class XcuteJob(object):
                              cls.MAX_TASKS_BATCH_SIZE)
         sanitized_job_config['tasks_batch_size'] = tasks_batch_size
 
+        tasks_concurrency = int_value(
+            job_config.get('tasks_concurrency'),
+            cls.DEFAULT_TASKS_CONCURRENCY)
+        if tasks_concurrency < 1:
+            raise ValueError('Tasks concurrency should be positive')
+        # More workers than tasks in a batch would be useless
+        sanitized_job_config['tasks_concurrency'] = min(
+            tasks_concurrency, tasks_batch_size)
+
         sanitized_job_params, lock = cls.sanitize_params(
             job_config.get('params') or dict())
         sanitized_job_config['params'] = sanitized_job_params
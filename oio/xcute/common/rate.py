@@ -0,0 +1,187 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+from oio.common.easy_value import boolean_value, float_value
+from oio.common.green import time
+
+
+class XcuteRateController(object):
+    """
+    Adapt the dispatch rate of the tasks of a job
+    (additive increase, multiplicative decrease).
+
+    The rate is decreased when the workers show signs of congestion:
+    - the time between the dispatch of a batch and its reply (per task)
+      grows beyond `latency_factor` times the lowest time observed,
+    - the ratio of tasks in error exceeds `max_error_rate`.
+    Otherwise, it is increased up to the maximum rate of the job:
+    doubled until the first congestion, then by `increase` times
+    the maximum rate.
+
+    When the pending tasks would need more than `max_pending_time`
+    seconds to be processed, the controller is overloaded:
+    the dispatch of new tasks should wait.
+    """
+
+    MIN_TASKS_PER_SECOND = 1
+
+    def __init__(self, max_tasks_per_second, interval=10.0,
+                 latency_factor=2.0, max_error_rate=0.1, decrease=0.5,
+                 increase=0.05, max_pending_time=300.0, ewma_weight=0.2,
+                 logger=None):
+        self.max_tasks_per_second = max_tasks_per_second
+        self.interval = interval
+        self.latency_factor = latency_factor
+        self.max_error_rate = max_error_rate
+        self.decrease = decrease
+        self.increase = increase
+        self.max_pending_time = max_pending_time
+        self.ewma_weight = ewma_weight
+        self.logger = logger
+
+        self.rate = max(self.MIN_TASKS_PER_SECOND,
+                        max_tasks_per_second / 10.0)
+        self.slow_start = True
+        self.overloaded = False
+        self.last_adjust = 0.0
+        self.last_decrease = 0.0
+        # Batch key -> dispatch time
+        self._sent = dict()
+        self._latency = None
+        self._min_latency = None
+        self._processed = 0
+        self._errors = 0
+
+    @staticmethod
+    def _batch_key(task_ids):
+        # The order of the task IDs is not kept by the workers
+        return min(task_ids)
+
+    @property
+    def tasks_per_second(self):
+        return max(self.MIN_TASKS_PER_SECOND, int(self.rate))
+
+    def tasks_batch_size(self, max_tasks_batch_size):
+        return min(max_tasks_batch_size, self.tasks_per_second)
+
+    def batch_sent(self, task_ids, now=None):
+        if task_ids:
+            if now is None:
+                now = time.time()
+            self._sent[self._batch_key(task_ids)] = now
+
+    def batch_processed(self, task_ids, task_errors=None, now=None):
+        if not task_ids:
+            return
+        if now is None:
+            now = time.time()
+        sent = self._sent.pop(self._batch_key(task_ids), None)
+        if sent is None:
+            # Sent by another orchestrator (or before a restart)
+            return
+        self._processed += len(task_ids)
+        if task_errors:
+            self._errors += sum(task_errors.values())
+        if sent < self.last_decrease:
+            # Congestion already taken into account
+            return
+        latency = (now - sent) / len(task_ids)
+        if self._min_latency is None or latency < self._min_latency:
+            self._min_latency = latency
+        if self._latency is None:
+            self._latency = latency
+        else:
+            self._latency += self.ewma_weight * (latency - self._latency)
+
+    def due(self, now=None):
+        if now is None:
+            now = time.time()
+        return now - self.last_adjust >= self.interval
+
+    def _congestion(self):
+        if self._processed \
+                and self._errors > self.max_error_rate * self._processed:
+            return 'error rate %.1f%%' % (
+                100.0 * self._errors / self._processed)
+        if self._latency is not None \
+                and self._latency > self.latency_factor * self._min_latency:
+            return 'latency %.3fs/task (min %.3fs/task)' % (
+                self._latency, self._min_latency)
+        return None
+
+    def adjust(self, pending_tasks, max_tasks_per_second=None, now=None):
+        """
+        Compute the new dispatch rate, from the replies received
+        since the last call and the number of pending tasks.
+        """
+        if now is None:
+            now = time.time()
+        if max_tasks_per_second:
+            self.max_tasks_per_second = max_tasks_per_second
+        old_rate = self.rate
+
+        congestion = self._congestion()
+        if congestion:
+            self.rate *= self.decrease
+            self.slow_start = False
+            self.last_decrease = now
+            # New samples must confirm the congestion
+            self._latency = None
+        elif self._processed:
+            if self.slow_start:
+                self.rate *= 2
+            else:
+                self.rate += self.increase * self.max_tasks_per_second
+        self.rate = max(self.MIN_TASKS_PER_SECOND,
+                        min(self.rate, self.max_tasks_per_second))
+
+        self.overloaded = \
+            pending_tasks > self.rate * self.max_pending_time
+        if self.logger and int(old_rate) != int(self.rate):
+            self.logger.info(
+                'Adapt the dispatch rate: %d -> %d tasks/second%s',
+                old_rate, self.rate,
+                ' (%s)' % congestion if congestion else '')
+
+        # Forget the batches which will never be replied
+        for key, sent in list(self._sent.items()):
+            if now - sent > 2 * self.max_pending_time:
+                del self._sent[key]
+        self._processed = 0
+        self._errors = 0
+        self.last_adjust = now
+        return self.tasks_per_second
+
+
+def rate_controller_from_conf(conf, max_tasks_per_second, logger=None):
+    """
+    Build a `XcuteRateController` from the configuration of the
+    orchestrator, or return None if the adaptive rate is disabled.
+    """
+    if not boolean_value(conf.get('adaptive_rate'), False) \
+            or max_tasks_per_second <= 0:
+        return None
+    return XcuteRateController(
+        max_tasks_per_second,
+        interval=float_value(conf.get('adaptive_rate_interval'), 10.0),
+        latency_factor=float_value(
+            conf.get('adaptive_rate_latency_factor'), 2.0),
+        max_error_rate=float_value(
+            conf.get('adaptive_rate_max_error_rate'), 0.1),
+        decrease=float_value(conf.get('adaptive_rate_decrease'), 0.5),
+        increase=float_value(conf.get('adaptive_rate_increase'), 0.05),
+        max_pending_time=float_value(
+            conf.get('adaptive_rate_max_pending_time'), 300.0),
+        logger=logger)
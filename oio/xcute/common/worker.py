@@ -17,7 +17,7 @@ from collections import Counter
 from six import iteritems
 
 from oio.common.constants import STRLEN_REQID
-from oio.common.green import ratelimit
+from oio.common.green import GreenPool, ratelimit
 from oio.common.json import json
 from oio.common.logger import get_logger
 from oio.common.utils import CacheDict, request_id
@@ -48,18 +48,14 @@ class XcuteWorker(object):
             self.tasks[job_id] = task
 
         tasks_per_second = job_config['tasks_per_second']
+        # Jobs created before this option existed do not have it
+        tasks_concurrency = job_config.get('tasks_concurrency', 1)
         tasks = beanstalkd_job['tasks']
 
         task_errors = Counter()
         task_results = Counter()
 
-        tasks_run_time = 0
-        for task_id, task_payload in iteritems(tasks):
-            tasks_run_time = ratelimit(
-                    tasks_run_time, tasks_per_second)
-
-            reqid = job_id + request_id('-')
-            reqid = reqid[:STRLEN_REQID]
+        def _process_task(task_id, task_payload, reqid):
             try:
                 task_result = task.process(task_id, task_payload, reqid=reqid)
                 task_results.update(task_result)
@@ -67,6 +63,26 @@ class XcuteWorker(object):
                 self.logger.warn('[job_id=%s] Fail to process task %s: %s',
                                  job_id, task_id, exc)
                 task_errors[type(exc).__name__] += 1
+                # Results of the part of the task which has been done
+                task_results.update(getattr(exc, 'task_result', None) or {})
+
+        pool = None
+        if tasks_concurrency > 1:
+            pool = GreenPool(tasks_concurrency)
+
+        tasks_run_time = 0
+        for task_id, task_payload in iteritems(tasks):
+            tasks_run_time = ratelimit(
+                    tasks_run_time, tasks_per_second)
+
+            reqid = job_id + request_id('-')
+            reqid = reqid[:STRLEN_REQID]
+            if pool is None:
+                _process_task(task_id, task_payload, reqid)
+            else:
+                pool.spawn_n(_process_task, task_id, task_payload, reqid)
+        if pool is not None:
+            pool.waitall()
 
         return job_id, list(tasks.keys()), task_results, task_errors, \
             beanstalkd_job['beanstalkd_reply']
@@ -14,6 +14,7 @@
 # License along with this library.
 
 import math
+from collections import Counter, OrderedDict
 
 from oio.blob.client import BlobClient
 from oio.common.easy_value import float_value, int_value
@@ -21,7 +22,7 @@ from oio.common.exceptions import ContentNotFound, NotFound, OrphanChunk
 from oio.common.green import time
 from oio.conscience.client import ConscienceClient
 from oio.content.factory import ContentFactory
-from oio.rdir.client import RdirClient
+from oio.rdir.client import RDIR_FETCH_MAX_LIMIT, RdirClient
 from oio.xcute.common.job import XcuteTask
 from oio.xcute.jobs.common import XcuteRdirJob
 
@@ -64,11 +65,14 @@ class RawxDecommissionTask(XcuteTask):
             fake_excluded_chunks.append(chunk)
         return fake_excluded_chunks
 
-    def process(self, task_id, task_payload, reqid=None):
-        container_id = task_payload['container_id']
-        content_id = task_payload['content_id']
-        chunk_id = task_payload['chunk_id']
+    def _check_chunk(self, container_id, content_id, chunk_id, reqid=None):
+        """
+        Check the chunk belongs to the expected content and matches
+        the size constraints.
 
+        :returns: a tuple with the size of the chunk and, if the chunk
+            must be skipped, the name of the result counter
+        """
         chunk_url = 'http://{}/{}'.format(self.service_id, chunk_id)
         try:
             meta = self.blob_client.chunk_head(
@@ -77,7 +81,7 @@ class RawxDecommissionTask(XcuteTask):
             # The chunk is still present in the rdir,
             # but the chunk no longer exists in the rawx.
             # We ignore it because there is nothing to move.
-            return {'skipped_chunks_no_longer_exist': 1}
+            return None, 'skipped_chunks_no_longer_exist'
         if container_id != meta['container_id']:
             raise ValueError('Mismatch container ID: %s != %s',
                              container_id, meta['container_id'])
@@ -90,23 +94,62 @@ class RawxDecommissionTask(XcuteTask):
         if chunk_size < self.min_chunk_size:
             self.logger.debug(
                 '[reqid=%s] SKIP %s too small', reqid, chunk_url)
-            return {'skipped_chunks_too_small': 1}
+            return chunk_size, 'skipped_chunks_too_small'
         if self.max_chunk_size > 0 and chunk_size > self.max_chunk_size:
             self.logger.debug(
                 '[reqid=%s] SKIP %s too big', reqid, chunk_url)
-            return {'skipped_chunks_too_big': 1}
+            return chunk_size, 'skipped_chunks_too_big'
+        return chunk_size, None
 
-        # Start moving the chunk
+    def process(self, task_id, task_payload, reqid=None):
+        container_id = task_payload['container_id']
+        content_id = task_payload['content_id']
+        # Tasks generated before chunks were grouped by content
+        # only have one chunk ID.
+        chunk_ids = task_payload.get('chunk_ids') or \
+            [task_payload['chunk_id']]
+
+        task_result = Counter()
+        chunk_sizes = dict()
+        for chunk_id in chunk_ids:
+            chunk_size, skipped = self._check_chunk(
+                container_id, content_id, chunk_id, reqid=reqid)
+            if skipped:
+                task_result[skipped] += 1
+            else:
+                chunk_sizes[chunk_id] = chunk_size
+        if not chunk_sizes:
+            return task_result
+
+        # Start moving the chunks, with a single locate
+        # and a single meta2 update for all of them
         try:
             content = self.content_factory.get(
                 container_id, content_id, reqid=reqid)
-            content.move_chunk(
-                chunk_id, fake_excluded_chunks=self.fake_excluded_chunks,
-                reqid=reqid)
-        except (ContentNotFound, OrphanChunk):
-            return {'orphan_chunks': 1}
-
-        return {'moved_chunks': 1, 'moved_bytes': chunk_size}
+        except ContentNotFound:
+            task_result['orphan_chunks'] += len(chunk_sizes)
+            return task_result
+        moved = content.move_chunks(
+            [chunk_id for chunk_id in chunk_ids if chunk_id in chunk_sizes],
+            fake_excluded_chunks=self.fake_excluded_chunks, reqid=reqid)
+
+        error = None
+        for chunk_id, res in moved:
+            if isinstance(res, OrphanChunk):
+                task_result['orphan_chunks'] += 1
+            elif isinstance(res, Exception):
+                self.logger.warn('[reqid=%s] Fail to move chunk %s: %s',
+                                 reqid, chunk_id, res)
+                error = error or res
+            else:
+                task_result['moved_chunks'] += 1
+                task_result['moved_bytes'] += chunk_sizes[chunk_id]
+        if error is not None:
+            # The chunks of the task which have been moved
+            # won't be listed again by the rdir: count them anyway.
+            error.task_result = task_result
+            raise error
+        return task_result
 
 
 class RawxDecommissionJob(XcuteRdirJob):
@@ -114,11 +157,16 @@ class RawxDecommissionJob(XcuteRdirJob):
     JOB_TYPE = 'rawx-decommission'
     TASK_CLASS = RawxDecommissionTask
 
+    # Each task mostly waits for the network (HEAD, locate, copy)
+    DEFAULT_TASKS_CONCURRENCY = 8
     DEFAULT_RAWX_TIMEOUT = 60.0
     DEFAULT_MIN_CHUNK_SIZE = 0
     DEFAULT_MAX_CHUNK_SIZE = 0
     DEFAULT_USAGE_TARGET = 0
     DEFAULT_USAGE_CHECK_INTERVAL = 60.0
+    # Number of consecutive chunks of a container among which
+    # the chunks of a same content are grouped
+    GROUP_WINDOW = 1000
 
     @classmethod
     def sanitize_params(cls, job_params):
@@ -190,11 +238,12 @@ class RawxDecommissionJob(XcuteRdirJob):
             last_usage_check = now
 
         chunk_info = self.get_chunk_info(job_params, marker=marker)
-        for container_id, chunk_id, descr in chunk_info:
-            task_id = '|'.join((container_id, descr['content_id'], chunk_id))
+        for container_id, content_id, chunk_ids, last_chunk_id in \
+                self.group_chunk_info(chunk_info):
+            task_id = '|'.join((container_id, content_id, last_chunk_id))
             yield task_id, {'container_id': container_id,
-                            'content_id': descr['content_id'],
-                            'chunk_id': chunk_id}
+                            'content_id': content_id,
+                            'chunk_ids': chunk_ids}
 
             if usage_target <= 0:
                 continue
@@ -221,15 +270,15 @@ class RawxDecommissionJob(XcuteRdirJob):
         kept_chunks_ratio = 1 - (usage_target / float(current_usage))
         chunk_info = self.get_chunk_info(job_params, marker=marker)
         i = 0
-        for i, (container_id, chunk_id, descr) \
-                in enumerate(chunk_info, 1):
+        for i, (container_id, content_id, _, last_chunk_id) \
+                in enumerate(self.group_chunk_info(chunk_info), 1):
             if i % 1000 == 0:
-                yield ('|'.join((container_id, descr['content_id'], chunk_id)),
+                yield ('|'.join((container_id, content_id, last_chunk_id)),
                        int(math.ceil(1000 * kept_chunks_ratio)))
 
         remaining = int(math.ceil(i % 1000 * kept_chunks_ratio))
         if remaining > 0:
-            yield ('|'.join((container_id, descr['content_id'], chunk_id)),
+            yield ('|'.join((container_id, content_id, last_chunk_id)),
                    remaining)
 
     def get_chunk_info(self, job_params, marker=None):
@@ -237,8 +286,60 @@ class RawxDecommissionJob(XcuteRdirJob):
         rdir_fetch_limit = job_params['rdir_fetch_limit']
         rdir_timeout = job_params['rdir_timeout']
 
+        if marker:
+            # Task IDs are "container|content|chunk",
+            # the keys of the rdir are "container|chunk".
+            parts = marker.split('|')
+            marker = '|'.join((parts[0], parts[-1]))
         chunk_info = self.rdir_client.chunk_fetch(
             service_id, timeout=rdir_timeout,
-            limit=rdir_fetch_limit, start_after=marker)
+            limit=rdir_fetch_limit, max_limit=RDIR_FETCH_MAX_LIMIT,
+            start_after=marker)
 
         return chunk_info
+
+    @staticmethod
+    def group_chunk_info(chunk_info, window=GROUP_WINDOW):
+        """
+        Group the chunks of the same content, among the (at most `window`)
+        consecutive chunks of the same container: the chunks are listed
+        by chunk ID, the chunks of a content are not consecutive.
+
+        The groups of a window are yielded in the order of their first
+        chunk, with the ID of the last chunk such that this chunk and all
+        the chunks before it belong to the groups yielded so far: resuming
+        after this chunk does not miss any chunk.
+
+        :returns: an iterator of
+            (container_id, content_id, chunk_ids, last_chunk_id)
+        """
+        container_id = None
+        # content_id -> list of (position, chunk_id)
+        groups = OrderedDict()
+        chunk_ids = list()
+
+        def _flush():
+            done = [False] * len(chunk_ids)
+            last = 0
+            for content_id, chunks in groups.items():
+                for pos, _ in chunks:
+                    done[pos] = True
+                while last < len(done) and done[last]:
+                    last += 1
+                # The first group holds the first chunk: last > 0
+                yield (container_id, content_id,
+                       [chunk_id for _, chunk_id in chunks],
+                       chunk_ids[last - 1])
+
+        for cid, chunk_id, descr in chunk_info:
+            if cid != container_id or len(chunk_ids) >= window:
+                for group in _flush():
+                    yield group
+                container_id = cid
+                groups.clear()
+                del chunk_ids[:]
+            groups.setdefault(descr['content_id'], list()).append(
+                (len(chunk_ids), chunk_id))
+            chunk_ids.append(chunk_id)
+        for group in _flush():
+            yield group
@@ -18,7 +18,7 @@ import time
 from oio.blob.operator import ChunkOperator
 from oio.common.easy_value import boolean_value, float_value, int_value
 from oio.common.exceptions import ContentNotFound, OrphanChunk
-from oio.rdir.client import RdirClient
+from oio.rdir.client import RDIR_FETCH_MAX_LIMIT, RdirClient
 from oio.xcute.common.job import XcuteTask
 from oio.xcute.jobs.common import XcuteRdirJob
 
@@ -170,6 +170,7 @@ class RawxRebuildJob(XcuteRdirJob):
 
         chunk_info = self.rdir_client.chunk_fetch(
             service_id, rebuild=True, timeout=rdir_timeout,
-            limit=rdir_fetch_limit, start_after=marker)
+            limit=rdir_fetch_limit, max_limit=RDIR_FETCH_MAX_LIMIT,
+            start_after=marker)
 
         return chunk_info
@@ -30,6 +30,7 @@ from oio.event.beanstalk import Beanstalk, BeanstalkdListener, \
 from oio.event.evob import EventTypes
 from oio.xcute.common.backend import XcuteBackend
 from oio.xcute.common.job import XcuteJobStatus
+from oio.xcute.common.rate import rate_controller_from_conf
 from oio.xcute.jobs import JOB_TYPES
 
 
@@ -37,7 +38,12 @@ class XcuteOrchestrator(object):
 
     DEFAULT_DISPATCHER_TIMEOUT = 2
     DEFAULT_REFRESH_TIME_BEANSTALKD_WORKERS = 30
+    DEFAULT_REFRESH_TIME_BEANSTALKD_LOAD = 5
     DEFAULT_MAX_JOBS_PER_BEANSTALKD = 1024
+    DEFAULT_DISPATCH_STRATEGY = 'least_loaded'
+    DISPATCH_STRATEGIES = ('least_loaded', 'weighted_random')
+    # Weight of the last sample in the drain rate of the workers
+    DRAIN_RATE_WEIGHT = 0.3
 
     def __init__(self, conf, logger=None):
         self.conf = conf
@@ -73,6 +79,18 @@ class XcuteOrchestrator(object):
             self.conf.get('max_jobs_per_beanstalkd'),
             self.DEFAULT_MAX_JOBS_PER_BEANSTALKD)
 
+        self.dispatch_strategy = self.conf.get(
+            'dispatch_strategy', self.DEFAULT_DISPATCH_STRATEGY)
+        if self.dispatch_strategy not in self.DISPATCH_STRATEGIES:
+            raise ValueError('Unknown dispatch strategy: %s'
+                             % self.dispatch_strategy)
+        self.refresh_time_beanstalkd_load = int_value(
+            self.conf.get('refresh_time_beanstalkd_load'),
+            self.DEFAULT_REFRESH_TIME_BEANSTALKD_LOAD)
+        self.max_outstanding_jobs_per_beanstalkd = int_value(
+            self.conf.get('max_outstanding_jobs_per_beanstalkd'),
+            self.max_jobs_per_beanstalkd)
+
         self.running = True
         self.beanstalkd_workers = dict()
 
@@ -80,6 +98,7 @@ class XcuteOrchestrator(object):
         self.listen_beanstalkd_reply_thread = None
         self.dispatch_tasks_threads = dict()
         self.compute_total_tasks_threads = dict()
+        self.rate_controllers = dict()
 
     def handle_backend_errors(self, func, *args, **kwargs):
         while True:
@@ -242,6 +261,7 @@ class XcuteOrchestrator(object):
                     'with the failure: %s', job_id, exc)
         finally:
             del self.dispatch_tasks_threads[job_id]
+            self.rate_controllers.pop(job_id, None)
 
         self.logger.debug(
             '[job_id=%s] Exited thread to dispatch tasks', job_id)
@@ -372,6 +392,46 @@ class XcuteOrchestrator(object):
                     current_tasks_batch_size, new_tasks_batch_size)
             return last_check
 
+    def adapt_rate(self, job_id, job_config, rate_controller):
+        """
+        Feed the rate controller with the counters of the job,
+        and apply the new rate. Wait while too many tasks are pending.
+        """
+        while self.running and rate_controller.due():
+            job_info, exc = self.handle_backend_errors(
+                self.backend.get_job_info, job_id)
+            if exc is not None:
+                self.logger.warning(
+                    '[job_id=%s] Unable to retrieve job info '
+                    'and adapt the rate: %s', job_id, exc)
+                return
+            if job_info['job']['status'] != XcuteJobStatus.RUNNING \
+                    or job_info['job']['request_pause']:
+                return
+
+            pending_tasks = job_info['tasks']['sent'] \
+                - job_info['tasks']['processed']
+            rate_controller.adjust(
+                pending_tasks,
+                max_tasks_per_second=job_info['config']['tasks_per_second'])
+            job_config['tasks_per_second'] = \
+                rate_controller.tasks_per_second
+            job_config['tasks_batch_size'] = \
+                rate_controller.tasks_batch_size(
+                    job_info['config']['tasks_batch_size'])
+            if not rate_controller.overloaded:
+                return
+
+            self.logger.warning(
+                '[job_id=%s] Too many pending tasks: %d (%d tasks/second); '
+                'wait %d seconds and check again',
+                job_id, pending_tasks, rate_controller.tasks_per_second,
+                rate_controller.interval)
+            for _ in range(int(math.ceil(rate_controller.interval))):
+                if not self.running:
+                    break
+                sleep(1)
+
     def dispatch_tasks(self, job_id, job_type, job_info, job):
         job_config = job_info['config']
         job_params = job_config['params']
@@ -380,7 +440,13 @@ class XcuteOrchestrator(object):
         job_tasks = job.get_tasks(job_params, marker=last_task_id)
         beanstalkd_workers = self.get_beanstalkd_workers()
 
-        last_check = self.adapt_speed(job_id, job_config, None)
+        rate_controller = rate_controller_from_conf(
+            self.conf, job_config['tasks_per_second'], logger=self.logger)
+        if rate_controller is None:
+            last_check = self.adapt_speed(job_id, job_config, None)
+        else:
+            self.rate_controllers[job_id] = rate_controller
+            self.adapt_rate(job_id, job_config, rate_controller)
         tasks_per_second = job_config['tasks_per_second']
         tasks_batch_size = job_config['tasks_batch_size']
         batch_per_second = tasks_per_second / float(tasks_batch_size)
@@ -414,6 +480,8 @@ class XcuteOrchestrator(object):
                     break
                 sent = self.dispatch_tasks_batch(
                     beanstalkd_workers, job_id, job_type, job_config, tasks)
+                if sent and rate_controller is not None:
+                    rate_controller.batch_sent(list(tasks.keys()))
                 if not sent:
                     self.logger.warn(
                         '[job_id=%s] Job aborting the last sent tasks', job_id)
@@ -439,7 +507,10 @@ class XcuteOrchestrator(object):
 
             # After each tasks batch sent, adapt the sending speed
             # according to the processing speed.
-            last_check = self.adapt_speed(job_id, job_config, last_check)
+            if rate_controller is None:
+                last_check = self.adapt_speed(job_id, job_config, last_check)
+            else:
+                self.adapt_rate(job_id, job_config, rate_controller)
             tasks_per_second = job_config['tasks_per_second']
             tasks_batch_size = job_config['tasks_batch_size']
             batch_per_second = tasks_per_second / float(tasks_batch_size)
@@ -460,6 +531,8 @@ class XcuteOrchestrator(object):
                     sent = self.dispatch_tasks_batch(
                         beanstalkd_workers, job_id, job_type, job_config,
                         tasks)
+                    if sent and rate_controller is not None:
+                        rate_controller.batch_sent(list(tasks.keys()))
                 else:
                     sent = True
                 if not sent:
@@ -525,6 +598,7 @@ class XcuteOrchestrator(object):
 
             try:
                 beanstalkd_worker.put(beanstalkd_payload, ttr=ttr)
+                beanstalkd_worker.jobs_sent += 1
                 self.logger.debug(
                     '[job_id=%s] Tasks sent to %s: %s', job_id,
                     beanstalkd_worker.addr, str(tasks))
@@ -683,6 +757,10 @@ class XcuteOrchestrator(object):
 
         self.logger.debug('Tasks processed (job_id=%s): %s', job_id, task_ids)
 
+        rate_controller = self.rate_controllers.get(job_id)
+        if rate_controller is not None:
+            rate_controller.batch_processed(task_ids, task_errors)
+
         try:
             finished, exc = self.handle_backend_errors(
                 self.backend.update_tasks_processed,
@@ -733,10 +811,13 @@ class XcuteOrchestrator(object):
             self.logger.info('Refresh beanstalkd workers')
             self.beanstalkd_workers = beanstalkd_workers
 
-            for _ in range(self.refresh_time_beanstalkd_workers):
+            for i in range(self.refresh_time_beanstalkd_workers):
                 if not self.running:
                     break
                 sleep(1)
+                if self.refresh_time_beanstalkd_load > 0 \
+                        and (i + 1) % self.refresh_time_beanstalkd_load == 0:
+                    self._sample_beanstalkd_workers_load()
 
         self.logger.info('Exited thread to refresh beanstalkd workers')
 
@@ -775,22 +856,28 @@ class XcuteOrchestrator(object):
         if not beanstalkd:
             beanstalkd = Beanstalk.from_url(beanstalkd_addr)
             beanstalkd.addr = beanstalkd_addr
-
-        beanstalkd_tubes = beanstalkd.tubes()
+            # The tasks are sent by several threads with the main
+            # connection, use another one to sample the tube statistics.
+            beanstalkd.stats_client = Beanstalk.from_url(beanstalkd_addr)
+            beanstalkd.jobs_outstanding = 0
+            beanstalkd.jobs_sent = 0
+            beanstalkd.jobs_deleted = None
+            beanstalkd.drain_rate = 0.0
+            beanstalkd.last_sample = None
+
+        beanstalkd_tubes = beanstalkd.stats_client.tubes()
         if self.beanstalkd_workers_tube not in beanstalkd_tubes:
             beanstalkd.is_broken = True
             self.logger.debug(
                 'Ignore beanstalkd %s: '
                 'No worker has ever listened to the tube %s',
                 beanstalkd_addr, self.beanstalkd_workers_tube)
-            try:
-                beanstalkd.close()
-            except BeanstalkError:
-                pass
+            self._close_beanstalkd_worker(beanstalkd)
             return None
 
-        current_stats = beanstalkd.stats_tube(
+        current_stats = beanstalkd.stats_client.stats_tube(
             self.beanstalkd_workers_tube)
+        self._update_beanstalkd_worker_load(beanstalkd, current_stats)
         beanstalkd_jobs_ready = current_stats['current-jobs-ready']
         if beanstalkd_jobs_ready > 0:
             beanstalkd_jobs_reserved = current_stats['current-jobs-reserved']
@@ -801,10 +888,7 @@ class XcuteOrchestrator(object):
                     '(current-jobs-ready=%d, current-jobs-reserved=%d)',
                     beanstalkd_addr, beanstalkd_jobs_ready,
                     beanstalkd_jobs_reserved)
-                try:
-                    beanstalkd.close()
-                except BeanstalkError:
-                    pass
+                self._close_beanstalkd_worker(beanstalkd)
                 return None
 
             if beanstalkd_jobs_ready >= self.max_jobs_per_beanstalkd:
@@ -814,10 +898,7 @@ class XcuteOrchestrator(object):
                     '(current-jobs-ready=%d, current-jobs-reserved=%d)',
                     beanstalkd_addr, beanstalkd_jobs_ready,
                     beanstalkd_jobs_reserved)
-                try:
-                    beanstalkd.close()
-                except BeanstalkError:
-                    pass
+                self._close_beanstalkd_worker(beanstalkd)
                 return None
 
         if hasattr(beanstalkd, 'is_broken') and beanstalkd.is_broken:
@@ -839,10 +920,89 @@ class XcuteOrchestrator(object):
             beanstalkd_addr, worker_score)
         return beanstalkd
 
+    @staticmethod
+    def _close_beanstalkd_worker(beanstalkd):
+        for client in (beanstalkd, beanstalkd.stats_client):
+            try:
+                client.close()
+            except BeanstalkError:
+                pass
+
+    def _update_beanstalkd_worker_load(self, beanstalkd, stats, now=None):
+        """
+        Update the number of jobs not processed yet by a worker
+        and the rate at which it processes them.
+        """
+        if now is None:
+            now = time.time()
+        jobs_deleted = stats.get('cmd-delete')
+        if jobs_deleted is not None \
+                and beanstalkd.jobs_deleted is not None \
+                and now > beanstalkd.last_sample \
+                and jobs_deleted >= beanstalkd.jobs_deleted:
+            drain_rate = (jobs_deleted - beanstalkd.jobs_deleted) \
+                / (now - beanstalkd.last_sample)
+            beanstalkd.drain_rate += self.DRAIN_RATE_WEIGHT \
+                * (drain_rate - beanstalkd.drain_rate)
+        beanstalkd.jobs_deleted = jobs_deleted
+        beanstalkd.last_sample = now
+        beanstalkd.jobs_outstanding = \
+            stats['current-jobs-ready'] + stats['current-jobs-reserved']
+        # The jobs sent until now are in the statistics
+        beanstalkd.jobs_sent = 0
+
+    def _sample_beanstalkd_workers_load(self):
+        for beanstalkd in list(self.beanstalkd_workers.values()):
+            if beanstalkd.is_broken:
+                continue
+            try:
+                stats = beanstalkd.stats_client.stats_tube(
+                    self.beanstalkd_workers_tube)
+            except Exception as exc:
+                self.logger.warn(
+                    'Fail to sample the load of beanstalkd %s: %s',
+                    beanstalkd.addr, exc)
+                continue
+            self._update_beanstalkd_worker_load(beanstalkd, stats)
+
+    def _least_loaded_beanstalkd_worker(self):
+        """
+        Return the worker which should process a new job the soonest,
+        according to its jobs not processed yet and its processing rate.
+        """
+        best = None
+        best_wait = None
+        beanstalkd_workers = list(self.beanstalkd_workers.values())
+        # Shuffle to not have the same choice for equivalent workers
+        random.shuffle(beanstalkd_workers)
+        for beanstalkd in beanstalkd_workers:
+            if beanstalkd.is_broken:
+                continue
+            jobs_outstanding = beanstalkd.jobs_outstanding \
+                + beanstalkd.jobs_sent
+            if jobs_outstanding >= self.max_outstanding_jobs_per_beanstalkd:
+                continue
+            wait = jobs_outstanding / max(beanstalkd.drain_rate, 0.001)
+            if best_wait is None or wait < best_wait:
+                best = beanstalkd
+                best_wait = wait
+        return best
+
     def get_beanstalkd_workers(self):
         """
             Yield beanstalkd workers following a loadbalancing strategy
         """
+        if self.dispatch_strategy == 'least_loaded':
+            while True:
+                beanstalkd_worker = self._least_loaded_beanstalkd_worker()
+                if beanstalkd_worker is None:
+                    self.logger.info(
+                        'No beanstalkd worker available '
+                        '(or all of them are broken or full)')
+                    yield None
+                    sleep(1)
+                    continue
+                yield beanstalkd_worker
 
         beanstalkd_workers_id = None
         beanstalkd_workers = list()
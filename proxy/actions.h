@@ -94,6 +94,7 @@ enum http_rc_e action_content_put (struct req_args_s *args);
 enum http_rc_e action_content_drain(struct req_args_s *args);
 enum http_rc_e action_content_delete (struct req_args_s *args);
 enum http_rc_e action_content_delete_many (struct req_args_s *args);
+enum http_rc_e action_content_locate_many (struct req_args_s *args);
 enum http_rc_e action_content_show (struct req_args_s *args);
 enum http_rc_e action_content_prepare (struct req_args_s *args);
 enum http_rc_e action_content_prepare_v2(struct req_args_s *args);
@@ -3247,6 +3247,246 @@ enum http_rc_e action_content_delete_many (struct req_args_s *args) {
 	return rest_action(args, _m2_content_delete_many);
 }
 
+/* Serialize, as members of a JSON object, the description of a content
+ * (the same fields as the headers of content/locate), its properties and
+ * its chunks. The beans must be sorted with _bean_compare_kind(). */
+static GError *
+_serialize_content_beans(struct req_args_s *args, GSList *beans,
+		GString *gstr)
+{
+	const oio_location_t _loca = oio_proxy_local_patch ? location_num : 0;
+	struct bean_ALIASES_s *alias = NULL;
+	struct bean_CONTENTS_HEADERS_s *header = NULL;
+	const gchar *policy = NULL;
+	gboolean first_chunk = TRUE, first_prop = TRUE;
+	GError *chunk_err = NULL;
+
+	GString *chunks_gstr = g_string_sized_new(2048);
+	GString *props_gstr = g_string_sized_new(256);
+
+	for (GSList *l = beans; l; l = l->next) {
+		if (!l->data)
+			continue;
+
+		if (&descr_struct_CHUNKS == DESCR(l->data)) {
+			COMA(chunks_gstr, first_chunk);
+			struct bean_CHUNKS_s *chunk = l->data;
+			GError *err2 = m2v2_extend_chunk_url(args->url, policy, chunk);
+			if (err2) {
+				// Discard the previous error
+				g_clear_error(&chunk_err);
+				chunk_err = err2;
+			}
+			_serialize_chunk(chunk, chunks_gstr, _loca);
+		}
+		else if (&descr_struct_ALIASES == DESCR(l->data)) {
+			alias = l->data;
+			gchar strver[24];
+			g_snprintf(strver, sizeof(strver), "%"G_GINT64_FORMAT,
+					ALIASES_get_version(alias));
+			oio_url_set(args->url, OIOURL_VERSION, strver);
+		}
+		else if (&descr_struct_CONTENTS_HEADERS == DESCR(l->data)) {
+			header = l->data;
+			policy = CONTENTS_HEADERS_get_policy(header)->str;
+		}
+		else if (&descr_struct_PROPERTIES == DESCR(l->data)) {
+			COMA(props_gstr, first_prop);
+			_serialize_property(l->data, props_gstr);
+		}
+	}
+
+	GError *err = NULL;
+	if (!alias || !header) {
+		err = NEWERROR(CODE_CONTENT_NOTFOUND, "Content not found");
+	} else if (ALIASES_get_deleted(alias) &&
+			!oio_str_parse_bool(OPT("deleted"), FALSE)) {
+		err = NEWERROR(CODE_CONTENT_DELETED, "Alias deleted");
+	} else {
+		g_string_append_static(gstr, "\"meta\":{");
+		OIO_JSON_append_gstr(gstr, "name", ALIASES_get_alias(alias));
+		g_string_append_printf(gstr, ",\"version\":\"%"G_GINT64_FORMAT"\"",
+				ALIASES_get_version(alias));
+		g_string_append_printf(gstr, ",\"deleted\":\"%s\"",
+				ALIASES_get_deleted(alias) ? "True" : "False");
+		g_string_append_printf(gstr, ",\"ctime\":\"%"G_GINT64_FORMAT"\"",
+				ALIASES_get_ctime(alias));
+		g_string_append_printf(gstr, ",\"mtime\":\"%"G_GINT64_FORMAT"\"",
+				ALIASES_get_mtime(alias));
+		g_string_append_c(gstr, ',');
+		OIO_JSON_append_gba(gstr, "id", CONTENTS_HEADERS_get_id(header));
+		g_string_append_printf(gstr, ",\"size\":\"%"G_GINT64_FORMAT"\"",
+				CONTENTS_HEADERS_get_size(header));
+		/* Same keys as content/locate (x-oio-content-meta-*) */
+		g_string_append_printf(gstr, ",\"length\":\"%"G_GINT64_FORMAT"\"",
+				CONTENTS_HEADERS_get_size(header));
+		g_string_append_c(gstr, ',');
+		OIO_JSON_append_gstr(gstr, "policy",
+				CONTENTS_HEADERS_get_policy(header));
+		g_string_append_c(gstr, ',');
+		OIO_JSON_append_gba(gstr, "hash", CONTENTS_HEADERS_get_hash(header));
+		g_string_append_static(gstr, ",\"hash_method\":\"md5\",");
+		OIO_JSON_append_gstr(gstr, "mime_type",
+				CONTENTS_HEADERS_get_mime_type(header));
+		g_string_append_c(gstr, ',');
+		OIO_JSON_append_gstr(gstr, "chunk_method",
+				CONTENTS_HEADERS_get_chunk_method(header));
+		g_string_append_static(gstr, "},\"properties\":{");
+		g_string_append_len(gstr, props_gstr->str, props_gstr->len);
+		g_string_append_static(gstr, "},\"chunks\":[");
+		g_string_append_len(gstr, chunks_gstr->str, chunks_gstr->len);
+		g_string_append_c(gstr, ']');
+	}
+
+	if (chunk_err) {
+		GRID_WARN("Some chunk URLs may have an invalid format: %s (reqid=%s)",
+				chunk_err->message, oio_ext_get_reqid());
+		g_clear_error(&chunk_err);
+	}
+	g_string_free(chunks_gstr, TRUE);
+	g_string_free(props_gstr, TRUE);
+	return err;
+}
+
+static enum http_rc_e
+_m2_content_locate_many(struct req_args_s *args, struct json_object *jbody)
+{
+	guint32 flags = 0;
+	if (!oio_str_parse_bool(OPT("properties"), TRUE))
+		flags |= M2V2_FLAG_NOPROPS;
+
+	json_object *jarray = NULL;
+	PACKER_VOID(_pack) { return m2v2_remote_pack_GET(args->url, flags, DL()); }
+
+	if (!oio_url_has_fq_container(args->url))
+		return _reply_format_error(args,
+				BADREQ("Missing url argument"));
+
+	if (!json_object_object_get_ex(jbody, "contents", &jarray)
+			|| !json_object_is_type(jarray, json_type_array))
+		return _reply_format_error(args,
+				BADREQ("Invalid array of contents"));
+
+	guint jarray_len = json_object_array_length(jarray);
+	if (jarray_len < 1)
+		return _reply_format_error(args,
+				BADREQ("At least one element is needed"));
+
+	if (jarray_len > proxy_bulk_max_locate_many)
+		return _reply_too_large(args, NEWERROR(HTTP_CODE_PAYLOAD_TO_LARGE,
+				"Payload Too Large"));
+
+	/* A final sanity check on the format of the payload */
+	for (guint i = 0; i < jarray_len; i++) {
+		struct json_object * jcontent = json_object_array_get_idx(jarray, i);
+		if (!json_object_is_type(jcontent, json_type_object))
+			return _reply_format_error(args, BADREQ("Invalid content description"));
+		struct json_object * jname = NULL, * jversion = NULL;
+		if (!json_object_object_get_ex(jcontent, "name", &jname)
+				|| !json_object_is_type(jname, json_type_string))
+			return _reply_format_error(args, BADREQ("Invalid content name"));
+		if (json_object_object_get_ex(jcontent, "version", &jversion)
+				&& !json_object_is_type(jversion, json_type_null)
+				&& !json_object_is_type(jversion, json_type_string)
+				&& !json_object_is_type(jversion, json_type_int))
+			return _reply_format_error(args, BADREQ("Invalid content version"));
+	}
+
+	GString *gresponse = g_string_sized_new(2048 * jarray_len);
+	g_string_append(gresponse, "{\"contents\":[");
+	for (guint i = 0; i < jarray_len; i++) {
+		struct json_object * jcontent = json_object_array_get_idx(jarray, i);
+
+		struct json_object * jname = NULL, * jversion = NULL;
+		json_object_object_get_ex(jcontent, "name", &jname);
+		const gchar *name = json_object_get_string(jname);
+		const gchar *version = NULL;
+		if (json_object_object_get_ex(jcontent, "version", &jversion)
+				&& !json_object_is_type(jversion, json_type_null))
+			version = json_object_get_string(jversion);
+
+		oio_url_set(args->url, OIOURL_PATH, name);
+		if (version)
+			oio_url_set(args->url, OIOURL_VERSION, version);
+		else
+			oio_url_unset(args->url, OIOURL_VERSION);
+		GSList *beans = NULL;
+		GError *err = _resolve_meta2(args, _prefer_slave(), _pack,
+				&beans, NULL);
+
+		if (i > 0)
+			g_string_append_c(gresponse, ',');
+		g_string_append_c(gresponse, '{');
+		oio_str_gstring_append_json_pair(gresponse, "name", name);
+		g_string_append_c(gresponse, ',');
+		if (!err) {
+			GString *gcontent = g_string_sized_new(2048);
+			beans = g_slist_sort(beans, _bean_compare_kind);
+			err = _serialize_content_beans(args, beans, gcontent);
+			if (!err) {
+				_append_status(gresponse, HTTP_CODE_OK, "ok");
+				g_string_append_c(gresponse, ',');
+				g_string_append_len(gresponse, gcontent->str, gcontent->len);
+			}
+			g_string_free(gcontent, TRUE);
+		}
+		if (err) {
+			_append_status(gresponse, err->code, err->message);
+			g_clear_error(&err);
+		}
+		g_string_append_c(gresponse, '}');
+		_bean_cleanl2(beans);
+	}
+
+	g_string_append(gresponse, "]}");
+	return _reply_success_json(args, gresponse);
+}
+
+// CONTENT{{
+// POST /v3.0/{NS}/content/locate_many?acct={account}&ref={container}&properties={bool}
+// ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+//
+// Get the description of several contents of a container, along with
+// the list of their chunks. The version of each content is optional.
+//
+// .. code-block:: json
+//
+//    {
+//      "contents":[{"name":"content0"}, {"name":"content1","version":"1533546157848061"}]
+//    }
+//
+// .. code-block:: http
+//
+//    POST /v3.0/OPENIO/content/locate_many?acct=my_account&ref=mycontainer HTTP/1.1
+//    Host: 127.0.0.1:6000
+//    User-Agent: curl/7.47.0
+//    Accept: */*
+//    Content-Length: 91
+//    Content-Type: application/x-www-form-urlencoded
+//
+// .. code-block:: http
+//
+//    HTTP/1.1 200 OK
+//    Connection: Close
+//    Content-Type: application/json
+//
+// .. code-block:: json
+//
+//    {
+//      "contents":[
+//        {"name":"content0","status":200,"message":"ok",
+//         "meta":{"name":"content0","version":"1533546157848061","id":"FB35FC89C072050065F28C69311740F6",...},
+//         "properties":{},
+//         "chunks":[{"url":"http://127.0.0.1:6012/BADD4...", ...}]},
+//        {"name":"content1","status":420,"message":"Content not found"}
+//      ]
+//    }
+//
+// }}CONTENT
+enum http_rc_e action_content_locate_many (struct req_args_s *args) {
+	return rest_action(args, _m2_content_locate_many);
+}
+
 // CONTENT{{
 // POST /v3.0/{NS}/content/touch?acct={account}&ref={container}&path={file path}
 // ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
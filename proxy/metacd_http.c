@@ -1074,6 +1074,7 @@ configure_request_handlers (void)
 	SET("/$NS/content/delete_many/#POST", action_content_delete_many);
 	SET("/$NS/content/show/#GET", action_content_show);
 	SET("/$NS/content/locate/#GET", action_content_show);
+	SET("/$NS/content/locate_many/#POST", action_content_locate_many);
 	/* Prepare chunks addresses (returns a list) */
 	SET("/$NS/content/prepare/#POST", action_content_prepare);
 	/* Prepare chunks addresses (returns a dictionary) */
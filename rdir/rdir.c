@@ -829,6 +829,27 @@ _db_vol_delete(const char *volid, GString *key){
 	return _db_vol_delete_generic(base, key);
 }
 
+/* Apply a batch of puts and/or deletes to a volume, atomically */
+static GError *
+_db_vol_write_batch(const char *volid, gboolean autocreate,
+		leveldb_writebatch_t *batch)
+{
+	struct rdir_base_s *base = NULL;
+	GError *err = _db_get(volid, autocreate, &base);
+	if (err)
+		return err;
+
+	char *errmsg = NULL;
+	leveldb_writeoptions_t *options = leveldb_writeoptions_create();
+	leveldb_writeoptions_set_sync(options, 0);
+	leveldb_write(base->base, options, batch, &errmsg);
+	leveldb_writeoptions_destroy(options);
+
+	if (!errmsg)
+		return NULL;
+	return _map_errno_to_gerror(errno, errmsg);
+}
+
 static void
 _dump_vol_status(GString *value, GTree *tree_containers, GTree *tree_to_rebuild)
 {
@@ -1197,6 +1218,8 @@ _request_to_key(struct json_object *jbody, gboolean old_format,
 //      "chunk_id":"chunk id"
 //    }
 //
+// A list of such objects can also be sent, to unreference several chunks
+// at once.
 //
 // Standard response:
 //
@@ -1207,6 +1230,37 @@ _request_to_key(struct json_object *jbody, gboolean old_format,
 //    Content-Length: 0
 //
 // }}RDIR
+static enum http_rc_e
+_route_vol_delete_many(struct req_args_s *args, struct json_object *jbody,
+		const char *volid)
+{
+	GError *err = NULL;
+	leveldb_writebatch_t *batch = leveldb_writebatch_create();
+	const int count = json_object_array_length(jbody);
+	for (int i = 0; !err && i < count; i++) {
+		struct json_object *jrec = json_object_array_get_idx(jbody, i);
+		GString *key = NULL;
+		if (!json_object_is_type(jrec, json_type_object)) {
+			err = BADREQ("record %d is not an object", i);
+		} else if (!(err = _request_to_key(jrec, FALSE, &key))) {
+			leveldb_writebatch_delete(batch, key->str, key->len);
+			g_string_free(key, TRUE);
+		}
+	}
+	if (err) {
+		leveldb_writebatch_destroy(batch);
+		return _reply_format_error(args->rp, err);
+	}
+
+	args->rp->access_tail("records:%d", count);
+	err = _db_vol_write_batch(volid, FALSE, batch);
+	leveldb_writebatch_destroy(batch);
+
+	if (err)
+		return _reply_common_error(args->rp, err);
+	return _reply_ok(args->rp, NULL);
+}
+
 static enum http_rc_e
 _route_vol_delete(struct req_args_s *args, struct json_object *jbody,
 		const char *volid)
@@ -1214,6 +1268,8 @@ _route_vol_delete(struct req_args_s *args, struct json_object *jbody,
 	/* sanity checks */
 	if (!volid)
 		return _reply_format_error(args->rp, BADREQ("no volume id"));
+	if (jbody && json_object_is_type(jbody, json_type_array))
+		return _route_vol_delete_many(args, jbody, volid);
 
 	/* extraction of the parameters */
 	GError *err = NULL;
@@ -1256,6 +1312,8 @@ _route_vol_delete(struct req_args_s *args, struct json_object *jbody,
 //      "chunk_id":"chunk id"
 //    }
 //
+// A list of such objects can also be sent, to reference several chunks
+// at once.
 //
 // Standard response:
 //
@@ -1266,16 +1324,55 @@ _route_vol_delete(struct req_args_s *args, struct json_object *jbody,
 //    Content-Length: 0
 //
 // }}RDIR
+static enum http_rc_e
+_route_vol_push_many(struct req_args_s *args, struct json_object *jbody,
+		const char *volid, gboolean autocreate)
+{
+	GError *err = NULL;
+	leveldb_writebatch_t *batch = leveldb_writebatch_create();
+	const int count = json_object_array_length(jbody);
+	for (int i = 0; !err && i < count; i++) {
+		struct json_object *jrec = json_object_array_get_idx(jbody, i);
+		struct rdir_record_s rec = {0};
+		if (!json_object_is_type(jrec, json_type_object)) {
+			err = BADREQ("record %d is not an object", i);
+		} else if (!(err = _record_extract(&rec, jrec, TRUE, TRUE))) {
+			GString *key = _record_to_key(&rec, FALSE);
+			GString *value = g_string_sized_new(1024);
+			_record_encode(&rec, value);
+			leveldb_writebatch_put(batch,
+					key->str, key->len, value->str, value->len);
+			g_string_free(key, TRUE);
+			g_string_free(value, TRUE);
+		}
+	}
+	if (err) {
+		leveldb_writebatch_destroy(batch);
+		return _reply_format_error(args->rp, err);
+	}
+
+	args->rp->access_tail("records:%d", count);
+	err = _db_vol_write_batch(volid, autocreate, batch);
+	leveldb_writebatch_destroy(batch);
+
+	if (err)
+		return _reply_common_error(args->rp, err);
+	return _reply_ok(args->rp, NULL);
+}
+
 static enum http_rc_e
 _route_vol_push(struct req_args_s *args, struct json_object *jbody,
 		const char *volid, const char *str_autocreate)
 {
-	if (!jbody || !json_object_is_type(jbody, json_type_object))
+	if (!jbody || !(json_object_is_type(jbody, json_type_object)
+				|| json_object_is_type(jbody, json_type_array)))
 		return _reply_format_error(args->rp, BADREQ("null body"));
 	if (!volid)
 		return _reply_format_error(args->rp, BADREQ("no volume id"));
 
 	gboolean autocreate = oio_str_parse_bool(str_autocreate, FALSE);
+	if (json_object_is_type(jbody, json_type_array))
+		return _route_vol_push_many(args, jbody, volid, autocreate);
 
 	/* extract all the record's fields */
 	GError *err = NULL;
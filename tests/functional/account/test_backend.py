@@ -25,8 +25,9 @@ import random
 from oio.account.backend import AccountBackend
 from oio.common.timestamp import Timestamp
 from tests.utils import BaseTestCase, random_str
-from werkzeug.exceptions import Conflict
+from werkzeug.exceptions import BadRequest, Conflict
 from testtools.testcase import ExpectedException
+from mock import patch
 
 
 class TestAccountBackend(BaseTestCase):
@@ -464,6 +465,69 @@ class TestAccountBackend(BaseTestCase):
         self.assertEqual([c[0] for c in listing],
                          ['3-0049-', '3-0049-0049'])
 
+    def test_list_containers_details(self):
+        account_id = 'test'
+        self.backend.create_account(account_id)
+        mtime = Timestamp().normal
+        self.backend.update_container(
+            account_id, 'dir/ct', mtime, 0, 12, 42, bucket_name='dir')
+        self.backend.update_container(
+            account_id, 'ct', mtime, 0, 1, 2)
+
+        listing = self.backend.list_containers(
+            account_id, delimiter='/', details=True)
+        self.assertEqual(2, len(listing))
+        name, objects, size, is_prefix, cmtime, info = listing[0]
+        self.assertEqual(('ct', 1, 2, 0), (name, objects, size, is_prefix))
+        self.assertEqual(float(mtime), cmtime)
+        self.assertEqual('ct', info['name'])
+        self.assertEqual(1, info['objects'])
+        self.assertEqual(2, info['bytes'])
+        self.assertEqual(['dir/', 0, 0, 1, 0], listing[1])
+
+        listing = self.backend.list_containers(account_id, details=True)
+        info = listing[1][5]
+        self.assertEqual('dir/ct', info['name'])
+        self.assertEqual('dir', info['bucket'])
+        self.assertEqual(12, info['objects'])
+        self.assertEqual(42, info['bytes'])
+
+        # Without details, only statistics
+        listing = self.backend.list_containers(account_id)
+        self.assertEqual(['dir/ct', 12, 42, 0, float(mtime)], listing[1])
+
+    def test_list_containers_many_prefixes(self):
+        account_id = 'test'
+        self.backend.create_account(account_id)
+        for cont1 in xrange(50):
+            for cont2 in xrange(10):
+                name = '%04d/%04d' % (cont1, cont2)
+                self.backend.update_container(
+                    account_id, name, Timestamp().normal, 0, 0, 0)
+        self.backend.update_container(
+            account_id, '0025', Timestamp().normal, 0, 0, 0)
+
+        # Fetch less names than the size of a prefix group
+        self.backend.listing_page_size = 5
+        script = self.backend.script_list_with_delimiter
+        with patch.object(self.backend, 'script_list_with_delimiter',
+                          wraps=script) as list_script:
+            listing = self.backend.list_containers(
+                account_id, marker='0010/', delimiter='/', limit=20)
+            # A single round trip, whatever the number of prefixes
+            self.assertEqual(1, list_script.call_count)
+        self.assertEqual(
+            ['%04d/' % i for i in xrange(11, 25)] + ['0025', '0025/']
+            + ['%04d/' % i for i in xrange(26, 30)],
+            [c[0] for c in listing])
+        self.assertEqual([1] * 14 + [0, 1] + [1] * 4,
+                         [c[3] for c in listing])
+
+        listing = self.backend.list_containers(
+            account_id, marker='0045/', delimiter='/', limit=20)
+        self.assertEqual(['%04d/' % i for i in xrange(46, 50)],
+                         [c[0] for c in listing])
+
     def test_refresh_account(self):
         account_id = random_str(16)
         account_key = 'account:%s' % account_id
@@ -496,6 +560,33 @@ class TestAccountBackend(BaseTestCase):
         self.assertEqual(self.backend.conn.hget(account_key, 'objects'),
                          str(total_objects).encode('utf-8'))
 
+    def test_update_containers(self):
+        account_id = 'test'
+        self.assertEqual(self.backend.create_account(account_id), account_id)
+        mtime = Timestamp().normal
+        self.backend.update_container(account_id, 'ct1', mtime, 0, 1, 10)
+
+        sleep(.00001)
+        new_mtime = Timestamp().normal
+        results = self.backend.update_containers([
+            {'account': account_id, 'name': 'ct1', 'mtime': mtime,
+             'objects': 2, 'bytes': 20},
+            {'account': account_id, 'name': 'ct2', 'mtime': new_mtime,
+             'objects': 3, 'bytes': 30},
+            {'account': account_id, 'mtime': new_mtime},
+        ])
+        self.assertIsInstance(results[0], Conflict)
+        self.assertEqual('ct2', results[1])
+        self.assertIsInstance(results[2], BadRequest)
+
+        res = self.backend.conn.zrangebylex(
+            'containers:%s' % account_id, '-', '+')
+        self.assertEqual([b'ct1', b'ct2'], res)
+        self.assertEqual(4, int(self.backend.conn.hget(
+            'account:%s' % account_id, 'objects')))
+        self.assertEqual(40, int(self.backend.conn.hget(
+            'account:%s' % account_id, 'bytes')))
+
     def test_update_container_wrong_timestamp_format(self):
         account_id = 'test'
         self.assertEqual(self.backend.create_account(account_id), account_id)
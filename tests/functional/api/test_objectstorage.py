@@ -1403,6 +1403,38 @@ class TestObjectStorageApi(ObjectStorageApiTestBase):
         res = self.api.object_delete_many(self.account, container, ["dahu"])
         self.assertFalse(res[0][1])
 
+    def test_object_locate_many(self):
+        container = random_str(8)
+        objects = ["obj%d" % i for i in range(5)]
+        expected = dict()
+        for obj in objects:
+            self.api.object_create(self.account, container, obj_name=obj,
+                                   data=obj.encode('utf-8'))
+            expected[obj] = self.api.object_locate(
+                self.account, container, obj, properties=False)
+        names = objects + ['missing']
+        res = self.api.object_locate_many(
+            self.account, container, names, properties=False,
+            batch_size=2)
+        self.assertEqual(names, [name for name, _ in res])
+        for name, (meta, chunks) in res[:-1]:
+            exp_meta, exp_chunks = expected[name]
+            # Same description as object_locate
+            self.assertEqual(sorted(exp_meta), sorted(meta))
+            for key in exp_meta:
+                if key != 'properties':
+                    self.assertEqual(str(exp_meta[key]), str(meta[key]))
+            self.assertEqual(sorted(c['url'] for c in exp_chunks),
+                             sorted(c['url'] for c in chunks))
+        self.assertIsInstance(res[-1][1], exc.NoSuchObject)
+
+        # With explicit versions
+        version = expected['obj0'][0]['version']
+        res = self.api.object_locate_many(
+            self.account, container, [('obj0', version), ('obj1', 1)])
+        self.assertEqual(expected['obj0'][0]['id'], res[0][1][0]['id'])
+        self.assertIsInstance(res[1][1], exc.NoSuchObject)
+
     def test_container_snapshot_failure(self):
         cname = 'container-' + random_str(6)
         cname2 = cname + '.snapshot'
@@ -89,6 +89,29 @@ class TestRdirClient(BaseTestCase):
         entries = self.rdir.chunk_fetch(self.rawx_id, limit=2)
         self._assert_chunk_fetch(self.expected_entries, entries, limit=2)
 
+    def test_chunk_push_delete_many(self):
+        cid = random_id(64)
+        chunks = [{'volume_id': self.rawx_id, 'container_id': cid,
+                   'content_id': random_id(32), 'chunk_id': random_id(64),
+                   'content_path': 'obj-many', 'content_version': 1,
+                   'mtime': 12}
+                  for _ in range(3)]
+        self.assertEqual({}, self.rdir.chunk_push_many(chunks))
+        expected_entries = sorted(
+            (chunk['container_id'], chunk['chunk_id'],
+             {'content_id': chunk['content_id'], 'mtime': 12,
+              'path': 'obj-many', 'version': 1})
+            for chunk in chunks)
+        self.assertListEqual(
+            expected_entries,
+            list(self.rdir.chunk_fetch(self.rawx_id, container_id=cid)))
+
+        self.assertEqual({}, self.rdir.chunk_delete_many(chunks[:2]))
+        self.assertListEqual(
+            [entry for entry in expected_entries
+             if entry[1] == chunks[2]['chunk_id']],
+            list(self.rdir.chunk_fetch(self.rawx_id, container_id=cid)))
+
     def test_chunk_fetch_with_container_id(self):
         cid = random.choice(self.expected_entries)[0]
         expected_entries_cid = [entry for entry in self.expected_entries
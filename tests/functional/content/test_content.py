@@ -290,6 +290,31 @@ class TestContentFactory(BaseTestCase):
     def test_ec_move_chunk(self):
         self._test_move_chunk(self.stgpol_ec)
 
+    @ec
+    def test_ec_move_chunks(self):
+        data = random_data(self.chunk_size)
+        content = self._new_content(self.stgpol_ec, data)
+
+        mc = content.chunks.filter(metapos=0)
+        chunk_ids = [mc[0].id, mc[1].id, '1234']
+        chunk_urls = [mc[0].url, mc[1].url]
+        results = content.move_chunks(chunk_ids)
+
+        self.assertEqual(3, len(results))
+        self.assertEqual(chunk_ids, [chunk_id for chunk_id, _ in results])
+        self.assertIsInstance(results[2][1], OrphanChunk)
+
+        content_updated = self.content_factory.get(self.container_id,
+                                                   content.content_id)
+        hosts = []
+        for c in content_updated.chunks.filter(metapos=0):
+            self.assertThat(hosts, Not(Contains(c.host)))
+            self.assertNotIn(c.url, chunk_urls)
+            hosts.append(c.host)
+        for _, new_chunk in results[:2]:
+            self.assertIn(new_chunk['url'],
+                          [c.url for c in content_updated.chunks])
+
     def test_move_chunk_not_in_content(self):
         data = random_data(self.chunk_size)
         content = self._new_content(self.stgpol_twocopies, data)
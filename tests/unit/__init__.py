@@ -23,6 +23,17 @@ import mock
 import oio
 
 
+def unarmed_timeout(cls=Timeout, seconds=1.0):
+    """
+    Build a timeout to be raised as an exception. Eventlet timeouts start
+    their timer when instantiated: left armed, it would fire later in
+    another test.
+    """
+    timeout = cls(seconds)
+    timeout.cancel()
+    return timeout
+
+
 @contextmanager
 def set_http_requests(cb):
     class FakeConn(object):
@@ -51,3 +51,9 @@ class AccountClientTest(unittest.TestCase):
         call_args = client._direct_request.call_args
         self.assertIn('read_timeout', call_args[1])
         self.assertEqual(33.3, call_args[1]['read_timeout'])
+
+    def test_container_list_details(self):
+        client = self._build_account_client()
+        client.container_list('acct', details=True)
+        params = client._direct_request.call_args[1]['params']
+        self.assertTrue(params['details'])
@@ -0,0 +1,115 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+import unittest
+
+from mock import MagicMock as Mock, patch
+from redis.crc import key_slot
+
+from oio.account.backend import AccountBackend
+
+
+class AccountBackendKeysTest(unittest.TestCase):
+
+    def test_keys(self):
+        backend = AccountBackend({'redis_host': '127.0.0.1:6379'})
+        self.assertFalse(backend.cluster)
+        keys, args = backend._update_container_keys_args(
+            'acct', 'ct', 0, 0, 0, 0, bucket_name='bkt')
+        self.assertEqual(['account:acct', 'container:acct:ct',
+                          'containers:acct', 'bucket:', 'buckets:acct'],
+                         keys)
+        self.assertEqual('bucketlock:bkt', args[3])
+        self.assertEqual('True', args[-1])
+        self.assertEqual('bucket:bkt', backend.bkey('bkt'))
+
+    @patch('redis.cluster.RedisCluster')
+    def test_cluster_keys(self, redis_cluster):
+        backend = AccountBackend(
+            {'redis_cluster_hosts': '127.0.0.1:7000,127.0.0.1:7001'})
+        self.assertTrue(backend.cluster)
+        self.assertEqual(2, len(
+            redis_cluster.call_args[1]['startup_nodes']))
+
+        keys, args = backend._update_container_keys_args(
+            'acct', 'ct', 0, 0, 0, 0, bucket_name='bkt')
+        self.assertEqual('bucket:{acct}', keys[3])
+        # All the keys touched by the script are in the same slot
+        slots = set(key_slot(key.encode('utf-8'))
+                    for key in keys + [args[3], keys[3] + 'bkt'])
+        self.assertEqual({key_slot(b'acct')}, slots)
+        self.assertEqual(key_slot(b'acct'), key_slot(
+            backend.mkey('acct').encode('utf-8')))
+        # Global keys are updated by the caller
+        self.assertEqual('False', args[-1])
+
+    @patch('redis.cluster.RedisCluster')
+    def test_cluster_global_keys(self, redis_cluster):
+        backend = AccountBackend({'redis_cluster_hosts': '127.0.0.1:7000'})
+        pipeline = Mock()
+        backend.conn.pipeline = Mock(return_value=pipeline)
+
+        backend._update_global_keys('acct', [0, 0, b''])
+        pipeline.execute.assert_not_called()
+
+        backend._update_global_keys('acct', [1, 1, b'bkt'])
+        pipeline.hset.assert_any_call('accounts:', 'acct', 1)
+        pipeline.zadd.assert_called_once_with('buckets:', {'bkt': 0})
+        pipeline.hset.assert_any_call('bucketowners:', 'bkt', 'acct')
+
+        # Deletion events usually do not tell the bucket name:
+        # the script uses (and returns) the one of the container.
+        backend.script_update_container = Mock(return_value=[0, -1, b'bkt'])
+        backend.update_container('acct', 'bkt', 0, 1, 0, 0)
+        pipeline.zrem.assert_called_once_with('buckets:', 'bkt')
+        pipeline.hdel.assert_called_once_with('bucketowners:', 'bkt')
+        self.assertEqual(2, pipeline.execute.call_count)
+
+    @patch('redis.cluster.RedisCluster')
+    def test_cluster_bucket_info(self, redis_cluster):
+        backend = AccountBackend({'redis_cluster_hosts': '127.0.0.1:7000'})
+        conn = backend.conn
+        conn.hget = Mock(return_value=b'acct')
+        conn.hgetall = Mock(return_value={b'objects': b'1'})
+        info = backend.get_bucket_info('bkt')
+        conn.hget.assert_called_once_with('bucketowners:', 'bkt')
+        conn.hgetall.assert_called_once_with('bucket:{acct}bkt')
+        self.assertEqual(1, info[b'objects'])
+
+        conn.hget = Mock(return_value=None)
+        self.assertIsNone(backend.get_bucket_info('bkt'))
+
+    @patch('redis.cluster.RedisCluster')
+    def test_cluster_list_containers(self, redis_cluster):
+        backend = AccountBackend({'redis_cluster_hosts': '127.0.0.1:7000'})
+        conn = backend.conn
+        conn.zrangebylex = Mock(return_value=[b'ct0', b'ct1'])
+        pipeline = Mock()
+        pipeline.execute = Mock(return_value=[
+            [b'1', b'10', b'1600000000.0'], [b'2', b'20', b'1600000001.0']])
+
+        def _pipeline(transaction=True, **_kwargs):
+            # Cluster pipelines of redis-py 4 and 5 reject transactions
+            if transaction:
+                raise Exception('transaction is deprecated in cluster mode')
+            return pipeline
+        conn.pipeline = Mock(side_effect=_pipeline)
+
+        containers = backend.list_containers('acct', limit=10)
+        self.assertEqual([['ct0', 1, 10, 0, 1600000000.0],
+                          ['ct1', 2, 20, 0, 1600000001.0]],
+                         containers)
+        pipeline.hmget.assert_any_call(
+            'container:{acct}:ct0', 'objects', 'bytes', 'mtime')
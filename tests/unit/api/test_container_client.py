@@ -16,7 +16,9 @@
 import unittest
 from mock import MagicMock as Mock, patch
 
-from oio.common.exceptions import Conflict, ServiceBusy
+from oio.common.exceptions import Conflict, NoSuchObject, NotFound, \
+    ServiceBusy, TooLarge
+from oio.common.json import json
 from oio.container.client import CHUNK_SYSMETA_PREFIX, extract_chunk_qualities
 from tests.unit.api import FakeStorageApi
 from tests.utils import random_id
@@ -84,6 +86,71 @@ class ContainerClientTest(unittest.TestCase):
         key = '%shttp://%s/%s' % (CHUNK_SYSMETA_PREFIX, host, random_id(64))
         return key, DUMMY_QUAL_JSON
 
+    def _locate_many_reply(self, method, uri, data=None, **kwargs):
+        body = json.loads(data)
+        contents = list()
+        for item in body['contents']:
+            if item['name'] == 'missing':
+                contents.append({'name': item['name'], 'status': 420,
+                                 'message': 'Content not found'})
+            else:
+                contents.append({
+                    'name': item['name'], 'status': 200, 'message': 'ok',
+                    'meta': {'name': item['name'], 'id': 'ABCD',
+                             'version': item['version'] or '1'},
+                    'properties': {},
+                    'chunks': [{'url': 'http://127.0.0.1:6010/AAAA'}]})
+        return Mock(), {'contents': contents}
+
+    def test_content_locate_many(self):
+        with patch('oio.api.base.HttpApi._direct_request',
+                   Mock(side_effect=self._locate_many_reply)) as request:
+            results = self.api.container.content_locate_many(
+                self.account, self.container,
+                ['obj1', ('obj2', '12'), 'missing'], batch_size=2)
+            self.assertEqual(2, request.call_count)
+            obj_results = self.api.object_locate_many(
+                self.account, self.container, ['missing'])
+        self.assertEqual(['obj1', 'obj2', 'missing'],
+                         [name for name, _ in results])
+        meta, chunks = results[1][1]
+        self.assertEqual('12', meta['version'])
+        self.assertEqual(1, len(chunks))
+        self.assertIsInstance(results[2][1], NotFound)
+        self.assertEqual(420, results[2][1].status)
+        self.assertIsInstance(obj_results[0][1], NoSuchObject)
+
+    def test_content_locate_many_too_large(self):
+        def _reply(method, uri, data=None, **kwargs):
+            if len(json.loads(data)['contents']) > 2:
+                raise TooLarge()
+            return self._locate_many_reply(method, uri, data=data, **kwargs)
+        with patch('oio.api.base.HttpApi._direct_request',
+                   Mock(side_effect=_reply)) as request:
+            results = self.api.container.content_locate_many(
+                self.account, self.container, ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(['a', 'b', 'c', 'd', 'e'],
+                         [meta['name'] for _, (meta, _) in results])
+        # 5 objects (too large), 2 objects, 3 objects (too large),
+        # 1 object, 2 objects
+        self.assertEqual(5, request.call_count)
+
+    def test_content_locate_many_not_supported(self):
+        def _locate(account, reference, path, version=None, **kwargs):
+            if path == 'missing':
+                raise NotFound()
+            return {'name': path}, []
+        with patch('oio.api.base.HttpApi._direct_request',
+                   Mock(side_effect=NotFound())), \
+                patch.object(self.api.container, 'content_locate',
+                             Mock(side_effect=_locate)) as locate:
+            results = self.api.container.content_locate_many(
+                self.account, self.container, ['obj1', 'missing', 'obj2'])
+        self.assertEqual(3, locate.call_count)
+        self.assertEqual(({'name': 'obj1'}, []), results[0][1])
+        self.assertIsInstance(results[1][1], NotFound)
+        self.assertEqual(({'name': 'obj2'}, []), results[2][1])
+
     def test_extract_chunk_qualities(self):
         properties = dict()
         properties.update((self._gen_chunk_qual(), ))
@@ -25,12 +25,13 @@ from copy import deepcopy
 from mock import patch
 from oio.common.storage_method import STORAGE_METHODS
 from oio.api.ec import EcMetachunkWriter, ECChunkDownloadHandler, \
-    ECRebuildHandler
+    ECRebuildHandler, ECStream, ec_encode
 from oio.common import exceptions as exc, green
 from oio.common.constants import CHUNK_HEADERS
 from tests.unit.api import empty_stream, decode_chunked_body, \
     FakeResponse, CHUNK_SIZE, EMPTY_MD5, EMPTY_SHA256
-from tests.unit import set_http_connect, set_http_requests
+from tests.unit import set_http_connect, set_http_requests, \
+    unarmed_timeout
 from oio.common.constants import OIO_VERSION
 
 
@@ -136,7 +137,7 @@ class TestEC(unittest.TestCase):
 
     def test_write_connect_errors(self):
         test_cases = [
-                {'error': green.ConnectionTimeout(1.0),
+                {'error': unarmed_timeout(green.ConnectionTimeout),
                  'msg': 'connect: Connection timeout 1.0 second'},
                 {'error': Exception('failure'), 'msg': 'connect: failure'},
         ]
@@ -167,7 +168,7 @@ class TestEC(unittest.TestCase):
 
     def test_write_response_error(self):
         test_cases = [
-                {'error': green.ChunkWriteTimeout(1.0),
+                {'error': unarmed_timeout(green.ChunkWriteTimeout),
                  'msg': 'resp: Chunk write timeout 1.0 second'},
                 {'error': Exception('failure'), 'msg': 'resp: failure'},
         ]
@@ -213,7 +214,7 @@ class TestEC(unittest.TestCase):
     def test_write_timeout_source(self):
         class TestReader(object):
             def read(self, size):
-                raise Timeout(1.0)
+                raise unarmed_timeout()
         checksum = self.checksum()
         source = TestReader()
         size = CHUNK_SIZE * self.storage_method.ec_nb_data
@@ -241,7 +242,7 @@ class TestEC(unittest.TestCase):
             self.assertRaises(Exception, handler.stream, source,
                               size)
 
-    def test_write_transfer(self):
+    def _test_write_transfer(self, **kwargs):
         checksum = self.checksum()
         segment_size = self.storage_method.ec_segment_size
         test_data = (b'1234' * segment_size)[:-10]
@@ -260,7 +261,8 @@ class TestEC(unittest.TestCase):
 
         with set_http_connect(*resps, cb_body=cb_body):
             handler = EcMetachunkWriter(self.sysmeta, self.meta_chunk(),
-                                        checksum, self.storage_method)
+                                        checksum, self.storage_method,
+                                        **kwargs)
             bytes_transferred, checksum, chunks = handler.stream(source, size)
 
         self.assertEqual(len(test_data), bytes_transferred)
@@ -299,6 +301,16 @@ class TestEC(unittest.TestCase):
         self.assertEqual(
             test_data_checksum, self.checksum(final_data).hexdigest())
 
+    def test_write_transfer(self):
+        self._test_write_transfer()
+
+    def test_write_transfer_encode_in_thread(self):
+        with patch('oio.api.ec.tpool.execute',
+                   wraps=green.tpool.execute) as execute:
+            self._test_write_transfer(ec_encode_in_thread=True)
+            # 3 full segments and the remaining data
+            self.assertEqual(4, len(execute.call_args_list))
+
     def _test_write_checksum_algo(self, expected_checksum, **kwargs):
         global_checksum = self.checksum()
         source = empty_stream()
@@ -347,6 +359,28 @@ class TestEC(unittest.TestCase):
             # Should be called only once for the metachunk
             algo_new.assert_called_once_with('md5')
 
+    def test_ec_encode_unaligned(self):
+        segment_size = self.storage_method.ec_segment_size
+        nb = self.storage_method.ec_nb_data + self.storage_method.ec_nb_parity
+        test_data = (b'1234' * segment_size)[:-10]
+        expected = self._make_ec_chunks(test_data)
+
+        # aligned reads, unaligned reads, and reads spanning segments
+        for read_size in (segment_size, 1000, segment_size * 2 + 7):
+            ec_stream = ec_encode(self.storage_method, nb)
+            ec_stream.send(None)
+            chunks = [[] for _ in range(nb)]
+            for offset in range(0, len(test_data), read_size):
+                fragments = ec_stream.send(
+                    test_data[offset:offset + read_size])
+                if fragments is None:
+                    continue
+                for num in range(nb):
+                    chunks[num].extend(fragments[num])
+            for num, frags in enumerate(ec_stream.send(b'')):
+                chunks[num].extend(frags)
+            self.assertEqual(expected, [b''.join(c) for c in chunks])
+
     def _make_ec_chunks(self, data):
         segment_size = self.storage_method.ec_segment_size
 
@@ -364,7 +398,7 @@ class TestEC(unittest.TestCase):
         ec_chunks = [b''.join(frag) for frag in zip(*fragments_data)]
         return ec_chunks
 
-    def test_read(self):
+    def _test_read(self, **kwargs):
         segment_size = self.storage_method.ec_segment_size
 
         data = (b'1234' * segment_size)[:-10]
@@ -402,7 +436,7 @@ class TestEC(unittest.TestCase):
         with set_http_connect(*resps, body_iter=body_iter):
             handler = ECChunkDownloadHandler(self.storage_method,
                                              meta_chunk, meta_start,
-                                             meta_end, headers)
+                                             meta_end, headers, **kwargs)
             stream = handler.get_stream()
             body = b''
             for part in stream:
@@ -411,6 +445,25 @@ class TestEC(unittest.TestCase):
             self.assertEqual(len(data), len(body))
             self.assertEqual(data, body)
 
+    def test_read(self):
+        self._test_read()
+
+    def test_read_readahead(self):
+        with patch.object(ECStream, '_decode_batch',
+                          autospec=True,
+                          side_effect=ECStream._decode_batch) as decode:
+            self._test_read(ec_readahead_segments=4)
+            # each segment has been decoded exactly once
+            self.assertEqual(
+                4, sum(len(call[0][1]) for call in decode.call_args_list))
+
+    def test_read_decode_in_thread(self):
+        with patch('oio.api.ec.tpool.execute',
+                   wraps=green.tpool.execute) as execute:
+            self._test_read(ec_readahead_segments=2,
+                            ec_decode_in_thread=True)
+            self.assertGreater(len(execute.call_args_list), 0)
+
     def test_read_advanced(self):
         segment_size = self.storage_method.ec_segment_size
         test_data = (b'1234' * segment_size)[:-657]
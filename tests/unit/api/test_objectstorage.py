@@ -20,7 +20,7 @@ import random
 import unittest
 from os.path import basename
 from tempfile import NamedTemporaryFile
-from mock import MagicMock as Mock, ANY
+from mock import MagicMock as Mock, ANY, patch
 
 from six import PY3
 
@@ -504,3 +504,96 @@ class ObjectStorageTest(unittest.TestCase):
     def test_container_flush_empty(self):
         self.api.object_list = Mock(return_value={"objects": []})
         self.api.container_flush(self.account, self.container)
+
+    def test_container_snapshot(self):
+        objects = [{'name': 'obj%d' % i, 'version': i, 'content': 'C%d' % i}
+                   for i in range(10)]
+        api = self.api
+        api.container = Mock()
+        api.object_list = Mock(return_value={'objects': objects,
+                                             'truncated': False})
+        api.object_locate_many = Mock(side_effect=lambda a, c, objs, **kw: [
+            (name, ({'version': version}, [])) for name, version in objs])
+
+        def _snapshot_object(dst_account, dst_container, obj, obj_meta,
+                             chunks, **kwargs):
+            self.assertEqual(obj['version'], obj_meta['version'])
+            return ([{'content': obj['content'], 'id': 'src'}] * 2,
+                    [{'content': obj['content'], 'id': 'dst'}] * 2)
+        api._snapshot_object = Mock(side_effect=_snapshot_object)
+        progress = list()
+
+        api.container_snapshot(self.account, self.container,
+                               self.account, 'snapshot', batch_size=5,
+                               concurrency=3,
+                               progress_callback=progress.append)
+        self.assertEqual(10, api._snapshot_object.call_count)
+        updates = api.container.container_raw_update.call_args_list
+        # Each update has more than batch_size chunks (3 objects),
+        # except the last one.
+        self.assertEqual(4, len(updates))
+        contents = [bean['content'] for update in updates
+                    for bean in update[0][0]]
+        self.assertEqual(['C%d' % i for i in range(10) for _ in range(2)],
+                         contents)
+        self.assertEqual([3, 6, 10], progress)
+        api.container.container_freeze.assert_called_once()
+        api.container.container_enable.assert_called_once()
+
+    def test_container_snapshot_failure(self):
+        api = self.api
+        api.container = Mock()
+        api.object_list = Mock(return_value={
+            'objects': [{'name': 'obj', 'version': 1}], 'truncated': False})
+        api.object_locate_many = Mock(return_value=[
+            ('obj', exceptions.NoSuchObject('obj'))])
+        self.assertRaises(exceptions.NoSuchObject, api.container_snapshot,
+                          self.account, self.container,
+                          self.account, 'snapshot')
+        api.container.container_raw_update.assert_not_called()
+        api.container.container_enable.assert_called_once()
+
+    def test_account_refresh_all(self):
+        api = self.api
+        api.account = Mock()
+        api.account_list = Mock(return_value=['c', 'a', 'd', 'b'])
+        containers = {'b': ['ct%d' % i for i in range(5)],
+                      'c': ['ct0'],
+                      'd': []}
+
+        def _container_list(account, marker=None, **kwargs):
+            names = [ct for ct in containers[account]
+                     if marker is None or ct > marker]
+            return [[name, 0, 0, 0, 0] for name in names[:2]]
+        api.container_list = Mock(side_effect=_container_list)
+        api.container_refresh = Mock(
+            side_effect=[None, exceptions.NoSuchContainer('ct'),
+                         None, None, None, None])
+        progress = list()
+
+        api.account_refresh(None, concurrency=3, account_concurrency=2,
+                            marker='a', progress_callback=progress.append)
+        self.assertEqual(['b', 'c', 'd'], progress)
+        refreshed = [call[0][0] for call
+                     in api.account.account_refresh.call_args_list]
+        self.assertEqual(['b', 'c', 'd'], sorted(refreshed))
+        refreshed = [call[0][:2] for call
+                     in api.container_refresh.call_args_list]
+        self.assertEqual(
+            [('b', 'ct%d' % i) for i in range(5)] + [('c', 'ct0')],
+            sorted(refreshed))
+
+    def test_account_refresh_max_rate(self):
+        api = self.api
+        api.account = Mock()
+        api.container_list = Mock(side_effect=[
+            [['ct%d' % i, 0, 0, 0, 0] for i in range(5)], []])
+        api.container_refresh = Mock()
+        with patch('oio.api.object_storage.eventlet.sleep') as sleep:
+            api.account_refresh(self.account, concurrency=5, max_rate=10)
+        self.assertEqual(5, api.container_refresh.call_count)
+        # The first refresh is immediate, the others are delayed
+        self.assertEqual(4, sleep.call_count)
+        delays = sorted(call[0][0] for call in sleep.call_args_list)
+        self.assertGreater(delays[-1], delays[0])
+        self.assertLessEqual(delays[-1], 0.4)
@@ -16,6 +16,8 @@
 import unittest
 from mock import MagicMock as Mock
 
+from oio.common.exceptions import OioException
+from oio.common.green import eventlet
 from oio.rdir.client import RdirClient
 from tests.utils import random_id
 from tests.unit.api import FakeResponse
@@ -107,6 +109,110 @@ class TestRdirClient(unittest.TestCase):
         self.assertEqual(3, len(items))
         self.assertEqual(self.rdir_client._direct_request.call_count, 3)
 
+    def _fetch_pages(self, nb_pages):
+        """Build the responses to fetch requests, one record per page."""
+        pages = list()
+        for i in range(nb_pages):
+            key = "%s|%s" % (self.container_id_1, random_id(64))
+            truncated = str(i < nb_pages - 1)
+            pages.append((FakeResponse(200, headers={
+                'x-oio-list-truncated': truncated,
+                'x-oio-list-marker': key}), [[key, {'mtime': i}]]))
+        return pages
+
+    def test_fetch_prefetch(self):
+        requests = list()
+        pages = self._fetch_pages(3)
+
+        def _direct_request(method, url, json=None, **kwargs):
+            requests.append(json)
+            return pages[len(requests) - 1]
+
+        self.rdir_client._direct_request = Mock(side_effect=_direct_request)
+        gen = self.rdir_client.chunk_fetch("volume", limit=2)
+        next(gen)
+        # The second page has been requested while the first
+        # one was processed.
+        eventlet.sleep(0)
+        self.assertEqual(2, len(requests))
+        self.assertEqual(3, len(list(gen)) + 1)
+        self.assertEqual(3, len(requests))
+        self.assertNotIn('start_after', requests[0])
+        self.assertEqual(pages[0][1][0][0], requests[1]['start_after'])
+        self.assertEqual(pages[1][1][0][0], requests[2]['start_after'])
+
+    def test_fetch_grow_limit(self):
+        requests = list()
+        pages = self._fetch_pages(4)
+
+        def _direct_request(method, url, json=None, **kwargs):
+            requests.append(json)
+            return pages[len(requests) - 1]
+
+        self.rdir_client._direct_request = Mock(side_effect=_direct_request)
+        # The consumer never yields: each prefetched page is waited for
+        items = list(self.rdir_client.chunk_fetch(
+            "volume", limit=2, max_limit=5))
+        self.assertEqual(4, len(items))
+        self.assertEqual([2, 2, 4, 5], [req['limit'] for req in requests])
+
+    def test_fetch_close(self):
+        pages = self._fetch_pages(3)
+        self.rdir_client._direct_request = Mock(side_effect=pages)
+        gen = self.rdir_client.chunk_fetch("volume", limit=2)
+        next(gen)
+        gen.close()
+        eventlet.sleep(0)
+        # The prefetch has been cancelled
+        self.assertEqual(1, self.rdir_client._direct_request.call_count)
+
+    def test_chunk_push_many(self):
+        self.rdir_client._rdir_request = Mock(return_value=(None, ''))
+        chunks = [
+            {'volume_id': 'vol1', 'container_id': self.container_id_1,
+             'content_id': self.content_id_1, 'chunk_id': self.chunk_id_1,
+             'content_path': 'obj1', 'content_version': '1', 'mtime': 10},
+            {'volume_id': 'vol2', 'container_id': self.container_id_2,
+             'content_id': self.content_id_2, 'chunk_id': self.chunk_id_2,
+             'content_path': 'obj2', 'content_version': 2, 'mtime': 20},
+            {'volume_id': 'vol1', 'container_id': self.container_id_3,
+             'content_id': self.content_id_3, 'chunk_id': self.chunk_id_3,
+             'content_path': 'obj3', 'content_version': 3, 'mtime': 30},
+        ]
+        errors = self.rdir_client.chunk_push_many(chunks)
+        self.assertEqual({}, errors)
+        self.assertEqual(2, self.rdir_client._rdir_request.call_count)
+        calls = {call[0][0]: call
+                 for call in self.rdir_client._rdir_request.call_args_list}
+        self.assertEqual(('vol1', 'POST', 'push'), calls['vol1'][0])
+        self.assertTrue(calls['vol1'][1]['create'])
+        records = calls['vol1'][1]['json']
+        self.assertEqual([self.chunk_id_1, self.chunk_id_3],
+                         [rec['chunk_id'] for rec in records])
+        self.assertEqual({'chunk_id': self.chunk_id_1,
+                          'container_id': self.container_id_1,
+                          'content_id': self.content_id_1,
+                          'path': 'obj1', 'version': 1, 'mtime': 10},
+                         records[0])
+        self.assertEqual(1, len(calls['vol2'][1]['json']))
+
+    def test_chunk_delete_many_errors(self):
+        self.rdir_client._rdir_request = Mock(
+            side_effect=[(None, ''), OioException('rdir request errors')])
+        chunks = [
+            {'volume_id': 'vol%d' % i, 'container_id': self.container_id_1,
+             'content_id': self.content_id_1, 'chunk_id': self.chunk_id_1}
+            for i in range(2)]
+        errors = self.rdir_client.chunk_delete_many(chunks)
+        self.assertEqual(1, len(errors))
+        self.assertIsInstance(list(errors.values())[0], OioException)
+        for call in self.rdir_client._rdir_request.call_args_list:
+            self.assertEqual('DELETE', call[0][1])
+            self.assertEqual([{'container_id': self.container_id_1,
+                               'content_id': self.content_id_1,
+                               'chunk_id': self.chunk_id_1}],
+                             call[1]['json'])
+
 
 class TestRdirMeta2Client(unittest.TestCase):
     def setUp(self):
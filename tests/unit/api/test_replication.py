@@ -14,8 +14,6 @@
 # License along with this library.
 
 
-from oio.common.green import Timeout
-
 import unittest
 from collections import defaultdict
 from io import BytesIO
@@ -29,7 +27,8 @@ from oio.common.storage_method import STORAGE_METHODS
 from tests.unit.api import CHUNK_SIZE, EMPTY_MD5, EMPTY_SHA256, \
     empty_stream, decode_chunked_body, FakeResponse
 from oio.api import io
-from tests.unit import set_http_connect, set_http_requests
+from tests.unit import set_http_connect, set_http_requests, \
+    unarmed_timeout
 from oio.common.constants import OIO_VERSION
 
 
@@ -134,7 +133,7 @@ class TestReplication(unittest.TestCase):
         size = CHUNK_SIZE
         meta_chunk = self.meta_chunk()
         resps = [201] * (len(meta_chunk) - 1)
-        resps.append(Timeout(1.0))
+        resps.append(unarmed_timeout())
         with set_http_connect(*resps):
             handler = ReplicatedMetachunkWriter(
                 self.sysmeta, meta_chunk, checksum, self.storage_method)
@@ -195,7 +194,7 @@ class TestReplication(unittest.TestCase):
     def test_write_timeout_source(self):
         class TestReader(object):
             def read(self, size):
-                raise Timeout(1.0)
+                raise unarmed_timeout()
 
         checksum = self.checksum()
         source = TestReader()
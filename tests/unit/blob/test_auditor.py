@@ -0,0 +1,181 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from mock import MagicMock as Mock, patch
+
+from oio.blob.auditor import BlobAuditorWorker
+from oio.common.green import eventlet
+from oio.common.exceptions import NotFound
+from tests.utils import random_id
+
+
+class TestBlobAuditorWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.volume = tempfile.mkdtemp()
+        self.chunks_meta = dict()
+
+    def tearDown(self):
+        shutil.rmtree(self.volume)
+
+    def _chunk(self, content_id, data, corrupted=False, path=None):
+        chunk_id = random_id(64)
+        chunk_dir = os.path.join(self.volume, chunk_id[:3])
+        if not os.path.isdir(chunk_dir):
+            os.mkdir(chunk_dir)
+        with open(os.path.join(chunk_dir, chunk_id), 'wb') as chunk_file:
+            chunk_file.write(data)
+        if corrupted:
+            data = data[::-1]
+        self.chunks_meta[chunk_id] = {
+            'chunk_id': chunk_id, 'chunk_pos': '0',
+            'chunk_size': str(len(data)),
+            'chunk_hash': hashlib.md5(data).hexdigest().upper(),
+            'container_id': 'C' * 64, 'content_id': content_id}
+        if path:
+            self.chunks_meta[chunk_id]['content_path'] = path
+            self.chunks_meta[chunk_id]['content_version'] = '1'
+        return {'url': 'http://127.0.0.1:6010/' + chunk_id, 'pos': '0',
+                'size': len(data), 'hash': hashlib.md5(data).hexdigest()}
+
+    def _read_chunk_metadata(self, _fd, chunk_id):
+        return self.chunks_meta[chunk_id], None
+
+    def test_audit_chunks(self):
+        content1 = [self._chunk('1' * 32, b'data1'),
+                    self._chunk('1' * 32, b'data2'),
+                    self._chunk('1' * 32, b'data3', corrupted=True)]
+        content2 = [self._chunk('2' * 32, b'data4')]
+        self._chunk('3' * 32, b'orphan')
+        with open(os.path.join(self.volume, 'not-a-chunk'), 'wb'):
+            pass
+        locations = {'1' * 32: content1, '2' * 32: content2}
+
+        def _content_locate(cid=None, content=None, **_kwargs):
+            if content not in locations:
+                raise NotFound()
+            return {}, locations[content]
+
+        with patch('oio.blob.auditor.ContainerClient'):
+            auditor = BlobAuditorWorker(
+                {'namespace': 'OPENIO', 'concurrency': '3',
+                 'read_buffer_size': '2'},
+                Mock(), self.volume)
+        auditor.container_client.content_locate.side_effect = _content_locate
+        with patch('oio.blob.auditor.read_chunk_metadata',
+                   new=self._read_chunk_metadata):
+            paths = list(auditor.audit_chunks())
+        self.assertEqual(5, len(paths))
+        self.assertEqual(5, auditor.passes)
+        self.assertEqual(1, auditor.corrupted_chunks)
+        self.assertEqual(1, auditor.orphan_chunks)
+        self.assertEqual(0, auditor.faulty_chunks)
+        self.assertEqual(0, auditor.errors)
+        # The corrupted chunk is not counted
+        self.assertEqual(len('data1data2data4orphan'),
+                         auditor.total_bytes_processed)
+        # One request per content
+        self.assertEqual(3, auditor.container_client.content_locate.call_count)
+
+    def test_audit_chunks_locate_many(self):
+        content1 = [self._chunk('1' * 32, b'data1', path='obj1'),
+                    self._chunk('1' * 32, b'data2', path='obj1')]
+        content2 = [self._chunk('2' * 32, b'data3', path='obj2')]
+        # Same name, but another content
+        self._chunk('3' * 32, b'orphan', path='obj3')
+        self._chunk('4' * 32, b'error', path='obj4')
+        locations = {'obj1': ('1' * 32, content1),
+                     'obj2': ('2' * 32, content2),
+                     'obj3': ('5' * 32, [])}
+
+        def _content_locate_many(cid=None, paths=None, **_kwargs):
+            results = list()
+            for path, version in paths:
+                self.assertEqual('1', version)
+                if path in locations:
+                    content_id, chunks = locations[path]
+                    results.append((path, ({'id': content_id}, chunks)))
+                else:
+                    results.append((path, Exception('boom')))
+            return results
+
+        with patch('oio.blob.auditor.ContainerClient'):
+            auditor = BlobAuditorWorker(
+                {'namespace': 'OPENIO', 'concurrency': '3'},
+                Mock(), self.volume)
+        auditor.container_client.content_locate_many.side_effect = \
+            _content_locate_many
+        with patch('oio.blob.auditor.read_chunk_metadata',
+                   new=self._read_chunk_metadata):
+            paths = list(auditor.audit_chunks())
+        self.assertEqual(5, len(paths))
+        self.assertEqual(5, auditor.passes)
+        self.assertEqual(0, auditor.corrupted_chunks)
+        self.assertEqual(1, auditor.orphan_chunks)
+        self.assertEqual(1, auditor.errors)
+        # One request for all the contents of the container
+        self.assertEqual(
+            1, auditor.container_client.content_locate_many.call_count)
+        self.assertEqual(0, auditor.container_client.content_locate.call_count)
+
+    def test_audit_chunks_walk_error(self):
+        for i in range(10):
+            self._chunk('%032d' % i, b'data')
+
+        with patch('oio.blob.auditor.ContainerClient'):
+            auditor = BlobAuditorWorker(
+                {'namespace': 'OPENIO', 'concurrency': '2'},
+                Mock(), self.volume)
+        walk = auditor.checkpoint.walk
+
+        def _walk():
+            for i, path in enumerate(walk()):
+                if i == 5:
+                    raise IOError('No space left on device')
+                yield path
+        auditor.checkpoint.walk = _walk
+        paths = list()
+        with patch('oio.blob.auditor.read_chunk_metadata',
+                   new=self._read_chunk_metadata):
+            self.assertRaises(IOError, lambda: paths.extend(
+                auditor.audit_chunks()))
+        # The error is raised, and the walk is not resumed
+        self.assertLessEqual(len(paths), 5)
+
+    def test_bytes_ratelimit_concurrent(self):
+        with patch('oio.blob.auditor.ContainerClient'):
+            auditor = BlobAuditorWorker(
+                {'namespace': 'OPENIO', 'concurrency': '8',
+                 'bytes_per_second': '200000'},
+                Mock(), self.volume)
+
+        def _reader():
+            for _ in range(5):
+                auditor._bytes_ratelimit(1000)
+
+        start = time.time()
+        readers = [eventlet.spawn(_reader) for _ in range(8)]
+        for reader in readers:
+            reader.wait()
+        # 40000 bytes at 200000 bytes per second, for all the readers
+        self.assertGreaterEqual(time.time() - start, 0.18)
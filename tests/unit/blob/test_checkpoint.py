@@ -0,0 +1,145 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from oio.blob.checkpoint import VolumeCheckpoint, \
+    volume_checkpoint_from_conf
+
+
+class TestVolumeCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.volume = os.path.join(self.tmpdir, 'volume')
+        self.path = os.path.join(self.tmpdir, 'checkpoint')
+        self.files = list()
+        for subdir in ('AAA', 'BBB', 'CCC'):
+            os.makedirs(os.path.join(self.volume, subdir))
+            for i in range(2):
+                path = os.path.join(self.volume, subdir, 'chunk%d' % i)
+                with open(path, 'w'):
+                    pass
+                self.files.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _checkpoint(self, **kwargs):
+        return VolumeCheckpoint(self.volume, path=self.path, interval=0.0,
+                                **kwargs)
+
+    def test_full_pass(self):
+        checkpoint = self._checkpoint()
+        checkpoint.start_pass()
+        paths = list()
+        for path in checkpoint.walk():
+            paths.append(path)
+            checkpoint.done(path)
+        self.assertEqual(self.files, sorted(paths))
+        self.assertEqual('CCC', checkpoint.marker)
+        checkpoint.end_pass()
+
+        checkpoint = self._checkpoint()
+        checkpoint.load()
+        self.assertIsNone(checkpoint.marker)
+        self.assertIsNone(checkpoint.pass_start)
+        self.assertIsNotNone(checkpoint.last_pass_start)
+
+    def test_resume(self):
+        checkpoint = self._checkpoint()
+        checkpoint.start_pass()
+        pass_start = checkpoint.pass_start
+        walk = checkpoint.walk()
+        in_progress = list()
+        for _ in range(4):
+            in_progress.append(next(walk))
+        # The first chunk of the second subdirectory is not processed
+        for path in in_progress[:2] + in_progress[3:]:
+            checkpoint.done(path)
+        self.assertEqual('AAA', checkpoint.marker)
+
+        # Restart
+        checkpoint = self._checkpoint()
+        checkpoint.start_pass()
+        self.assertEqual(pass_start, checkpoint.pass_start)
+        paths = list(checkpoint.walk())
+        self.assertEqual(self.files[2:], sorted(paths))
+
+    def test_resume_nested(self):
+        # Hashed layout, with 2 levels of subdirectories
+        shutil.rmtree(self.volume)
+        self.files = list()
+        for subdir in ('AB/00', 'AB/01', 'CD/00'):
+            os.makedirs(os.path.join(self.volume, subdir))
+            for i in range(2):
+                path = os.path.join(self.volume, subdir, 'chunk%d' % i)
+                with open(path, 'w'):
+                    pass
+                self.files.append(path)
+
+        checkpoint = self._checkpoint()
+        checkpoint.start_pass()
+        walk = checkpoint.walk()
+        # Only one of the chunks of AB/00 is processed
+        checkpoint.done(next(walk))
+        next(walk)
+        self.assertEqual('AB', checkpoint.marker)
+
+        # Restart
+        checkpoint = self._checkpoint()
+        checkpoint.start_pass()
+        paths = list()
+        for path in checkpoint.walk():
+            paths.append(path)
+            checkpoint.done(path)
+        self.assertEqual(self.files, sorted(paths))
+        self.assertEqual(os.path.join('CD', '00'), checkpoint.marker)
+
+        # Restart after AB/00 has been processed
+        checkpoint.marker = os.path.join('AB', '00')
+        checkpoint.save()
+        checkpoint = self._checkpoint()
+        checkpoint.start_pass()
+        self.assertEqual(self.files[2:], sorted(checkpoint.walk()))
+
+    def test_incremental(self):
+        checkpoint = self._checkpoint(incremental=True)
+        checkpoint.start_pass()
+        for path in checkpoint.walk():
+            checkpoint.done(path)
+        checkpoint.end_pass()
+
+        # The ctime cannot be set: pretend the last pass started later
+        ctime = max(os.stat(path).st_ctime for path in self.files)
+        checkpoint.last_pass_start = ctime + 1
+        checkpoint.save()
+        os.utime(self.files[1], (ctime + 2, ctime + 2))
+
+        checkpoint = self._checkpoint(incremental=True)
+        checkpoint.start_pass()
+        self.assertEqual([self.files[1]], list(checkpoint.walk()))
+
+    def test_from_conf(self):
+        checkpoint = volume_checkpoint_from_conf({}, self.volume)
+        self.assertIsNone(checkpoint.path)
+        self.assertFalse(checkpoint.incremental)
+        checkpoint.start_pass()
+        self.assertEqual(len(self.files), len(list(checkpoint.walk())))
+        self.assertFalse(os.path.exists(self.path))
@@ -0,0 +1,231 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from mock import patch
+
+from oio.common.cache import MetadataCache, SharedMetadataCache, \
+    metadata_cache_from_conf, get_cached_object_metadata, \
+    set_cached_object_metadata, set_cached_object_not_found, \
+    del_cached_object_metadata
+from oio.common.exceptions import NotFound
+
+
+class MetadataCacheTest(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = MetadataCache(size=2, ttl=0)
+        cache['a'] = 1
+        cache['b'] = 2
+        # 'a' becomes the most recently used entry
+        self.assertEqual(1, cache.get('a'))
+        cache['c'] = 3
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(1, cache.stats()['evictions'])
+
+    def test_max_bytes(self):
+        cache = MetadataCache(size=0, max_bytes=100, ttl=0)
+        for i in range(10):
+            cache['key%d' % i] = 'x' * 20
+        self.assertLessEqual(cache.bytes, 100)
+        self.assertIn('key9', cache)
+        self.assertNotIn('key0', cache)
+
+    def test_ttl(self):
+        cache = MetadataCache(ttl=10.0)
+        with patch('oio.common.cache.monotonic_time', return_value=100.0):
+            cache['a'] = 1
+            cache.set('b', 2, ttl=30.0)
+        with patch('oio.common.cache.monotonic_time', return_value=120.0):
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(2, cache.get('b'))
+            self.assertRaises(KeyError, cache.__getitem__, 'a')
+        stats = cache.stats()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(2, stats['misses'])
+        self.assertEqual(1, stats['expirations'])
+        self.assertEqual(1, stats['entries'])
+
+    def test_contains_ttl(self):
+        cache = MetadataCache(ttl=10.0)
+        with patch('oio.common.cache.monotonic_time', return_value=100.0):
+            cache['a'] = 1
+            self.assertIn('a', cache)
+        with patch('oio.common.cache.monotonic_time', return_value=120.0):
+            self.assertNotIn('a', cache)
+        self.assertEqual(0, len(cache))
+        self.assertEqual(1, cache.stats()['expirations'])
+
+    def test_negative_caching(self):
+        cache = MetadataCache(negative_ttl=1.0)
+        err = NotFound(404, 420, 'Object not found')
+        set_cached_object_not_found(err, account='acct', reference='ct',
+                                    path='obj', cache=cache)
+        self.assertRaises(NotFound, get_cached_object_metadata,
+                          account='acct', reference='ct', path='obj',
+                          cache=cache)
+        try:
+            get_cached_object_metadata(account='acct', reference='ct',
+                                       path='obj', cache=cache)
+        except NotFound as exc:
+            self.assertEqual(420, exc.status)
+
+        # Creating the object drops the negative entry
+        del_cached_object_metadata(account='acct', reference='ct',
+                                   path='obj', cache=cache)
+        set_cached_object_metadata({'properties': {}}, [],
+                                   account='acct', reference='ct',
+                                   path='obj', cache=cache)
+        meta, chunks = get_cached_object_metadata(
+            account='acct', reference='ct', path='obj', cache=cache)
+        self.assertEqual([], chunks)
+
+    def test_no_negative_caching(self):
+        for cache in (dict(), MetadataCache()):
+            set_cached_object_not_found(NotFound(), account='acct',
+                                        reference='ct', path='obj',
+                                        cache=cache)
+            self.assertEqual(0, len(cache))
+
+    def test_from_conf(self):
+        self.assertIsNone(metadata_cache_from_conf({}))
+        cache = metadata_cache_from_conf(
+            {'cache_size': '10', 'cache_ttl': '5',
+             'cache_negative_ttl': '0.5'})
+        self.assertEqual(10, cache.size)
+        self.assertEqual(0, cache.max_bytes)
+        self.assertEqual(5.0, cache.ttl)
+        self.assertEqual(0.5, cache.negative_ttl)
+
+
+class SharedMetadataCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache')
+        self.caches = list()
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _cache(self, **kwargs):
+        cache = SharedMetadataCache(self.path, **kwargs)
+        self.caches.append(cache)
+        return cache
+
+    def test_get_set_del(self):
+        cache = self._cache(size=64)
+        cache['a'] = {'meta': {'id': 'A'}, 'chunks': [{'url': 'u'}]}
+        self.assertEqual({'meta': {'id': 'A'}, 'chunks': [{'url': 'u'}]},
+                         cache['a'])
+        self.assertIn('a', cache)
+        self.assertEqual(1, len(cache))
+        del cache['a']
+        self.assertNotIn('a', cache)
+        self.assertIsNone(cache.get('a'))
+        self.assertRaises(KeyError, cache.__delitem__, 'a')
+
+    def test_shared_between_instances(self):
+        cache1 = self._cache(size=64)
+        # The geometry of the existing file is used
+        cache2 = self._cache(size=1024, slot_size=512)
+        self.assertEqual(cache1.nb_buckets, cache2.nb_buckets)
+        self.assertEqual(cache1.slot_size, cache2.slot_size)
+        cache1['a'] = 1
+        self.assertEqual(1, cache2.get('a'))
+        cache2['a'] = 2
+        self.assertEqual(2, cache1.get('a'))
+        del cache1['a']
+        self.assertNotIn('a', cache2)
+
+    def test_shared_between_processes(self):
+        cache = self._cache(size=64)
+        pid = os.fork()
+        if pid == 0:
+            child = SharedMetadataCache(self.path)
+            child['from_child'] = 'hello'
+            os._exit(0)
+        os.waitpid(pid, 0)
+        self.assertEqual('hello', cache.get('from_child'))
+
+    def test_clock_eviction(self):
+        cache = self._cache(size=4, ways=4)
+        for key in ('a', 'b', 'c', 'd'):
+            cache[key] = key
+        # All entries are referenced: the first round of the eviction
+        # hand clears their reference bits, the second one evicts 'a'.
+        cache['e'] = 'e'
+        self.assertEqual(4, len(cache))
+        self.assertNotIn('a', cache)
+        self.assertEqual(1, cache.stats()['evictions'])
+        self.assertEqual('e', cache.get('e'))
+        self.assertEqual('b', cache.get('b'))
+        cache['f'] = 'f'
+        # 'b' and 'e' have been referenced since the last round
+        self.assertIn('b', cache)
+        self.assertIn('e', cache)
+        self.assertNotIn('c', cache)
+
+    def test_ttl(self):
+        cache = self._cache(size=64, ttl=10.0)
+        with patch('oio.common.cache.time.time', return_value=100.0):
+            cache['a'] = 1
+            cache.set('b', 2, ttl=30.0)
+        with patch('oio.common.cache.time.time', return_value=120.0):
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(2, cache.get('b'))
+            self.assertEqual(1, len(cache))
+
+    def test_sequence_wrap(self):
+        cache = self._cache(size=64)
+        cache['a'] = 1
+        key_hash = cache._hash(b'a')
+        offset, _slot = cache._lookup(b'a', key_hash,
+                                      key_hash % cache.nb_buckets)
+        struct.pack_into('<I', cache._mmap, offset, 0xFFFFFFFE)
+        cache['a'] = 2
+        self.assertEqual(0, struct.unpack_from('<I', cache._mmap, offset)[0])
+        self.assertEqual(2, cache.get('a'))
+
+    def test_too_big(self):
+        cache = self._cache(size=64, slot_size=256)
+        cache['a'] = 'x' * 256
+        self.assertNotIn('a', cache)
+
+    def test_negative_caching(self):
+        cache = self._cache(size=64, negative_ttl=1.0)
+        set_cached_object_not_found(NotFound(404, 420, 'Not found'),
+                                    account='acct', reference='ct',
+                                    path='obj', cache=cache)
+        self.assertRaises(NotFound, get_cached_object_metadata,
+                          account='acct', reference='ct', path='obj',
+                          cache=cache)
+
+    def test_from_conf(self):
+        cache = metadata_cache_from_conf(
+            {'cache_size': '64', 'cache_path': self.path})
+        self.caches.append(cache)
+        self.assertIsInstance(cache, SharedMetadataCache)
+        self.assertEqual(8, cache.nb_buckets)
@@ -0,0 +1,235 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+from io import BytesIO
+import tarfile
+import unittest
+
+from mock import MagicMock as Mock
+
+from oio.common.exceptions import NoSuchObject
+from oio.common.json import json
+from oio.container.backup import ContainerBackup, ContainerTarFile, \
+    BLOCKSIZE
+from tests.unit.api import FakeStorageApi
+
+
+class FakeRedis(object):
+    """In-memory Redis, supporting only the commands used for manifests."""
+
+    def __init__(self):
+        self.lists = dict()
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, list()).append(value)
+
+    def lrange(self, key, start, end):
+        return list(self.lists.get(key, list()))
+
+    def expire(self, key, timeout):
+        pass
+
+
+class BackupApp(ContainerBackup):
+
+    def __init__(self):
+        self.conf = {}
+        self.logger = Mock()
+        self.proxy = FakeStorageApi('NS', endpoint='http://1.2.3.4:8000')
+        self.concurrency = 3
+        self.fake_redis = FakeRedis()
+
+    @property
+    def redis(self):
+        return self.fake_redis
+
+
+def _object(name, deleted=False):
+    return {'name': name, 'version': 1, 'deleted': deleted}
+
+
+def _located(name, size):
+    # As described by content/locate_many
+    meta = {'name': name, 'version': '1', 'deleted': 'False',
+            'ctime': '1600000000', 'mtime': '1600000000', 'id': 'A' * 32,
+            'size': str(size), 'length': str(size), 'policy': 'SINGLE',
+            'hash': '0' * 32, 'hash_method': 'md5',
+            'mime_type': 'application/octet-stream',
+            'chunk_method': 'plain/nb_copy=1', 'properties': {}}
+    chunks = [{'url': 'http://127.0.0.1:6010/' + name, 'pos': '0',
+               'size': size, 'hash': '0' * 32, 'score': 100}]
+    return meta, chunks
+
+
+class TestContainerBackup(unittest.TestCase):
+
+    def setUp(self):
+        self.app = BackupApp()
+        self.app.MANIFEST_CHUNK_SIZE = 2
+        self.proxy = self.app.proxy
+        self.proxy.container_get_properties = Mock(
+            return_value={'properties': {}})
+
+    def _locate_many(self, account, container, objs, **kwargs):
+        return [(name, _located(name, 1024)) for name, _ in objs]
+
+    def test_generate_manifest_pages(self):
+        self.proxy.object_list = Mock(side_effect=[
+            {'objects': [_object('a'), _object('b', deleted=True)],
+             'truncated': True, 'next_marker': 'b'},
+            {'objects': [_object('c'), _object('d'), _object('e')],
+             'truncated': False},
+        ])
+        self.proxy.object_locate_many = Mock(side_effect=self._locate_many)
+
+        manifest = self.app.generate_manifest('acct', 'ct')
+        # The first entry is the manifest itself
+        self.assertEqual(['a', 'c', 'd', 'e'],
+                         [entry['name'] for entry in manifest[1:]])
+        self.assertEqual(2, self.proxy.object_list.call_count)
+        self.assertIsNone(
+            self.proxy.object_list.call_args_list[0][1]['marker'])
+        self.assertEqual(
+            'b', self.proxy.object_list.call_args_list[1][1]['marker'])
+        self.assertEqual(2, self.proxy.object_locate_many.call_count)
+        # Entries are contiguous
+        start_block = 0
+        for entry in manifest:
+            self.assertEqual(start_block, entry['start_block'])
+            start_block = entry['end_block'] + 1
+        # The chunks are not altered
+        self.assertEqual({'0': {'hash': '0' * 32, 'size': 1024, 'offset': 0}},
+                         {str(k): v for k, v
+                          in manifest[1]['checksums'].items()})
+
+        # The manifest is cached, in several pieces
+        self.assertEqual(
+            3, len(self.app.fake_redis.lists['container_manifest:acct/ct']))
+        self.proxy.object_list.reset_mock()
+        # Chunk positions become strings
+        self.assertEqual(json.loads(json.dumps(manifest)),
+                         self.app.generate_manifest('acct', 'ct'))
+        self.proxy.object_list.assert_not_called()
+
+    def test_generate_manifest_size(self):
+        self.proxy.object_list = Mock(return_value={
+            'objects': [_object('a')], 'truncated': False})
+
+        def _locate_many(account, container, objs, **kwargs):
+            meta, chunks = _located('a', 1000)
+            # Not sent by old versions of content/locate_many
+            del meta['length']
+            return [('a', (meta, chunks))]
+        self.proxy.object_locate_many = Mock(side_effect=_locate_many)
+
+        manifest = self.app.generate_manifest('acct', 'ct')
+        self.assertEqual(1000, manifest[1]['size'])
+
+    def test_generate_manifest_object_error(self):
+        self.proxy.object_list = Mock(return_value={
+            'objects': [_object('a'), _object('b')], 'truncated': False})
+
+        def _locate_many(account, container, objs, **kwargs):
+            return [('a', _located('a', 1024)), ('b', NoSuchObject('b'))]
+        self.proxy.object_locate_many = Mock(side_effect=_locate_many)
+
+        self.assertRaises(NoSuchObject, self.app.generate_manifest,
+                          'acct', 'ct')
+        self.assertEqual({}, self.app.fake_redis.lists)
+
+
+class TestContainerTarFile(unittest.TestCase):
+
+    def setUp(self):
+        self.app = BackupApp()
+        self.proxy = self.app.proxy
+        self.data = {'a': b'a' * 1000, 'b': b'b' * (3 * BLOCKSIZE)}
+        self.closed = list()
+        self.proxy.container_get_properties = Mock(
+            return_value={'properties': {}})
+        self.proxy.object_list = Mock(return_value={
+            'objects': [_object(name) for name in sorted(self.data)],
+            'truncated': False})
+        self.proxy.object_locate_many = Mock(side_effect=self._locate_many)
+        self.proxy.object_get_properties = Mock(
+            side_effect=lambda acct, ct, name: self._located(name)[0])
+        self.proxy.object_locate = Mock(
+            side_effect=lambda acct, ct, name, **kw: self._located(name))
+        self.proxy.object_fetch = Mock(side_effect=self._fetch)
+        self.manifest = self.app.generate_manifest('acct', 'ct')
+        self.blocks = sum(entry['blocks'] for entry in self.manifest)
+
+    def _located(self, name):
+        return _located(name, len(self.data[name]))
+
+    def _locate_many(self, account, container, objs, **kwargs):
+        return [(name, self._located(name)) for name, _ in objs]
+
+    def _fetch(self, account, container, name, ranges=None, **kwargs):
+        start, end = ranges[0]
+        data = self.data[name][start:end + 1]
+
+        def _stream():
+            try:
+                for offset in range(0, len(data), 300):
+                    yield data[offset:offset + 300]
+            finally:
+                self.closed.append(name)
+        return {}, _stream()
+
+    def _tar(self, range_):
+        return ContainerTarFile(self.proxy, 'acct', 'ct', range_,
+                                self.manifest, self.app.logger)
+
+    def test_stream(self):
+        pieces = list(self._tar((0, self.blocks - 1)))
+        # Object data is forwarded as it is downloaded
+        self.assertIn(b'a' * 300, pieces)
+        self.assertIn(b'b' * 300, pieces)
+        body = b''.join(pieces)
+        self.assertEqual(self.blocks * BLOCKSIZE, len(body))
+        with tarfile.open(fileobj=BytesIO(body)) as tar:
+            for name, data in self.data.items():
+                self.assertEqual(data, tar.extractfile(name).read())
+
+    def test_stream_ranges(self):
+        body = b''.join(self._tar((0, self.blocks - 1)))
+        parts = list()
+        start = 0
+        for end in (0, 3, self.blocks // 2, self.blocks - 1):
+            tar = self._tar((start, end))
+            parts.append(b''.join(iter(lambda: tar.read(1000), b'')))
+            self.assertEqual((end - start + 1) * BLOCKSIZE, len(parts[-1]))
+            start = end + 1
+        self.assertEqual(body, b''.join(parts))
+
+    def test_close(self):
+        tar = self._tar((0, self.blocks - 1))
+        for piece in tar:
+            if piece == b'a' * 300:
+                break
+        self.assertEqual([], self.closed)
+        tar.close()
+        self.assertEqual(['a'], self.closed)
+        self.assertEqual(1, self.proxy.object_fetch.call_count)
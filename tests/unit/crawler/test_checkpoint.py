@@ -0,0 +1,144 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from oio.crawler.checkpoint import IntegrityCheckpoint
+from oio.crawler.integrity import Checker
+
+
+class TestIntegrityCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'checkpoint')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _checkpoint(self):
+        return IntegrityCheckpoint(path=self.path, interval=0.0)
+
+    def _start_container(self, checkpoint, account, container, objects):
+        self.assertTrue(checkpoint.container_started(account, container))
+        for obj in objects:
+            self.assertTrue(
+                checkpoint.object_started(account, container, obj))
+
+    def test_interrupted_pass(self):
+        checkpoint = self._checkpoint()
+        checkpoint.start_pass()
+        for account in ('acct1', 'acct2'):
+            self.assertFalse(checkpoint.skip_account(account))
+            checkpoint.account_started(account)
+        self._start_container(checkpoint, 'acct1', 'ct1', ('a', 'b'))
+        self._start_container(checkpoint, 'acct1', 'ct2', ('a', 'b', 'c'))
+        checkpoint.container_walked('acct1', 'ct1')
+        checkpoint.container_walked('acct1', 'ct2')
+        checkpoint.account_walked('acct1')
+        self._start_container(checkpoint, 'acct2', 'ct1', ('a', ))
+        checkpoint.container_walked('acct2', 'ct1')
+        checkpoint.account_walked('acct2')
+
+        # Objects are not checked in order
+        checkpoint.object_done('acct1', 'ct2', 'b')
+        checkpoint.object_done('acct1', 'ct2', 'a')
+        checkpoint.object_done('acct1', 'ct1', 'b')
+        checkpoint.object_done('acct2', 'ct1', 'a')
+        # acct2 is complete, but not acct1
+        self.assertIsNone(checkpoint.state()['account'])
+        checkpoint.object_done('acct1', 'ct1', 'a')
+        pass_start = checkpoint.pass_start
+        # Interrupted
+
+        checkpoint = self._checkpoint()
+        checkpoint.start_pass()
+        self.assertEqual(pass_start, checkpoint.pass_start)
+        for account in ('acct1', 'acct2'):
+            self.assertFalse(checkpoint.skip_account(account))
+            checkpoint.account_started(account)
+        self.assertTrue(checkpoint.skip_container('acct1', 'ct1'))
+        self.assertFalse(checkpoint.skip_container('acct1', 'ct2'))
+        self.assertTrue(checkpoint.container_started('acct1', 'ct2'))
+        self.assertTrue(checkpoint.skip_object('acct1', 'ct2', 'b'))
+        self.assertFalse(checkpoint.skip_object('acct1', 'ct2', 'c'))
+        self.assertTrue(checkpoint.object_started('acct1', 'ct2', 'c'))
+        checkpoint.container_walked('acct1', 'ct2')
+        checkpoint.account_walked('acct1')
+        checkpoint.object_done('acct1', 'ct2', 'c')
+        self.assertEqual('acct1', checkpoint.state()['account'])
+
+        # acct2 has not been saved as complete, check it again
+        self.assertFalse(checkpoint.skip_container('acct2', 'ct1'))
+        checkpoint.account_walked('acct2')
+        self.assertEqual('acct2', checkpoint.state()['account'])
+        checkpoint.end_pass()
+
+        checkpoint = self._checkpoint()
+        checkpoint.start_pass()
+        self.assertEqual(pass_start, checkpoint.last_pass_start)
+        self.assertNotEqual(pass_start, checkpoint.pass_start)
+        self.assertFalse(checkpoint.skip_account('acct1'))
+
+    def test_versions(self):
+        checkpoint = self._checkpoint()
+        checkpoint.start_pass()
+        checkpoint.account_started('acct')
+        checkpoint.container_started('acct', 'ct')
+        checkpoint.object_started('acct', 'ct', 'obj', count=2)
+        checkpoint.container_walked('acct', 'ct')
+        checkpoint.account_walked('acct')
+        checkpoint.object_done('acct', 'ct', 'obj')
+        self.assertIsNone(checkpoint.state()['account'])
+        checkpoint.object_done('acct', 'ct', 'obj')
+        self.assertEqual('acct', checkpoint.state()['account'])
+
+    def test_untracked(self):
+        checkpoint = self._checkpoint()
+        self.assertFalse(checkpoint.container_started('acct', 'ct'))
+        self.assertFalse(checkpoint.object_started('acct', 'ct', 'obj'))
+        self.assertFalse(checkpoint.skip_container('acct', 'ct'))
+        self.assertFalse(checkpoint.skip_object('acct', 'ct', 'obj'))
+        checkpoint.object_done('acct', 'ct', 'obj')
+
+    def test_invalid_file(self):
+        with open(self.path, 'w') as fd:
+            fd.write('{')
+        checkpoint = self._checkpoint()
+        checkpoint.start_pass()
+        self.assertIsNotNone(checkpoint.pass_start)
+        self.assertIsNone(checkpoint.state()['account'])
+
+
+class TestCheckerShards(unittest.TestCase):
+
+    def test_shards(self):
+        containers = ['ct%d' % i for i in range(100)]
+        checkers = list()
+        for shard in range(3):
+            checker = Checker.__new__(Checker)
+            checker.shard = shard
+            checker.nb_shards = 3
+            checkers.append(checker)
+        owners = [[c for c in checkers if c._in_shard('acct', ct)]
+                  for ct in containers]
+        self.assertEqual([1] * 100, [len(o) for o in owners])
+        for checker in checkers:
+            self.assertGreater(
+                sum(1 for o in owners if o[0] is checker), 10)
@@ -0,0 +1,80 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+import unittest
+
+from oio.crawler.integrity import ContainerListing, ListingCache
+
+
+class ContainerListingTest(unittest.TestCase):
+
+    ID1 = '0123456789ABCDEF0123456789ABCDEF'
+    ID2 = 'FEDCBA9876543210FEDCBA9876543210'
+
+    def test_versions(self):
+        listing = ContainerListing([
+            ('obj2', 1, self.ID1),
+            ('obj1', 1, self.ID1),
+            ('obj1', 3, self.ID2)])
+        self.assertEqual(2, len(listing))
+        self.assertEqual(3, listing.nb_versions)
+        self.assertEqual(['obj1', 'obj2'], list(listing))
+        self.assertIn('obj1', listing)
+        self.assertNotIn('obj0', listing)
+        self.assertNotIn('obj3', listing)
+        self.assertRaises(KeyError, listing.__getitem__, 'obj3')
+        self.assertIsNone(listing.get('obj3'))
+
+        versions = listing['obj1']
+        self.assertEqual([3, 1], [v['version'] for v in versions])
+        self.assertEqual([self.ID2, self.ID1], [v['id'] for v in versions])
+        self.assertEqual('obj1', versions[0]['name'])
+        self.assertRaises(KeyError, versions[0].__getitem__, 'hash')
+        self.assertEqual([['obj1', 'obj1'], ['obj2']],
+                         [[v.name for v in vers]
+                          for vers in listing.values()])
+
+    def test_unpacked_ids(self):
+        listing = ContainerListing([('obj', 1, 'not-an-hexa-id')])
+        self.assertEqual('not-an-hexa-id', listing['obj'][0].id)
+
+    def test_compact(self):
+        objects = [('obj%06d' % i, 1600000000000000 + i, self.ID1)
+                   for i in range(10000)]
+        listing = ContainerListing(objects)
+        # Names (~57 bytes each) are the main part of the listing
+        self.assertLess(listing.nbytes, 10000 * 100)
+
+
+class ListingCacheTest(unittest.TestCase):
+
+    def test_max_bytes(self):
+        listing = ContainerListing(
+            [('obj%06d' % i, 1, ContainerListingTest.ID1)
+             for i in range(1000)])
+        cache = ListingCache(size=0, max_bytes=listing.nbytes * 2, ttl=0)
+        cache[('acct', 'ct1')] = listing, {}
+        cache[('acct', 'ct2')] = listing, {}
+        self.assertNotIn(('acct', 'ct1'), cache)
+        self.assertIn(('acct', 'ct2'), cache)
+        self.assertLessEqual(cache.bytes, cache.max_bytes)
+
+    def test_keep_last_entry(self):
+        cache = ListingCache(size=0, max_bytes=10, ttl=0)
+        cache['chunk'] = ['error'], {'id': 'A' * 32}
+        self.assertIn('chunk', cache)
+        cache['other'] = [], None
+        self.assertNotIn('chunk', cache)
+        self.assertIn('other', cache)
@@ -0,0 +1,113 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+
+import unittest
+
+from mock import MagicMock as Mock
+
+from oio.common.green import GreenPile, Timeout
+from oio.event.evob import EventTypes
+from oio.event.filters.account_update import AccountUpdateFilter
+
+
+class FakeApp(object):
+
+    def __init__(self, account):
+        self.app_env = {'account_client': account}
+
+    def __call__(self, env, beanstalkd, cb):
+        cb(200, 'OK')
+
+
+def _state_event(container, when, objects):
+    return {'event': EventTypes.CONTAINER_STATE,
+            'job_id': '%s-%d' % (container, when),
+            'when': when,
+            'url': {'account': 'acct', 'user': container},
+            'data': {'object-count': objects, 'bytes-count': objects * 10}}
+
+
+class TestAccountUpdateFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.account = Mock()
+        self.statuses = dict()
+
+    def _process(self, filter_, env):
+        def cb(status, _msg):
+            self.statuses[env['job_id']] = status
+        filter_.process(env, None, cb)
+
+    def _filter(self, **conf):
+        return AccountUpdateFilter(FakeApp(self.account), conf)
+
+    def test_no_coalescing(self):
+        filter_ = self._filter()
+        self._process(filter_, _state_event('ct', 1000000, 1))
+        self.assertEqual(1, self.account.container_update.call_count)
+        self.account.container_update_many.assert_not_called()
+
+    def test_coalescing(self):
+        self.account.container_update_many.side_effect = \
+            lambda updates, **kwargs: [{'status': 200} for _ in updates]
+        filter_ = self._filter(coalesce_window='0.05')
+        pile = GreenPile(4)
+        for env in (_state_event('ct1', 1000000, 1),
+                    _state_event('ct1', 3000000, 3),
+                    _state_event('ct1', 2000000, 2),
+                    _state_event('ct2', 1000000, 5)):
+            pile.spawn(self._process, filter_, env)
+        list(pile)
+        self.account.container_update.assert_not_called()
+        self.assertEqual(1, self.account.container_update_many.call_count)
+        updates = self.account.container_update_many.call_args[0][0]
+        self.assertEqual(2, len(updates))
+        self.assertEqual('ct1', updates[0]['name'])
+        self.assertEqual(3, updates[0]['objects'])
+        self.assertEqual(3.0, updates[0]['mtime'])
+        self.assertEqual('ct2', updates[1]['name'])
+        # Superseded events are acknowledged too
+        self.assertEqual([200] * 4, list(self.statuses.values()))
+
+    def test_coalescing_max_updates(self):
+        self.account.container_update_many.side_effect = \
+            lambda updates, **kwargs: [{'status': 200} for _ in updates]
+        filter_ = self._filter(coalesce_window='0.05',
+                               coalesce_max_updates='2')
+        pile = GreenPile(3)
+        for env in (_state_event('ct1', 1000000, 1),
+                    _state_event('ct2', 1000000, 1),
+                    _state_event('ct3', 1000000, 1)):
+            pile.spawn(self._process, filter_, env)
+        with Timeout(5):
+            list(pile)
+        sizes = [len(call[0][0]) for call
+                 in self.account.container_update_many.call_args_list]
+        self.assertEqual([2, 1], sizes)
+
+    def test_coalescing_error(self):
+        self.account.container_update_many.return_value = [
+            {'status': 409,
+             'message': 'No update needed, event older than last ...'},
+            {'status': 503, 'message': 'Service busy'}]
+        filter_ = self._filter(coalesce_window='0.01')
+        pile = GreenPile(2)
+        for env in (_state_event('ct1', 1000000, 1),
+                    _state_event('ct2', 1000000, 1)):
+            pile.spawn(self._process, filter_, env)
+        list(pile)
+        self.assertEqual(200, self.statuses['ct1-1000000'])
+        self.assertEqual(500, self.statuses['ct2-1000000'])
@@ -0,0 +1,95 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+
+import unittest
+
+from oio.common.green import eventlet
+from oio.event.beanstalk import Beanstalk, ResponseError
+
+
+class FakeBeanstalkd(object):
+    """Answer commands with the given responses, in order."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.commands = list()
+        self.sock = eventlet.listen(('127.0.0.1', 0))
+        self.addr = '%s:%d' % self.sock.getsockname()
+        self.thread = eventlet.spawn(self._serve)
+
+    def _serve(self):
+        conn, _ = self.sock.accept()
+        fd = conn.makefile('rwb')
+        while self.responses:
+            line = fd.readline()
+            if not line:
+                break
+            self.commands.append(line.strip().decode('utf-8'))
+            fd.write(self.responses.pop(0))
+            fd.flush()
+        conn.close()
+
+    def close(self):
+        self.thread.kill()
+        self.sock.close()
+
+
+class TestBeanstalk(unittest.TestCase):
+
+    def _client(self, responses):
+        server = FakeBeanstalkd(responses)
+        self.addCleanup(server.close)
+        client = Beanstalk.from_url('beanstalk://' + server.addr)
+        self.addCleanup(client.close)
+        return server, client
+
+    def test_reserve_many(self):
+        server, client = self._client([
+            b'RESERVED 1 3\r\nabc\r\n',
+            b'RESERVED 2 3\r\ndef\r\n',
+            b'TIMED_OUT\r\n',
+            b'RESERVED 4 3\r\nghi\r\n',
+        ])
+        jobs = client.reserve_many(4)
+        self.assertEqual([('1', b'abc'), ('2', b'def'), ('4', b'ghi')],
+                         jobs)
+        self.assertEqual(['reserve'] + ['reserve-with-timeout 0'] * 3,
+                         server.commands)
+
+    def test_reserve_many_single(self):
+        server, client = self._client([b'RESERVED 1 3\r\nabc\r\n'])
+        self.assertEqual([('1', b'abc')], client.reserve_many(1))
+        self.assertEqual(['reserve'], server.commands)
+
+    def test_pipeline(self):
+        server, client = self._client([
+            b'DELETED\r\n',
+            b'NOT_FOUND\r\n',
+            b'BURIED\r\n',
+        ])
+        pipeline = client.pipeline()
+        pipeline.delete('1')
+        pipeline.release('2', delay=15)
+        pipeline.bury('3')
+        self.assertEqual(3, len(pipeline))
+        self.assertEqual([], server.commands)
+        results = pipeline.execute()
+        self.assertEqual(0, len(pipeline))
+        self.assertEqual(['delete 1', 'release 2 2147483648 15',
+                          'bury 3 2147483648'], server.commands)
+        self.assertEqual(('delete', '1'), results[0][0])
+        self.assertIsInstance(results[1][1], ResponseError)
+        self.assertNotIsInstance(results[2][1], ResponseError)
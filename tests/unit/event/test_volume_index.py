@@ -0,0 +1,80 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+
+import unittest
+
+from mock import MagicMock as Mock
+
+from oio.common.green import GreenPile
+from oio.event.evob import EventTypes
+from oio.event.filters.volume_index import VolumeIndexFilter
+
+
+class FakeApp(object):
+
+    def __init__(self, rdir):
+        self.app_env = {'rdir_client': rdir}
+
+    def __call__(self, env, beanstalkd, cb):
+        cb(200, 'OK')
+
+
+def _chunk_event(event_type, volume_id, chunk_id):
+    return {'event': event_type,
+            'job_id': chunk_id,
+            'when': 1000000,
+            'url': {},
+            'data': {'volume_id': volume_id, 'container_id': 'ct',
+                     'content_id': 'content', 'chunk_id': chunk_id,
+                     'content_path': 'obj', 'content_version': 1}}
+
+
+class TestVolumeIndexFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.rdir = Mock()
+        self.rdir.chunk_push_many.return_value = {}
+        self.rdir.chunk_delete_many.return_value = {}
+        self.statuses = dict()
+
+    def _process(self, filter_, env):
+        def cb(status, _msg):
+            self.statuses[env['job_id']] = status
+        filter_.process(env, None, cb)
+
+    def test_batches(self):
+        filter_ = VolumeIndexFilter(
+            FakeApp(self.rdir),
+            {'rdir_batch_size': '3', 'rdir_batch_delay': '0.05'})
+        events = [_chunk_event(EventTypes.CHUNK_NEW, 'vol1', 'c%d' % i)
+                  for i in range(4)]
+        events.append(_chunk_event(EventTypes.CHUNK_NEW, 'vol2', 'c4'))
+        events.append(_chunk_event(EventTypes.CHUNK_DELETED, 'vol1', 'c5'))
+        pile = GreenPile(len(events))
+        for env in events:
+            pile.spawn(self._process, filter_, env)
+        list(pile)
+        self.assertEqual([200] * len(events), list(self.statuses.values()))
+        self.rdir.chunk_push.assert_not_called()
+        # vol1: one batch full, one after the delay, vol2: after the delay
+        pushes = sorted(len(call[0][0]) for call
+                        in self.rdir.chunk_push_many.call_args_list)
+        self.assertEqual([1, 1, 3], pushes)
+        self.assertEqual(1, self.rdir.chunk_delete_many.call_count)
+        deleted = self.rdir.chunk_delete_many.call_args[0][0]
+        self.assertEqual([{'volume_id': 'vol1', 'container_id': 'ct',
+                           'content_id': 'content', 'chunk_id': 'c5'}],
+                         deleted)
@@ -0,0 +1,181 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+import hashlib
+import unittest
+
+from mock import MagicMock as Mock, patch
+
+from oio.common.exceptions import NotFound, OrphanChunk
+from oio.xcute.jobs.blob_mover import RawxDecommissionJob, \
+    RawxDecommissionTask
+
+
+class RawxDecommissionTest(unittest.TestCase):
+
+    def setUp(self):
+        job_params, _ = RawxDecommissionJob.sanitize_params(
+            {'service_id': 'rawx-1', 'min_chunk_size': '10'})
+        with patch('oio.xcute.jobs.blob_mover.BlobClient'), \
+                patch('oio.xcute.jobs.blob_mover.ContentFactory'), \
+                patch('oio.xcute.jobs.blob_mover.ConscienceClient'):
+            self.task = RawxDecommissionTask(
+                {'namespace': 'OPENIO'}, job_params)
+
+    def test_group_chunk_info(self):
+        chunk_info = [
+            ('CID1', 'chunk1', {'content_id': 'A'}),
+            ('CID1', 'chunk2', {'content_id': 'A'}),
+            ('CID1', 'chunk3', {'content_id': 'B'}),
+            ('CID2', 'chunk4', {'content_id': 'B'}),
+            ('CID2', 'chunk5', {'content_id': 'B'}),
+        ]
+        self.assertEqual(
+            [('CID1', 'A', ['chunk1', 'chunk2'], 'chunk2'),
+             ('CID1', 'B', ['chunk3'], 'chunk3'),
+             ('CID2', 'B', ['chunk4', 'chunk5'], 'chunk5')],
+            list(RawxDecommissionJob.group_chunk_info(chunk_info)))
+        self.assertEqual(
+            [], list(RawxDecommissionJob.group_chunk_info(iter([]))))
+
+    def _interleaved_chunk_info(self):
+        # Chunk IDs are hashes: the chunks of a content are listed
+        # among the chunks of the others contents of the container.
+        contents = ['%032X' % i for i in range(4)]
+        chunk_info = list()
+        for i in range(12):
+            chunk_id = hashlib.sha256(str(i).encode('utf-8')).hexdigest()
+            chunk_info.append(
+                ('CID', chunk_id.upper(), {'content_id': contents[i % 4]}))
+        chunk_info.sort(key=lambda info: info[1])
+        return chunk_info
+
+    def test_group_chunk_info_interleaved(self):
+        chunk_info = self._interleaved_chunk_info()
+        for window in (1000, 5):
+            groups = list(RawxDecommissionJob.group_chunk_info(
+                chunk_info, window=window))
+            if window == 1000:
+                # One group per content
+                self.assertEqual(4, len(groups))
+            # All the chunks are in a group
+            self.assertEqual(
+                sorted(chunk_id for _, chunk_id, _ in chunk_info),
+                sorted(chunk_id for group in groups
+                       for chunk_id in group[2]))
+            for _, content_id, chunk_ids, _ in groups:
+                for chunk_id in chunk_ids:
+                    self.assertIn(('CID', chunk_id,
+                                   {'content_id': content_id}), chunk_info)
+            # Resuming after the last chunk of any group misses no chunk
+            sent = set()
+            task_ids = set()
+            for _, content_id, chunk_ids, last_chunk_id in groups:
+                sent.update(chunk_ids)
+                for _, chunk_id, _ in chunk_info:
+                    if chunk_id <= last_chunk_id:
+                        self.assertIn(chunk_id, sent)
+                task_ids.add((content_id, last_chunk_id))
+            # Task IDs are unique
+            self.assertEqual(len(groups), len(task_ids))
+
+    def test_get_tasks(self):
+        job = RawxDecommissionJob.__new__(RawxDecommissionJob)
+        job.get_chunk_info = Mock(return_value=iter([
+            ('CID1', 'chunk1', {'content_id': 'A'}),
+            ('CID1', 'chunk2', {'content_id': 'B'}),
+            ('CID1', 'chunk3', {'content_id': 'A'}),
+        ]))
+        job_params, _ = RawxDecommissionJob.sanitize_params(
+            {'service_id': 'rawx-1'})
+        tasks = list(job.get_tasks(job_params))
+        self.assertEqual(
+            [('CID1|A|chunk1', {'container_id': 'CID1', 'content_id': 'A',
+                                'chunk_ids': ['chunk1', 'chunk3']}),
+             ('CID1|B|chunk3', {'container_id': 'CID1', 'content_id': 'B',
+                                'chunk_ids': ['chunk2']})],
+            tasks)
+
+    def test_get_chunk_info_marker(self):
+        job = RawxDecommissionJob.__new__(RawxDecommissionJob)
+        job.rdir_client = Mock()
+        job_params, _ = RawxDecommissionJob.sanitize_params(
+            {'service_id': 'rawx-1'})
+        job.get_chunk_info(job_params, marker='CID1|A|chunk1')
+        self.assertEqual(
+            'CID1|chunk1',
+            job.rdir_client.chunk_fetch.call_args[1]['start_after'])
+
+    def _chunk_head(self, chunk_url, **kwargs):
+        chunk_id = chunk_url.rsplit('/', 1)[-1]
+        if chunk_id == 'gone':
+            raise NotFound()
+        size = 1 if chunk_id == 'small' else 100
+        return {'container_id': 'CID', 'content_id': 'A',
+                'chunk_size': str(size)}
+
+    def test_process_group(self):
+        self.task.blob_client.chunk_head.side_effect = self._chunk_head
+        content = self.task.content_factory.get.return_value
+        content.move_chunks.return_value = [
+            ('chunk1', {'url': 'http://rawx-2/chunk1'}),
+            ('chunk2', {'url': 'http://rawx-3/chunk2'}),
+            ('orphan', OrphanChunk()),
+        ]
+        res = self.task.process(
+            'CID|A|orphan',
+            {'container_id': 'CID', 'content_id': 'A',
+             'chunk_ids': ['chunk1', 'gone', 'small', 'chunk2', 'orphan']},
+            reqid='reqid')
+        self.assertEqual({'moved_chunks': 2, 'moved_bytes': 200,
+                          'orphan_chunks': 1,
+                          'skipped_chunks_no_longer_exist': 1,
+                          'skipped_chunks_too_small': 1},
+                         dict(res))
+        # A single locate and a single call to move the chunks
+        self.task.content_factory.get.assert_called_once_with(
+            'CID', 'A', reqid='reqid')
+        content.move_chunks.assert_called_once()
+        self.assertEqual(['chunk1', 'chunk2', 'orphan'],
+                         content.move_chunks.call_args[0][0])
+
+    def test_process_group_error(self):
+        self.task.blob_client.chunk_head.side_effect = self._chunk_head
+        content = self.task.content_factory.get.return_value
+        content.move_chunks.return_value = [
+            ('chunk1', {'url': 'http://rawx-2/chunk1'}),
+            ('chunk2', ValueError('boom')),
+        ]
+        try:
+            self.task.process(
+                'CID|A|chunk2',
+                {'container_id': 'CID', 'content_id': 'A',
+                 'chunk_ids': ['chunk1', 'chunk2']})
+        except ValueError as exc:
+            # The chunk moved is counted
+            self.assertEqual({'moved_chunks': 1, 'moved_bytes': 100},
+                             dict(exc.task_result))
+        else:
+            self.fail('ValueError not raised')
+
+    def test_process_old_payload(self):
+        self.task.blob_client.chunk_head.side_effect = self._chunk_head
+        content = self.task.content_factory.get.return_value
+        content.move_chunks.return_value = [
+            ('chunk1', {'url': 'http://rawx-2/chunk1'})]
+        res = self.task.process(
+            'CID|A|chunk1',
+            {'container_id': 'CID', 'content_id': 'A', 'chunk_id': 'chunk1'})
+        self.assertEqual({'moved_chunks': 1, 'moved_bytes': 100}, dict(res))
@@ -0,0 +1,114 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+import unittest
+
+from oio.common.logger import get_logger
+from oio.xcute.orchestrator import XcuteOrchestrator
+
+
+class FakeBeanstalkd(object):
+
+    def __init__(self, addr, stats):
+        self.addr = addr
+        self.is_broken = False
+        self.jobs_outstanding = 0
+        self.jobs_sent = 0
+        self.jobs_deleted = None
+        self.drain_rate = 0.0
+        self.last_sample = None
+        self.stats = stats
+        self.stats_client = self
+
+    def stats_tube(self, tube):
+        return self.stats
+
+
+class XcuteOrchestratorLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.orchestrator = XcuteOrchestrator.__new__(XcuteOrchestrator)
+        self.orchestrator.logger = get_logger(None)
+        self.orchestrator.dispatch_strategy = 'least_loaded'
+        self.orchestrator.beanstalkd_workers_tube = 'oio-xcute'
+        self.orchestrator.max_outstanding_jobs_per_beanstalkd = 10
+        self.orchestrator.beanstalkd_workers = dict()
+
+    def _worker(self, addr, ready=0, reserved=0, deleted=0):
+        worker = FakeBeanstalkd(
+            addr, {'current-jobs-ready': ready,
+                   'current-jobs-reserved': reserved,
+                   'cmd-delete': deleted})
+        self.orchestrator.beanstalkd_workers[addr] = worker
+        return worker
+
+    def test_update_load(self):
+        worker = self._worker('w1', ready=4, reserved=2, deleted=100)
+        update = self.orchestrator._update_beanstalkd_worker_load
+        update(worker, worker.stats, now=10.0)
+        self.assertEqual(6, worker.jobs_outstanding)
+        self.assertEqual(0.0, worker.drain_rate)
+        worker.jobs_sent = 3
+        worker.stats['cmd-delete'] = 150
+        update(worker, worker.stats, now=20.0)
+        self.assertEqual(0, worker.jobs_sent)
+        self.assertAlmostEqual(
+            XcuteOrchestrator.DRAIN_RATE_WEIGHT * 5.0, worker.drain_rate)
+        # Counters reset by a restart of beanstalkd
+        worker.stats['cmd-delete'] = 10
+        drain_rate = worker.drain_rate
+        update(worker, worker.stats, now=30.0)
+        self.assertEqual(drain_rate, worker.drain_rate)
+
+    def test_least_loaded(self):
+        fast = self._worker('fast', ready=8)
+        fast.jobs_outstanding, fast.drain_rate = 8, 8.0
+        slow = self._worker('slow', ready=2)
+        slow.jobs_outstanding, slow.drain_rate = 2, 0.5
+        idle = self._worker('idle')
+        broken = self._worker('broken')
+        broken.is_broken = True
+
+        workers = self.orchestrator.get_beanstalkd_workers()
+        self.assertIs(idle, next(workers))
+        idle.jobs_sent += 1
+        idle.drain_rate = 0.5
+        # idle: 2s, fast: 1s, slow: 4s
+        self.assertIs(fast, next(workers))
+        fast.jobs_sent += 1
+        # fast: 1.125s, idle: 2s
+        self.assertIs(fast, next(workers))
+        fast.jobs_sent += 1
+        # fast has reached the maximum of outstanding jobs
+        self.assertIs(idle, next(workers))
+
+    def test_max_outstanding(self):
+        full = self._worker('full')
+        full.jobs_outstanding, full.drain_rate = 9, 100.0
+        other = self._worker('other')
+        other.jobs_outstanding, other.drain_rate = 5, 1.0
+        self.assertIs(full,
+                      self.orchestrator._least_loaded_beanstalkd_worker())
+        full.jobs_sent = 1
+        self.assertIs(other,
+                      self.orchestrator._least_loaded_beanstalkd_worker())
+        other.is_broken = True
+        self.assertIsNone(
+            self.orchestrator._least_loaded_beanstalkd_worker())
+
+    def test_sample_load(self):
+        worker = self._worker('w1', ready=3, reserved=1)
+        self.orchestrator._sample_beanstalkd_workers_load()
+        self.assertEqual(4, worker.jobs_outstanding)
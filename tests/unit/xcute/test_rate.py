@@ -0,0 +1,107 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+import unittest
+
+from oio.xcute.common.rate import XcuteRateController, \
+    rate_controller_from_conf
+
+
+class XcuteRateControllerTest(unittest.TestCase):
+
+    def _batch(self, ctrl, first, size, sent, replied, errors=0):
+        task_ids = ['task%06d' % i for i in range(first, first + size)]
+        ctrl.batch_sent(task_ids, now=sent)
+        task_errors = {'ValueError': errors} if errors else {}
+        # The workers do not keep the order of the task IDs
+        ctrl.batch_processed(list(reversed(task_ids)), task_errors,
+                             now=replied)
+
+    def test_slow_start_then_additive_increase(self):
+        ctrl = XcuteRateController(100, interval=10.0)
+        self.assertEqual(10, ctrl.tasks_per_second)
+        self.assertEqual(10, ctrl.tasks_batch_size(32))
+        now = 1000.0
+        for expected in (20, 40, 80, 100):
+            self._batch(ctrl, 0, 10, now, now + 1.0)
+            now += 10.0
+            self.assertEqual(expected, ctrl.adjust(0, now=now))
+        self.assertEqual(32, ctrl.tasks_batch_size(32))
+        self.assertFalse(ctrl.overloaded)
+
+        # No reply, no increase
+        ctrl.rate = 50
+        ctrl.slow_start = False
+        self.assertEqual(50, ctrl.adjust(0, now=now + 10))
+        self._batch(ctrl, 0, 10, now, now + 1.0)
+        self.assertEqual(55, ctrl.adjust(0, now=now + 20))
+
+    def test_decrease_on_latency(self):
+        ctrl = XcuteRateController(100, interval=10.0)
+        ctrl.rate = 80
+        self._batch(ctrl, 0, 10, 0.0, 10.0)
+        self.assertEqual(100, ctrl.adjust(0, now=10.0))
+        # A slower batch is smoothed...
+        self._batch(ctrl, 10, 10, 20.0, 50.0)
+        self.assertFalse(ctrl._congestion())
+        # ... until the workers are constantly 3 times slower
+        for i in range(2, 5):
+            self._batch(ctrl, i * 10, 10, 20.0, 50.0)
+        self.assertEqual(50, ctrl.adjust(0, now=50.0))
+        self.assertFalse(ctrl.slow_start)
+        # Batches sent before the decrease do not decrease it again
+        self._batch(ctrl, 50, 10, 45.0, 80.0)
+        self.assertEqual(55, ctrl.adjust(0, now=80.0))
+
+    def test_decrease_on_errors(self):
+        ctrl = XcuteRateController(100, interval=10.0, max_error_rate=0.1)
+        ctrl.rate = 80
+        self._batch(ctrl, 0, 10, 0.0, 1.0, errors=2)
+        self.assertEqual(40, ctrl.adjust(0, now=10.0))
+        self._batch(ctrl, 10, 10, 10.0, 11.0, errors=1)
+        self.assertEqual(45, ctrl.adjust(0, now=20.0))
+
+    def test_overloaded(self):
+        ctrl = XcuteRateController(100, max_pending_time=60.0)
+        ctrl.adjust(1000, now=10.0)
+        self.assertTrue(ctrl.overloaded)
+        self.assertEqual(10, ctrl.tasks_per_second)
+        ctrl.adjust(100, now=20.0)
+        self.assertFalse(ctrl.overloaded)
+
+    def test_max_rate_updated(self):
+        ctrl = XcuteRateController(100)
+        ctrl.rate = 100
+        self.assertEqual(20, ctrl.adjust(0, max_tasks_per_second=20))
+
+    def test_forget_lost_batches(self):
+        ctrl = XcuteRateController(100, max_pending_time=60.0)
+        ctrl.batch_sent(['task1'], now=0.0)
+        ctrl.adjust(0, now=100.0)
+        self.assertEqual(1, len(ctrl._sent))
+        ctrl.adjust(0, now=200.0)
+        self.assertEqual(0, len(ctrl._sent))
+        # Reply to an unknown batch
+        ctrl.batch_processed(['task1'], now=300.0)
+        self.assertEqual(0, ctrl._processed)
+
+    def test_from_conf(self):
+        self.assertIsNone(rate_controller_from_conf({}, 100))
+        self.assertIsNone(
+            rate_controller_from_conf({'adaptive_rate': 'true'}, 0))
+        ctrl = rate_controller_from_conf(
+            {'adaptive_rate': 'true', 'adaptive_rate_interval': '5'}, 100)
+        self.assertEqual(5.0, ctrl.interval)
+        self.assertEqual(100, ctrl.max_tasks_per_second)
@@ -0,0 +1,98 @@
+# Copyright (C) 2021 OVH SAS
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 3.0 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.
+
+import unittest
+
+from mock import patch
+
+from oio.common.green import eventlet
+from oio.xcute.common.worker import XcuteWorker
+from oio.xcute.jobs import tester
+
+
+class XcuteWorkerTest(unittest.TestCase):
+
+    def _job(self, nb_tasks, **config):
+        job_config, _ = tester.TesterJob.sanitize_config(config)
+        tasks = dict(('task%d' % i, {'msg': 'x' * i})
+                     for i in range(nb_tasks))
+        return {'job_id': 'job', 'job_type': tester.TesterJob.JOB_TYPE,
+                'job_config': job_config, 'tasks': tasks,
+                'beanstalkd_reply': {}}
+
+    def _process(self, beanstalkd_job):
+        running = [0, 0]
+
+        def _task_process(task, task_id, task_payload, reqid=None):
+            running[0] += 1
+            running[1] = max(running)
+            try:
+                eventlet.sleep(0)
+                if task_id == 'task0':
+                    raise ValueError('boom')
+                return {'counter': len(task_payload['msg'])}
+            finally:
+                running[0] -= 1
+
+        worker = XcuteWorker({'namespace': 'OPENIO'})
+        with patch.object(tester.TesterTask, 'process', _task_process):
+            res = worker.process(beanstalkd_job)
+        return res, running[1]
+
+    def test_sanitize_concurrency(self):
+        job_config, _ = tester.TesterJob.sanitize_config({})
+        self.assertEqual(1, job_config['tasks_concurrency'])
+        job_config, _ = tester.TesterJob.sanitize_config(
+            {'tasks_batch_size': 4, 'tasks_concurrency': 16})
+        self.assertEqual(4, job_config['tasks_concurrency'])
+        self.assertRaises(ValueError, tester.TesterJob.sanitize_config,
+                          {'tasks_concurrency': 0})
+
+    def test_process_sequential(self):
+        (_, task_ids, results, errors, _), max_running = self._process(
+            self._job(8, tasks_per_second=0))
+        self.assertEqual(1, max_running)
+        self.assertEqual(8, len(task_ids))
+        self.assertEqual({'counter': sum(range(1, 8))}, dict(results))
+        self.assertEqual({'ValueError': 1}, dict(errors))
+
+    def test_process_concurrent(self):
+        (_, task_ids, results, errors, _), max_running = self._process(
+            self._job(8, tasks_per_second=0, tasks_concurrency=4))
+        self.assertEqual(4, max_running)
+        self.assertEqual(8, len(task_ids))
+        self.assertEqual({'counter': sum(range(1, 8))}, dict(results))
+        self.assertEqual({'ValueError': 1}, dict(errors))
+
+    def test_process_partial_results(self):
+        def _task_process(task, task_id, task_payload, reqid=None):
+            exc = ValueError('boom')
+            exc.task_result = {'counter': 1}
+            raise exc
+
+        worker = XcuteWorker({'namespace': 'OPENIO'})
+        with patch.object(tester.TesterTask, 'process', _task_process):
+            _, _, results, errors, _ = worker.process(
+                self._job(2, tasks_per_second=0))
+        self.assertEqual({'counter': 2}, dict(results))
+        self.assertEqual({'ValueError': 2}, dict(errors))
+
+    def test_process_old_job_config(self):
+        beanstalkd_job = self._job(2, tasks_per_second=0)
+        del beanstalkd_job['job_config']['tasks_concurrency']
+        (_, _, results, errors, _), max_running = self._process(
+            beanstalkd_job)
+        self.assertEqual(1, max_running)
+        self.assertEqual({'counter': 1}, dict(results))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2021 OVH SAS
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Measure the throughput of EC downloads (ECChunkDownloadHandler), with
+and without segment readahead and decoding in native threads.
+
+Chunks are served from memory by a fake rawx service running in the
+same process.
+
+usage: %s [chunk_method] [size_mib ...]
+
+chunk_method: defaults to 'ec/algo=liberasurecode_rs_vand,k=6,m=3'.
+size_mib: the sizes of the objects to read, in MiB
+          (defaults to 1 16 256 1024).
+"""
+
+from __future__ import print_function
+
+import sys
+import time
+
+from eventlet import listen, spawn, wsgi
+
+from oio.api.ec import ECChunkDownloadHandler
+from oio.common.http import ranges_from_http_header
+from oio.common.storage_method import STORAGE_METHODS
+
+CONFIGURATIONS = (
+    ('sequential', {}),
+    ('readahead', {'ec_readahead_segments': 8}),
+    ('readahead+thread', {'ec_readahead_segments': 8,
+                          'ec_decode_in_thread': True}),
+)
+
+CHUNKS = dict()
+
+
+class NullLogger(object):
+    def write(self, *args, **kwargs):
+        pass
+
+
+def fake_rawx(env, start_response):
+    data = CHUNKS.get(env['PATH_INFO'])
+    if data is None:
+        start_response('404 Not Found', [('Content-Length', '0')])
+        return [b'']
+    status = '200 OK'
+    headers = []
+    if env.get('HTTP_RANGE'):
+        start, end = ranges_from_http_header(env['HTTP_RANGE'])[0]
+        end = len(data) - 1 if end is None else min(end, len(data) - 1)
+        headers.append(('Content-Range',
+                        'bytes %d-%d/%d' % (start, end, len(data))))
+        data = memoryview(data)[start:end + 1]
+        status = '206 Partial Content'
+    headers.append(('Content-Length', str(len(data))))
+    start_response(status, headers)
+    return [data[i:i + 65536] for i in range(0, len(data), 65536)]
+
+
+def prepare(storage_method, address, size):
+    segment_size = storage_method.ec_segment_size
+    data = b'0123456789abcdef' * (segment_size // 16)
+    nb_chunks = storage_method.ec_nb_data + storage_method.ec_nb_parity
+    fragments = storage_method.driver.encode(data)
+    nb_segments, rest = divmod(size, segment_size)
+    last_fragments = storage_method.driver.encode(data[:rest]) \
+        if rest else [b''] * nb_chunks
+    meta_chunk = list()
+    for num in range(nb_chunks):
+        path = '/%d/%d' % (size, num)
+        CHUNKS[path] = fragments[num] * nb_segments + last_fragments[num]
+        meta_chunk.append({'url': 'http://%s%s' % (address, path),
+                           'pos': '0.%d' % num, 'num': num, 'size': size})
+    return meta_chunk
+
+
+def bench_once(storage_method, meta_chunk, **kwargs):
+    start = time.time()
+    handler = ECChunkDownloadHandler(storage_method, meta_chunk,
+                                     None, None, {}, **kwargs)
+    stream = handler.get_stream()
+    total = 0
+    try:
+        for part in stream:
+            for data in part['iter']:
+                total += len(data)
+    finally:
+        stream.close()
+    return total, time.time() - start
+
+
+def main(chunk_method, sizes):
+    storage_method = STORAGE_METHODS.load(chunk_method)
+    server = listen(('127.0.0.1', 0))
+    spawn(wsgi.server, server, fake_rawx, log=NullLogger())
+    address = '%s:%d' % server.getsockname()
+    for size in sizes:
+        meta_chunk = prepare(storage_method, address, size)
+        for name, kwargs in CONFIGURATIONS:
+            total, duration = bench_once(storage_method, meta_chunk,
+                                         **kwargs)
+            print("%s, %d MiB, %s: %d bytes in %fs, %f MiB per second." % (
+                  chunk_method, size // 1048576, name, total, duration,
+                  total / duration / 1048576))
+        CHUNKS.clear()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '-help', '--help'):
+        print(__doc__ % sys.argv[0])
+        sys.exit(1)
+    CHUNK_METHOD = (sys.argv[1] if len(sys.argv) > 1
+                    else 'ec/algo=liberasurecode_rs_vand,k=6,m=3')
+    SIZES = ([int(x) * 1048576 for x in sys.argv[2:]]
+             or [x * 1048576 for x in (1, 16, 256, 1024)])
+    main(CHUNK_METHOD, SIZES)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2021 OVH SAS
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Measure the CPU cost of the EC upload path (EcMetachunkWriter._stream),
+without any network: chunk writers send their data to null connections.
+
+usage: %s [chunk_method] [size_mib] [iterations]
+
+chunk_method: defaults to 'ec/algo=liberasurecode_rs_vand,k=6,m=3'.
+size_mib: the size of each metachunk, in MiB (defaults to 64).
+iterations: the number of metachunks to upload (defaults to 10).
+"""
+
+from __future__ import print_function
+
+import hashlib
+import sys
+import time
+from io import BytesIO
+
+from oio.api.ec import EcChunkWriter, EcMetachunkWriter
+from oio.common.storage_method import STORAGE_METHODS
+
+
+class NullConnection(object):
+    """Connection discarding everything it is given."""
+
+    def send(self, data):
+        pass
+
+    def set_cork(self, enabled=True):
+        pass
+
+
+def bench_once(storage_method, data):
+    nb_chunks = storage_method.ec_nb_data + storage_method.ec_nb_parity
+    meta_chunk = [{'url': 'http://127.0.0.1:%d/%d' % (6000 + i, i),
+                   'pos': '0.%d' % i, 'num': i}
+                  for i in range(nb_chunks)]
+    handler = EcMetachunkWriter({}, meta_chunk, hashlib.md5(),
+                                storage_method)
+    writers = [EcChunkWriter(chunk, NullConnection()) for chunk in meta_chunk]
+    start = time.process_time()
+    handler._stream(BytesIO(data), len(data), writers)
+    return time.process_time() - start
+
+
+def main(chunk_method, size, iterations):
+    storage_method = STORAGE_METHODS.load(chunk_method)
+    data = b'0123456789abcdef' * (size // 16)
+    cpu_time = 0.0
+    for _ in range(iterations):
+        cpu_time += bench_once(storage_method, data)
+    total = len(data) * iterations
+    print("%s: %d bytes in %fs of CPU time, %f MiB per CPU second." % (
+          chunk_method, total, cpu_time, total / cpu_time / 1048576))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '-help', '--help'):
+        print(__doc__ % sys.argv[0])
+        sys.exit(1)
+    CHUNK_METHOD = (sys.argv[1] if len(sys.argv) > 1
+                    else 'ec/algo=liberasurecode_rs_vand,k=6,m=3')
+    SIZE = int(sys.argv[2]) * 1048576 if len(sys.argv) > 2 else 64 * 1048576
+    ITERATIONS = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    main(CHUNK_METHOD, SIZE, ITERATIONS)